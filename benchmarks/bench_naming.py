@@ -0,0 +1,179 @@
+"""
+Microbenchmarks dos caminhos quentes de nomes e varredura
+
+Mede KodiNamer (limpeza, episodio, sanitizacao, sugestao de nome) sobre um
+corpus de 50k nomes de release e a varredura de uma arvore sintetica de
+pastas. Mostra ops/s e percentis da latencia por operacao (medida em lotes,
+para o relogio nao dominar a medicao).
+
+Uso:
+    python -m benchmarks.bench_naming
+    python -m benchmarks.bench_naming --save benchmarks/baseline.json
+    python -m benchmarks.bench_naming --compare benchmarks/baseline.json --threshold 0.15
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.corpus import DEFAULT_CORPUS_SIZE, build_corpus, build_tree
+from src.core.KodiNamer import KodiNamer
+from src.core.pipeline import scan_kodi_files, scan_video_files
+
+BATCH_SIZE = 500
+DEFAULT_THRESHOLD = 0.15
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def measure(function, inputs, repeat):
+    """
+    Roda function sobre inputs em lotes de BATCH_SIZE, repeat vezes.
+    Latencia por operacao = tempo do lote / tamanho do lote.
+    """
+    runs = []
+    for _ in range(repeat):
+        latencies = []
+        for start in range(0, len(inputs), BATCH_SIZE):
+            batch = inputs[start:start + BATCH_SIZE]
+            started = time.perf_counter()
+            for value in batch:
+                function(value)
+            latencies.append((time.perf_counter() - started) / len(batch))
+        runs.append(latencies)
+    return summarize(runs)
+
+
+def measure_calls(function, repeat):
+    """Para operacoes grandes (uma varredura inteira): uma amostra por chamada"""
+    runs = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        runs.append([time.perf_counter() - started])
+    return summarize(runs)
+
+
+def summarize(runs):
+    """
+    ops/s vem da mediana da repeticao mais rapida (como o timeit, o minimo e
+    o que menos sofre com ruido da maquina); percentis usam todas as amostras
+    """
+    best = min(percentile(latencies, 0.50) for latencies in runs)
+    latencies = [value for run_latencies in runs for value in run_latencies]
+    return {
+        "samples": len(latencies),
+        "ops_per_sec": round(1 / best, 1) if best > 0 else 0.0,
+        "p50_us": round(percentile(latencies, 0.50) * 1e6, 3),
+        "p95_us": round(percentile(latencies, 0.95) * 1e6, 3),
+        "p99_us": round(percentile(latencies, 0.99) * 1e6, 3),
+        "mean_us": round(statistics.fmean(latencies) * 1e6, 3),
+    }
+
+
+def naming_benchmarks():
+    return {
+        "clean_filename": lambda name: KodiNamer.clean_filename(name),
+        "extract_episode_info": lambda name: KodiNamer.extract_episode_info(name),
+        "extract_series_name": lambda name: KodiNamer.extract_series_name(name),
+        "sanitize_filename": lambda name: KodiNamer.sanitize_filename(name),
+        "suggest_kodi_filename": lambda name: KodiNamer.suggest_kodi_filename(name, "The Matrix: Reloaded", 2003),
+        "suggest_episode_filename": lambda name: KodiNamer.suggest_episode_filename(
+            name, "Breaking Bad", 1, 2, "Cat's in the Bag..."
+        ),
+        "is_video_file": lambda name: KodiNamer.is_video_file(name),
+    }
+
+
+def run(args):
+    corpus = build_corpus(args.corpus_size)
+    results = {}
+    for name, function in naming_benchmarks().items():
+        results[name] = measure(function, corpus, args.repeat)
+        print_result(name, results[name])
+
+    with tempfile.TemporaryDirectory() as folder:
+        videos = build_tree(folder, files=args.tree_files)
+        found = len(scan_video_files(folder))
+        if found != videos:
+            raise RuntimeError(f"varredura encontrou {found} videos, esperado {videos}")
+        results["scan_video_files"] = measure_calls(lambda: scan_video_files(folder), args.repeat * 3)
+        print_result("scan_video_files", results["scan_video_files"])
+        results["scan_kodi_files"] = measure_calls(lambda: scan_kodi_files(folder), args.repeat * 3)
+        print_result("scan_kodi_files", results["scan_kodi_files"])
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "corpus_size": args.corpus_size,
+        "tree_files": args.tree_files,
+        "results": results,
+    }
+
+
+def print_result(name, result):
+    print(
+        f"{name:<26}{result['ops_per_sec']:>14,.0f} ops/s"
+        f"  p50 {result['p50_us']:>10.2f} us  p95 {result['p95_us']:>10.2f} us  p99 {result['p99_us']:>10.2f} us"
+    )
+
+
+def compare(report, baseline, threshold):
+    """Lista as regressoes: ops/s abaixo de (1 - threshold) x baseline"""
+    regressions = []
+    print()
+    print(f"{'caminho':<26}{'baseline':>14}{'atual':>14}{'variacao':>10}")
+    for name, result in report["results"].items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous or not previous.get("ops_per_sec"):
+            continue
+        change = result["ops_per_sec"] / previous["ops_per_sec"] - 1
+        flag = "  REGRESSAO" if change < -threshold else ""
+        print(f"{name:<26}{previous['ops_per_sec']:>14,.0f}{result['ops_per_sec']:>14,.0f}{change:>+9.1%}{flag}")
+        if change < -threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Microbenchmarks de nomes e varredura do KodiBot")
+    parser.add_argument("--corpus-size", type=int, default=DEFAULT_CORPUS_SIZE, help="Nomes de release no corpus")
+    parser.add_argument("--tree-files", type=int, default=5000, help="Arquivos na arvore sintetica")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeticoes de cada medicao")
+    parser.add_argument("--save", help="Grava o resultado como baseline JSON")
+    parser.add_argument("--compare", help="Compara com um baseline JSON e falha se houver regressao")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="Queda maxima aceita de ops/s na comparacao (0.15 = 15%%)",
+    )
+    args = parser.parse_args(argv)
+
+    report = run(args)
+
+    if args.save:
+        Path(args.save).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        print(f"\nBaseline gravado em {args.save}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"\nRegressao acima de {args.threshold:.0%} em: {', '.join(regressions)}")
+            return 1
+        print(f"\nSem regressao acima de {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
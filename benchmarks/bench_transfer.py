@@ -0,0 +1,127 @@
+"""
+Benchmark do envio de arquivos (copia em blocos + verificacao)
+
+Mede a taxa de leitura/escrita sequencial crua dos discos e compara com a
+taxa de cada estrategia de copia, mostrando quanto da "velocidade de linha"
+(min(leitura, escrita)) o envio atinge.
+
+Uso:
+    python -m benchmarks.bench_transfer --size-mb 2048
+    python -m benchmarks.bench_transfer --source-dir /mnt/filmes --dest-dir /mnt/nas/kodi
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from src.core.FileTransfer import (
+    COPY_COPY_FILE_RANGE,
+    COPY_SENDFILE,
+    COPY_USERSPACE,
+    VERIFY_FULL,
+    VERIFY_NONE,
+    VERIFY_SAMPLE,
+    TransferJob,
+    TransferQueue,
+    drop_page_cache,
+    format_size,
+)
+
+BLOCK_SIZE = 8 * 1024 * 1024
+
+
+def create_source_file(folder, size_bytes):
+    path = Path(folder) / "kodibot-bench-source.bin"
+    block = os.urandom(BLOCK_SIZE)
+    with open(path, "wb") as handle:
+        written = 0
+        while written < size_bytes:
+            chunk = block[: min(BLOCK_SIZE, size_bytes - written)]
+            handle.write(chunk)
+            written += len(chunk)
+        handle.flush()
+        os.fsync(handle.fileno())
+    return path
+
+
+def measure_raw_read(path):
+    with open(path, "rb") as handle:
+        drop_page_cache(handle.fileno())
+        started = time.perf_counter()
+        total = 0
+        while True:
+            data = handle.read(BLOCK_SIZE)
+            if not data:
+                break
+            total += len(data)
+    return total / (time.perf_counter() - started)
+
+
+def measure_raw_write(folder, size_bytes):
+    path = Path(folder) / "kodibot-bench-write.bin"
+    block = bytes(BLOCK_SIZE)
+    started = time.perf_counter()
+    with open(path, "wb") as handle:
+        written = 0
+        while written < size_bytes:
+            handle.write(block[: min(BLOCK_SIZE, size_bytes - written)])
+            written += BLOCK_SIZE
+        handle.flush()
+        os.fsync(handle.fileno())
+    elapsed = time.perf_counter() - started
+    path.unlink()
+    return size_bytes / elapsed
+
+
+def run_transfer(source, dest_dir, strategy, verify):
+    destination = Path(dest_dir) / f"kodibot-bench-{strategy}-{verify}.bin"
+    destination.unlink(missing_ok=True)
+    with open(source, "rb") as handle:
+        drop_page_cache(handle.fileno())
+    job = TransferJob(source, destination, verify=verify)
+    queue = TransferQueue([job], copy_strategies=(strategy, COPY_USERSPACE))
+    started = time.perf_counter()
+    queue.run()
+    elapsed = time.perf_counter() - started
+    destination.unlink(missing_ok=True)
+    if job.error:
+        raise RuntimeError(job.error)
+    return job, job.size / elapsed if elapsed > 0 else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do envio de arquivos do KodiBot")
+    parser.add_argument("--size-mb", type=int, default=1024, help="Tamanho do arquivo de teste em MB")
+    parser.add_argument("--source-dir", help="Pasta de origem (padrao: temporaria)")
+    parser.add_argument("--dest-dir", help="Pasta de destino (padrao: temporaria)")
+    args = parser.parse_args()
+
+    size_bytes = args.size_mb * 1024 * 1024
+    with tempfile.TemporaryDirectory() as tmp_src, tempfile.TemporaryDirectory() as tmp_dst:
+        source_dir = args.source_dir or tmp_src
+        dest_dir = args.dest_dir or tmp_dst
+        source = create_source_file(source_dir, size_bytes)
+        try:
+            read_rate = measure_raw_read(source)
+            write_rate = measure_raw_write(dest_dir, size_bytes)
+            line_rate = min(read_rate, write_rate)
+            print(f"Arquivo de teste: {format_size(size_bytes)}")
+            print(f"Leitura crua da origem:  {format_size(read_rate)}/s")
+            print(f"Escrita crua no destino: {format_size(write_rate)}/s")
+            print(f"Velocidade de linha:     {format_size(line_rate)}/s")
+            print()
+            print(f"{'estrategia':<18}{'verificacao':<14}{'taxa':>14}{'% linha':>10}")
+            for strategy in (COPY_COPY_FILE_RANGE, COPY_SENDFILE, COPY_USERSPACE):
+                for verify in (VERIFY_NONE, VERIFY_SAMPLE, VERIFY_FULL):
+                    job, rate = run_transfer(source, dest_dir, strategy, verify)
+                    used = job.copy_strategy or strategy
+                    percent = rate * 100 / line_rate if line_rate else 0.0
+                    print(f"{used:<18}{verify:<14}{format_size(rate) + '/s':>14}{percent:>9.0f}%")
+        finally:
+            source.unlink(missing_ok=True)
+
+
+if __name__ == "__main__":
+    main()
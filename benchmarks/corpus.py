@@ -0,0 +1,100 @@
+"""
+Dados sinteticos para os benchmarks: nomes de release realistas e uma
+arvore de pastas de downloads
+
+Tudo e gerado com semente fixa, entao duas execucoes medem exatamente a
+mesma entrada.
+"""
+
+import random
+from pathlib import Path
+
+DEFAULT_SEED = 1234
+DEFAULT_CORPUS_SIZE = 50000
+
+TITLE_WORDS = [
+    "the", "a", "of", "and", "dark", "night", "star", "wars", "matrix", "lord", "rings", "king",
+    "return", "last", "man", "woman", "city", "river", "house", "dragon", "blade", "runner",
+    "toy", "story", "back", "future", "godfather", "alien", "terminator", "inception", "interstellar",
+    "cidade", "deus", "tropa", "elite", "auto", "compadecida", "central", "brasil", "o", "da", "do",
+    "amelie", "leon", "breaking", "bad", "better", "call", "saul", "stranger", "things", "crown",
+    "office", "friends", "lost", "fargo", "true", "detective", "mr", "robot", "black", "mirror",
+]
+QUALITY_TAGS = ["1080p", "720p", "2160p", "4K", "480p", "UHD", "HDR", "10bit", "SDR"]
+SOURCE_TAGS = ["BluRay", "WEB-DL", "WEBRip", "HDRip", "BRRip", "DVDRip", "REMUX", "HDCAM", "WEB"]
+CODEC_TAGS = ["x264", "x265", "H264", "H265", "XviD", "DDP5.1", "Atmos", "5.1", "AAC"]
+EXTRA_TAGS = ["PROPER", "REPACK", "EXTENDED", "UNRATED", "DUAL", "Dublado", "Dual Audio", "LTD", "Subs"]
+GROUPS = ["YIFY", "RARBG", "SPARKS", "NTb", "FGT", "EVO", "AMIABLE", "GECKOS", "ION10", "TGx"]
+EXTENSIONS = [".mkv", ".mkv", ".mkv", ".mp4", ".mp4", ".avi", ".m4v", ".mov"]
+SEPARATORS = [".", " ", "_", "-"]
+
+
+def _title(rng):
+    return [rng.choice(TITLE_WORDS).capitalize() for _ in range(rng.randint(1, 5))]
+
+
+def release_name(rng):
+    """Um nome de arquivo como os de downloads reais (filme ou episodio)"""
+    separator = rng.choice(SEPARATORS)
+    parts = _title(rng)
+    is_episode = rng.random() < 0.4
+    if is_episode:
+        if rng.random() < 0.2:
+            parts.append(f"{rng.randint(1, 12)}x{rng.randint(1, 24):02d}")
+        else:
+            parts.append(f"S{rng.randint(1, 12):02d}E{rng.randint(1, 24):02d}")
+        if rng.random() < 0.3:
+            parts.extend(_title(rng))
+    if rng.random() < 0.85:
+        year = str(rng.randint(1950, 2025))
+        parts.append(f"({year})" if rng.random() < 0.2 else year)
+    for pool, chance in ((QUALITY_TAGS, 0.8), (SOURCE_TAGS, 0.7), (CODEC_TAGS, 0.6), (EXTRA_TAGS, 0.2)):
+        if rng.random() < chance:
+            parts.append(rng.choice(pool))
+    name = separator.join(parts)
+    if rng.random() < 0.6:
+        name += f"-{rng.choice(GROUPS)}"
+    if rng.random() < 0.05:
+        # Caracteres invalidos que sanitize_filename precisa remover
+        name += rng.choice([":", "?", "*", "|", '"'])
+    return name + rng.choice(EXTENSIONS)
+
+
+def build_corpus(size=DEFAULT_CORPUS_SIZE, seed=DEFAULT_SEED):
+    rng = random.Random(seed)
+    return [release_name(rng) for _ in range(size)]
+
+
+def build_tree(root, files=5000, depth=3, fanout=6, seed=DEFAULT_SEED, junk_ratio=0.3):
+    """
+    Cria uma arvore de downloads em root: pastas aninhadas com videos
+    (arquivos vazios) e arquivos que nao sao video (.nfo, .srt, .txt).
+    Retorna a quantidade de videos criados.
+    """
+    rng = random.Random(seed)
+    root = Path(root)
+    folders = [root]
+    frontier = [root]
+    for _ in range(depth):
+        next_frontier = []
+        for folder in frontier:
+            for index in range(rng.randint(1, fanout)):
+                child = folder / f"{rng.choice(TITLE_WORDS).capitalize()} {index}"
+                next_frontier.append(child)
+        folders.extend(next_frontier)
+        frontier = next_frontier
+
+    for folder in folders:
+        folder.mkdir(parents=True, exist_ok=True)
+
+    videos = 0
+    for index in range(files):
+        folder = rng.choice(folders)
+        if rng.random() < junk_ratio:
+            name = f"info-{index}{rng.choice(['.nfo', '.srt', '.txt', '.jpg'])}"
+        else:
+            base = release_name(rng)
+            name = f"{Path(base).stem}-{index}{Path(base).suffix}"
+            videos += 1
+        (folder / name).touch()
+    return videos
@@ -7,20 +7,41 @@ compatível com Kodi
 
 import sys
 from pathlib import Path
-from PyQt6.QtWidgets import QApplication
-from PyQt6.QtGui import QIcon
-from src.ui.main_window import RenomeadorUI
 
+from src.core import startup_timing
+
+CLI_COMMANDS = ("batch", "watch")
+
+
+def run_gui():
+    from PyQt6.QtWidgets import QApplication
+    from PyQt6.QtGui import QIcon
+    from src.ui.main_window import RenomeadorUI
+    from src.core import metrics, profiling
+    startup_timing.mark("imports")
+
+    metrics.load_enabled()
+    profiling.start_session_if_enabled()
 
-def main():
     app = QApplication(sys.argv)
     icon_path = Path(__file__).parent / "src" / "img" / "tmdb-256.png"
     if icon_path.exists():
         app.setWindowIcon(QIcon(str(icon_path)))
+    startup_timing.mark("qapplication")
     window = RenomeadorUI()
     window.show()
+    startup_timing.mark("window_show")
     sys.exit(app.exec())
 
 
+def main():
+    # Subcomandos rodam sem importar PyQt6 (servidores sem interface grafica)
+    if len(sys.argv) > 1 and sys.argv[1] in CLI_COMMANDS:
+        from src.cli import main as cli_main
+
+        sys.exit(cli_main(sys.argv[1:]))
+    run_gui()
+
+
 if __name__ == '__main__':
     main()
@@ -0,0 +1,314 @@
+"""
+Modo linha de comando do KodiBot (sem interface grafica)
+
+Exemplos:
+    python main.py batch /downloads/filmes --kodi /mnt/nas/kodi --dry-run
+    python main.py batch /downloads/series --type tv --json --min-confidence 0.9
+    python main.py watch /downloads --kodi /mnt/nas/kodi --port 8765
+"""
+
+import argparse
+import contextlib
+import json
+import sys
+from pathlib import Path
+
+from src.core import metrics, profiling
+from src.core.config import get_setting
+from src.core.FileTransfer import SEND_MODES, SEND_MODE_COPY, VERIFY_MODES, VERIFY_SAMPLE
+from src.core.LibraryIndex import LibraryIndex
+from src.core.MediaProbe import MediaProbeCache
+from src.core.pipeline import (
+    DEFAULT_MIN_CONFIDENCE,
+    ITEM_ERROR,
+    ITEM_FAILED,
+    BatchPipeline,
+    load_kodi_index,
+    post_transfer,
+)
+
+
+def is_truthy(value):
+    return (value or "").strip().lower() in {"1", "true", "yes", "on", "sim"}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="kodibot", description="KodiBot sem interface grafica")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    batch = subparsers.add_parser("batch", help="Processa uma pasta inteira: busca, renomeia e envia ao Kodi")
+    batch.add_argument("folder", nargs="?", help="Pasta com os arquivos (padrao: MOVIES_FOLDER)")
+    batch.add_argument("--kodi", help="Pasta do Kodi (padrao: KODI_FOLDER)")
+    batch.add_argument("--type", choices=("movie", "tv"), default="movie", help="Tipo de midia")
+    batch.add_argument("--dry-run", action="store_true", help="So busca e planeja, sem enviar nada")
+    batch.add_argument("--json", action="store_true", help="Saida em JSON")
+    batch.add_argument(
+        "--min-confidence",
+        type=float,
+        default=DEFAULT_MIN_CONFIDENCE,
+        help="Confianca minima (0 a 1) para aceitar automaticamente",
+    )
+    batch.add_argument("--move", action="store_true", default=None, help="Apaga o original apos enviar")
+    batch.add_argument("--mode", choices=SEND_MODES, help="Modo de envio (padrao: SEND_MODE)")
+    batch.add_argument("--verify", choices=VERIFY_MODES, help="Verificacao da copia (padrao: VERIFY_MODE)")
+    batch.add_argument("--workers", type=int, default=8, help="Buscas TMDB em paralelo")
+    batch.add_argument(
+        "--search-existing",
+        action="store_true",
+        help="Busca no TMDB ate os arquivos que ja estao na biblioteca do Kodi",
+    )
+    batch.add_argument(
+        "--no-probe",
+        action="store_true",
+        help="Nao le o cabecalho dos videos (duracao, titulo embutido, resolucao)",
+    )
+    batch.add_argument(
+        "--resolution",
+        action="store_true",
+        default=None,
+        help="Poe a resolucao no nome, ex.: Filme (2010) 1080p.mkv (padrao: NAME_RESOLUTION)",
+    )
+    batch.add_argument(
+        "--nfo",
+        action="store_true",
+        default=None,
+        help="Grava .nfo do Kodi ao lado de cada arquivo enviado (padrao: WRITE_NFO)",
+    )
+    batch.add_argument(
+        "--artwork",
+        action="store_true",
+        default=None,
+        help="Baixa poster/fanart/miniaturas para a pasta do Kodi (padrao: DOWNLOAD_ARTWORK)",
+    )
+    batch.add_argument(
+        "--metrics",
+        metavar="ARQUIVO",
+        help="Grava metricas de desempenho ao final (.prom = textfile do Prometheus, senao JSON)",
+    )
+    batch.add_argument(
+        "--profile",
+        action="store_true",
+        help="Perfila a execucao com cProfile; grava .prof e resumo em <config>/profiles",
+    )
+    batch.add_argument(
+        "--no-kodi-scan",
+        action="store_true",
+        help="Nao pede ao Kodi (JSON-RPC) para atualizar a biblioteca apos enviar",
+    )
+
+    watch = subparsers.add_parser("watch", help="Observa a pasta e processa novos arquivos continuamente")
+    watch.add_argument("folder", nargs="?", help="Pasta observada (padrao: MOVIES_FOLDER)")
+    watch.add_argument("--kodi", help="Pasta do Kodi (padrao: KODI_FOLDER)")
+    watch.add_argument(
+        "--min-confidence",
+        type=float,
+        default=DEFAULT_MIN_CONFIDENCE,
+        help="Abaixo desta confianca o arquivo fica retido para revisao",
+    )
+    watch.add_argument("--move", action="store_true", default=None, help="Apaga o original apos enviar")
+    watch.add_argument("--mode", choices=SEND_MODES, help="Modo de envio (padrao: SEND_MODE)")
+    watch.add_argument("--verify", choices=VERIFY_MODES, help="Verificacao da copia (padrao: VERIFY_MODE)")
+    watch.add_argument("--nfo", action="store_true", default=None, help="Grava .nfo do Kodi (padrao: WRITE_NFO)")
+    watch.add_argument("--artwork", action="store_true", default=None, help="Baixa as artes (padrao: DOWNLOAD_ARTWORK)")
+    watch.add_argument(
+        "--resolution", action="store_true", default=None, help="Resolucao no nome (padrao: NAME_RESOLUTION)"
+    )
+    watch.add_argument("--interval", type=float, default=10, help="Segundos entre varreduras")
+    watch.add_argument("--settle", type=float, default=30, help="Segundos sem mudar de tamanho para considerar pronto")
+    watch.add_argument("--profile", action="store_true", help="Perfila a execucao com cProfile (grava ao sair)")
+    watch.add_argument("--metrics", action="store_true", help="Coleta metricas (expostas em /metrics)")
+    watch.add_argument("--port", type=int, default=8765, help="Porta do status JSON em 127.0.0.1 (0 desativa)")
+    return parser
+
+
+def resolve_send_settings(args):
+    move = args.move if args.move is not None else is_truthy(get_setting("REMOVE_ORIGINAL_AFTER_SEND"))
+    mode = args.mode or get_setting("SEND_MODE") or SEND_MODE_COPY
+    verify = args.verify or get_setting("VERIFY_MODE") or VERIFY_SAMPLE
+    return move, mode, verify
+
+
+def resolve_flag(value, setting):
+    """Opcao liga/desliga da linha de comando, ou a configuracao quando omitida"""
+    return value if value is not None else is_truthy(get_setting(setting))
+
+
+def create_tmdb_client():
+    from src.core.TmdbClient import TMDBClient
+
+    return TMDBClient()
+
+
+def run_batch(args, out):
+    folder = args.folder or get_setting("MOVIES_FOLDER")
+    if not folder or not Path(folder).is_dir():
+        print("Pasta de arquivos invalida ou nao informada", file=sys.stderr)
+        return 2
+
+    kodi_folder = args.kodi or get_setting("KODI_FOLDER")
+    if not args.dry_run and (not kodi_folder or not Path(kodi_folder).is_dir()):
+        print("Pasta do Kodi invalida ou nao informada", file=sys.stderr)
+        return 2
+
+    move, mode, verify = resolve_send_settings(args)
+
+    try:
+        client = create_tmdb_client()
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        return 2
+
+    pipeline = BatchPipeline(
+        client,
+        media_type=args.type,
+        min_confidence=args.min_confidence,
+        workers=args.workers,
+        probe_cache=None if args.no_probe else MediaProbeCache(),
+        name_resolution=resolve_flag(args.resolution, "NAME_RESOLUTION"),
+    )
+    # O cliente TMDB e mensagens de progresso nunca poluem a saida JSON
+    with contextlib.redirect_stdout(sys.stderr if args.json else out):
+        pipeline.scan(folder)
+        has_kodi = bool(kodi_folder) and Path(kodi_folder).is_dir()
+        if has_kodi:
+            kodi_index, kodi_library, _ = load_kodi_index(kodi_folder)
+            if not args.search_existing:
+                pipeline.match_library(LibraryIndex.build(kodi_index, kodi_library))
+        pipeline.resolve()
+        plan = None
+        extras = None
+        if has_kodi:
+            plan = pipeline.plan(
+                kodi_folder, move=move, mode=mode, kodi_index=kodi_index, kodi_library=kodi_library
+            )
+            if not args.dry_run and plan.can_send:
+                from src.core.TransferJournal import TransferJournal
+
+                jobs = pipeline.transfer(plan, verify=verify, journal=TransferJournal())
+                extras = post_transfer(
+                    jobs,
+                    kodi_folder,
+                    write_nfo=resolve_flag(args.nfo, "WRITE_NFO"),
+                    update_library=not args.no_kodi_scan,
+                    download_artwork=resolve_flag(args.artwork, "DOWNLOAD_ARTWORK"),
+                )
+                for error in extras["errors"]:
+                    print(error, file=sys.stderr)
+
+    report = {
+        "folder": str(folder),
+        "kodi_folder": str(kodi_folder) if kodi_folder else None,
+        "dry_run": args.dry_run,
+        "summary": pipeline.summary(),
+        "plan": plan.summary() if plan else None,
+        "plan_blocked": bool(plan and plan.blocking_errors),
+        "post_transfer": extras,
+        "files": [item.to_dict() for item in pipeline.items],
+    }
+
+    if args.json:
+        json.dump(report, out, ensure_ascii=False, indent=2)
+        out.write("\n")
+    else:
+        for item in pipeline.items:
+            target = item.suggested_name or "-"
+            line = f"[{item.status}] {item.relative} -> {target} ({item.confidence:.2f})"
+            if item.error:
+                line += f" - {item.error}"
+            print(line, file=out)
+        if plan:
+            print("", file=out)
+            print(plan.summary(), file=out)
+        if extras and extras["nfo_files"]:
+            print(f"{extras['nfo_files']} arquivo(s) .nfo gravado(s)", file=out)
+        if extras and extras["artwork_files"]:
+            print(f"{extras['artwork_files']} arte(s) baixada(s)", file=out)
+        if extras and extras["kodi_scan"]:
+            print(f"Biblioteca do Kodi atualizada em {len(extras['kodi_scan'])} pasta(s)", file=out)
+        print("", file=out)
+        print(" ".join(f"{key}={value}" for key, value in sorted(report["summary"].items())), file=out)
+
+    if args.metrics:
+        try:
+            metrics.write_export(args.metrics)
+        except OSError as e:
+            print(f"Erro ao gravar metricas: {e}", file=sys.stderr)
+
+    failed = any(item.status in (ITEM_ERROR, ITEM_FAILED) for item in pipeline.items)
+    return 1 if failed or report["plan_blocked"] else 0
+
+
+def run_watch(args, out):
+    from src.core.TransferJournal import TransferJournal
+    from src.core.WatchDaemon import WatchDaemon
+
+    folder = args.folder or get_setting("MOVIES_FOLDER")
+    kodi_folder = args.kodi or get_setting("KODI_FOLDER")
+    if not folder or not Path(folder).is_dir():
+        print("Pasta observada invalida ou nao informada", file=sys.stderr)
+        return 2
+    if not kodi_folder or not Path(kodi_folder).is_dir():
+        print("Pasta do Kodi invalida ou nao informada", file=sys.stderr)
+        return 2
+
+    move, mode, verify = resolve_send_settings(args)
+    try:
+        client = create_tmdb_client()
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        return 2
+
+    daemon = WatchDaemon(
+        client,
+        folder,
+        kodi_folder,
+        min_confidence=args.min_confidence,
+        move=move,
+        mode=mode,
+        verify=verify,
+        poll_interval=args.interval,
+        settle_seconds=args.settle,
+        journal=TransferJournal(),
+        write_nfo=resolve_flag(args.nfo, "WRITE_NFO"),
+        download_artwork=resolve_flag(args.artwork, "DOWNLOAD_ARTWORK"),
+        probe_cache=MediaProbeCache(),
+        name_resolution=resolve_flag(args.resolution, "NAME_RESOLUTION"),
+    )
+    if args.port:
+        daemon.start_http(args.port)
+        print(f"Status em http://127.0.0.1:{args.port}/status", file=out)
+    print(f"Observando {folder}", file=out)
+    out.flush()
+    try:
+        daemon.run_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.stop()
+    return 0
+
+
+def main(argv=None, out=None):
+    args = build_parser().parse_args(argv)
+    out = out or sys.stdout
+    metrics.load_enabled()
+    if args.metrics:
+        metrics.enable()
+    if args.profile:
+        profiling.start(args.command)
+    else:
+        profiling.start_session_if_enabled(args.command)
+    try:
+        if args.command == "batch":
+            return run_batch(args, out)
+        if args.command == "watch":
+            return run_watch(args, out)
+        return 2
+    finally:
+        profile_path = profiling.stop()
+        if profile_path:
+            print(f"Perfil gravado em {profile_path}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,259 @@
+"""
+Artes locais para o Kodi (poster, fanart, poster de temporada e miniatura
+de episodio), baixadas em paralelo depois do envio
+
+Nomes seguem a convencao local do Kodi:
+    Filmes (pasta unica):  <Filme (Ano)>-poster.jpg, <Filme (Ano)>-fanart.jpg
+    Series:                Series/<Serie>/poster.jpg, fanart.jpg, season01-poster.jpg
+    Episodios:             <arquivo do episodio>-thumb.jpg
+"""
+
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from src.core import metrics
+from src.core.config import get_config_dir
+from src.core.FileTransfer import STATUS_DONE
+from src.core.KodiNfo import series_folder
+from src.core.TaskScheduler import PRIORITY_ARTWORK, TaskScheduler, map_tasks
+from src.core.TmdbClient import get_requests
+
+IMAGE_BASE_URL = "https://image.tmdb.org/t/p"
+POSTER_SIZE = "w500"
+FANART_SIZE = "w1280"
+STILL_SIZE = "w300"
+
+MANIFEST_FILENAME = "artwork.json"
+DEFAULT_WORKERS = 4
+
+ART_DOWNLOADED = "downloaded"
+ART_SKIPPED = "skipped"
+ART_FAILED = "failed"
+
+
+def tmdb_image_url(path, size):
+    return f"{IMAGE_BASE_URL}/{size}{path}" if path else None
+
+
+class ImageCache:
+    """
+    Bytes de imagens TMDB por URL, compartilhados entre a pre-visualizacao da
+    janela e o download de artes (a mesma imagem nao e baixada duas vezes)
+    """
+
+    def __init__(self, max_items=256):
+        self.max_items = max_items
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, url):
+        with self._lock:
+            data = self._items.get(url)
+            if data is not None:
+                self._items.move_to_end(url)
+        metrics.count("image_cache.miss" if data is None else "image_cache.hit")
+        return data
+
+    def put(self, url, data):
+        with self._lock:
+            self._items[url] = data
+            self._items.move_to_end(url)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+
+    def fetch(self, url, timeout=10):
+        """Retorna os bytes da imagem, do cache ou da rede (erros de requests sobem)"""
+        data = self.get(url)
+        if data is not None:
+            return data
+        requests = get_requests()
+        with metrics.span("image.http"):
+            response = requests.get(url, timeout=timeout)
+            response.raise_for_status()
+        self.put(url, response.content)
+        return response.content
+
+
+class ArtworkTask:
+    def __init__(self, url, destination, label):
+        self.url = url
+        self.destination = Path(destination)
+        self.label = label
+        self.status = None
+        self.error = None
+
+
+def artwork_tasks(job, kodi_root):
+    """
+    Artes de um envio concluido, a partir dos dados TMDB do job. As da serie
+    (poster, fanart, poster da temporada) so quando o episodio esta em
+    Series/<Serie>/ na pasta Kodi
+    """
+    media = job.media or {}
+    result = media.get("result")
+    if not result:
+        return []
+
+    destination = job.destination
+    if media.get("type") != "tv":
+        prefix = destination.with_suffix("")
+        return [
+            ArtworkTask(tmdb_image_url(result.get("poster_path"), POSTER_SIZE), f"{prefix}-poster.jpg", job.label),
+            ArtworkTask(tmdb_image_url(result.get("backdrop_path"), FANART_SIZE), f"{prefix}-fanart.jpg", job.label),
+        ]
+
+    tasks = [
+        ArtworkTask(
+            tmdb_image_url(result.get("still_path"), STILL_SIZE),
+            f"{destination.with_suffix('')}-thumb.jpg",
+            job.label,
+        )
+    ]
+    series = media.get("series")
+    folder = series_folder(destination, kodi_root) if series else None
+    if folder is not None:
+        tasks.append(ArtworkTask(tmdb_image_url(series.get("poster_path"), POSTER_SIZE), folder / "poster.jpg", job.label))
+        tasks.append(ArtworkTask(tmdb_image_url(series.get("backdrop_path"), FANART_SIZE), folder / "fanart.jpg", job.label))
+        season_poster = media.get("season_poster_path")
+        season_number = result.get("season_number")
+        if season_poster and season_number is not None:
+            tasks.append(
+                ArtworkTask(
+                    tmdb_image_url(season_poster, POSTER_SIZE),
+                    folder / f"season{int(season_number):02d}-poster.jpg",
+                    job.label,
+                )
+            )
+    return tasks
+
+
+class ArtworkDownloader:
+    """
+    Baixa as artes dos envios em um pool limitado de threads. Arquivos ja
+    presentes sao pulados: pelo tamanho registrado no manifesto ou, se a
+    URL mudou, por ETag (If-None-Match).
+    """
+
+    def __init__(
+        self,
+        image_cache=None,
+        workers=DEFAULT_WORKERS,
+        manifest_path=None,
+        timeout=20,
+        scheduler=None,
+        token=None,
+    ):
+        """
+        Args:
+            scheduler, token: TaskScheduler da interface; os downloads viram
+                sub-tarefas da classe de artes e respeitam o limite dela.
+                Sem ele, um scheduler proprio com workers threads
+        """
+        self.image_cache = image_cache or ImageCache()
+        self.workers = max(1, workers)
+        self.scheduler = scheduler or TaskScheduler(workers=self.workers, limits={PRIORITY_ARTWORK: self.workers})
+        self.token = token
+        self.manifest_path = manifest_path or get_config_dir() / MANIFEST_FILENAME
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self.manifest = self._load_manifest()
+
+    def _load_manifest(self):
+        try:
+            data = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _save_manifest(self):
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.manifest_path.with_name(self.manifest_path.name + ".tmp")
+        temp_path.write_text(json.dumps(self.manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+        os.replace(temp_path, self.manifest_path)
+
+    def plan(self, jobs, kodi_root):
+        """Uma tarefa por arquivo de destino (poster/fanart da serie aparecem uma vez)"""
+        tasks = {}
+        for job in jobs:
+            if job.status != STATUS_DONE:
+                continue
+            for task in artwork_tasks(job, kodi_root):
+                if task.url:
+                    tasks.setdefault(str(task.destination), task)
+        return list(tasks.values())
+
+    def _is_current(self, task):
+        try:
+            size = task.destination.stat().st_size
+        except OSError:
+            return False
+        with self._lock:
+            entry = self.manifest.get(str(task.destination))
+        # Arte colocada por fora do KodiBot nunca e sobrescrita
+        if entry is None:
+            return True
+        return entry.get("url") == task.url and entry.get("size") == size
+
+    def _download(self, task):
+        if self._is_current(task):
+            task.status = ART_SKIPPED
+            return task
+
+        with self._lock:
+            entry = self.manifest.get(str(task.destination)) or {}
+        data = self.image_cache.get(task.url)
+        etag = None
+        if data is None:
+            requests = get_requests()
+            headers = {}
+            if entry.get("etag") and task.destination.exists():
+                headers["If-None-Match"] = entry["etag"]
+            try:
+                with metrics.span("image.http"):
+                    response = requests.get(task.url, headers=headers, timeout=self.timeout)
+                if response.status_code == 304:
+                    with self._lock:
+                        self.manifest[str(task.destination)] = {**entry, "url": task.url}
+                    task.status = ART_SKIPPED
+                    return task
+                response.raise_for_status()
+            except requests.RequestException as e:
+                task.status = ART_FAILED
+                task.error = str(e)
+                return task
+            data = response.content
+            etag = response.headers.get("ETag")
+            self.image_cache.put(task.url, data)
+
+        try:
+            task.destination.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = task.destination.with_name(task.destination.name + ".tmp")
+            temp_path.write_bytes(data)
+            os.replace(temp_path, task.destination)
+        except OSError as e:
+            task.status = ART_FAILED
+            task.error = str(e)
+            return task
+
+        with self._lock:
+            self.manifest[str(task.destination)] = {"url": task.url, "etag": etag, "size": len(data)}
+        task.status = ART_DOWNLOADED
+        return task
+
+    def download(self, jobs, kodi_root):
+        """Baixa as artes dos envios concluidos. Retorna as tarefas com o status de cada uma"""
+        tasks = self.plan(jobs, kodi_root)
+        if not tasks:
+            return []
+        with metrics.span("artwork.batch"):
+            map_tasks(self._download, tasks, self.scheduler, PRIORITY_ARTWORK, self.token)
+        for task in tasks:
+            metrics.count(f"artwork.{task.status}")
+        try:
+            self._save_manifest()
+        except OSError:
+            pass
+        return tasks
@@ -0,0 +1,545 @@
+import hashlib
+import os
+import shutil
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from src.core import metrics
+from src.core.TransferJournal import ENTRY_COMMITTED
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+STATUS_PENDING = "pending"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+STATUS_CANCELLED = "cancelled"
+
+SEND_MODE_COPY = "copy"
+SEND_MODE_RENAME = "rename"
+SEND_MODE_HARDLINK = "hardlink"
+SEND_MODE_REFLINK = "reflink"
+SEND_MODES = (SEND_MODE_COPY, SEND_MODE_RENAME, SEND_MODE_HARDLINK, SEND_MODE_REFLINK)
+
+# ioctl FICLONE (linux/fs.h): clona os extents do arquivo em btrfs/XFS
+FICLONE = 0x40049409
+
+VERIFY_NONE = "none"
+VERIFY_SAMPLE = "sample"
+VERIFY_FULL = "full"
+VERIFY_MODES = (VERIFY_NONE, VERIFY_SAMPLE, VERIFY_FULL)
+
+COPY_COPY_FILE_RANGE = "copy_file_range"
+COPY_SENDFILE = "sendfile"
+COPY_USERSPACE = "userspace"
+COPY_STRATEGIES = (COPY_COPY_FILE_RANGE, COPY_SENDFILE, COPY_USERSPACE)
+
+SAMPLE_BLOCKS = 16
+SAMPLE_BLOCK_SIZE = 1024 * 1024
+HASH_BLOCK_SIZE = 8 * 1024 * 1024
+
+# Sufixo do arquivo parcial: fora de VIDEO_EXTENSIONS, o Kodi nao o indexa
+PART_SUFFIX = ".kodibot-part"
+
+
+def get_device_id(path):
+    """
+    Retorna o dispositivo (st_dev) de um caminho, subindo ate o primeiro
+    diretorio existente quando o caminho ainda nao foi criado
+    """
+    current = Path(path)
+    while True:
+        try:
+            return os.stat(current).st_dev
+        except FileNotFoundError:
+            if current.parent == current:
+                return None
+            current = current.parent
+
+
+def format_size(num_bytes):
+    """Formata um tamanho em bytes para exibicao (KB, MB, GB...)"""
+    value = float(num_bytes or 0)
+    for unit in ("B", "KB", "MB", "GB", "TB"):
+        if value < 1024 or unit == "TB":
+            return f"{value:.1f} {unit}" if unit != "B" else f"{int(value)} {unit}"
+        value /= 1024
+    return f"{value:.1f} TB"
+
+
+def new_hasher():
+    return hashlib.blake2b(digest_size=32)
+
+
+def read_at(fd, offset, count):
+    """Le ate count bytes a partir de offset sem depender de os.pread (Windows)"""
+    if hasattr(os, "pread"):
+        return os.pread(fd, count, offset)
+    os.lseek(fd, offset, os.SEEK_SET)
+    return os.read(fd, count)
+
+
+def drop_page_cache(fd):
+    """Pede ao kernel para descartar o cache, forcando a releitura do disco/rede"""
+    if hasattr(os, "posix_fadvise"):
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        except OSError:
+            pass
+
+
+def hash_file(path, offset_limit=None):
+    """Calcula o checksum (blake2b) de um arquivo, opcionalmente so ate offset_limit"""
+    hasher = new_hasher()
+    with open(path, "rb") as handle:
+        fd = handle.fileno()
+        drop_page_cache(fd)
+        remaining = offset_limit
+        while remaining is None or remaining > 0:
+            count = HASH_BLOCK_SIZE if remaining is None else min(HASH_BLOCK_SIZE, remaining)
+            data = handle.read(count)
+            if not data:
+                break
+            hasher.update(data)
+            if remaining is not None:
+                remaining -= len(data)
+    return hasher
+
+
+class TransferCancelled(Exception):
+    """Sinaliza que a transferencia foi cancelada pelo usuario"""
+
+
+class TransferVerifyError(Exception):
+    """O arquivo de destino nao confere com a origem"""
+
+
+class TransferJob:
+    """Um arquivo a ser enviado para a pasta do Kodi"""
+
+    def __init__(
+        self,
+        source,
+        destination,
+        move=False,
+        label=None,
+        mode=SEND_MODE_COPY,
+        verify=VERIFY_SAMPLE,
+        media=None,
+    ):
+        self.source = Path(source)
+        self.destination = Path(destination)
+        self.mode = mode if mode in SEND_MODES else SEND_MODE_COPY
+        # Renomear sempre retira o arquivo da origem
+        self.move = move or self.mode == SEND_MODE_RENAME
+        self.label = label or self.source.name
+        self.verify = verify if verify in VERIFY_MODES else VERIFY_SAMPLE
+        self.method = None
+        self.copy_strategy = None
+        self.checksum = None
+        self.verified = False
+        self.size = 0
+        # mtime da origem quando o envio comecou; um parcial so e retomado se bater
+        self.source_mtime_ns = None
+        self.transferred = 0
+        self.status = STATUS_PENDING
+        self.error = None
+        self.started_at = None
+        self.finished_at = None
+        self.journal_id = uuid.uuid4().hex
+        self.temp_path = self.destination.with_name(self.destination.name + PART_SUFFIX)
+        self.resume_offset = 0
+        self.committed = False
+        # Dados TMDB do item ({"type", "result", "series"}), usados apos o envio
+        self.media = media
+
+    @classmethod
+    def from_journal(cls, entry):
+        """Recria um envio interrompido a partir de uma entrada do diario"""
+        job = cls(
+            entry["source"],
+            entry["destination"],
+            move=entry.get("move", False),
+            label=entry.get("label"),
+            mode=entry.get("mode", SEND_MODE_COPY),
+            verify=entry.get("verify", VERIFY_SAMPLE),
+        )
+        job.journal_id = entry["id"]
+        if entry.get("temp"):
+            job.temp_path = Path(entry["temp"])
+        job.size = entry.get("size", 0)
+        job.source_mtime_ns = entry.get("mtime_ns")
+        job.resume_offset = int(entry.get("verified_offset") or 0)
+        job.committed = entry.get("status") == ENTRY_COMMITTED
+        return job
+
+    def refresh_source(self):
+        """
+        Le tamanho e mtime atuais da origem. Se a origem mudou desde o que o
+        diario registrou, o parcial nao serve mais: e apagado e o envio
+        recomeca do zero, em vez de emendar bytes novos nos antigos.
+        """
+        stat = self.source.stat()
+        if self.resume_offset and not self.committed and (stat.st_size, stat.st_mtime_ns) != (
+            self.size,
+            self.source_mtime_ns,
+        ):
+            self.resume_offset = 0
+            self.temp_path.unlink(missing_ok=True)
+            metrics.count("transfer.resume_restarted")
+        self.size = stat.st_size
+        self.source_mtime_ns = stat.st_mtime_ns
+
+    @property
+    def elapsed(self):
+        if self.started_at is None:
+            return 0.0
+        end = self.finished_at if self.finished_at is not None else time.monotonic()
+        return max(end - self.started_at, 0.0)
+
+    @property
+    def throughput(self):
+        """Bytes por segundo deste arquivo"""
+        elapsed = self.elapsed
+        return self.transferred / elapsed if elapsed > 0 else 0.0
+
+    def device_pair(self):
+        return get_device_id(self.source), get_device_id(self.destination.parent)
+
+
+class TransferQueue:
+    """
+    Fila de transferencias executada em threads de trabalho.
+
+    Os arquivos sao agrupados por par de dispositivos (origem, destino) e cada
+    grupo roda em uma unica thread: pares diferentes correm em paralelo, mas um
+    mesmo disco nunca recebe duas copias concorrentes.
+    """
+
+    CHUNK_SIZE = 32 * 1024 * 1024
+    PROGRESS_INTERVAL = 0.1
+    # A cada quantos bytes o destino recebe fsync e o diario grava o offset
+    CHECKPOINT_SIZE = 256 * 1024 * 1024
+
+    def __init__(
+        self,
+        jobs,
+        progress_callback=None,
+        job_finished_callback=None,
+        copy_strategies=COPY_STRATEGIES,
+        journal=None,
+    ):
+        """
+        Args:
+            jobs: Lista de TransferJob
+            progress_callback: Chamado com (job_index, job, total_transferred,
+                total_size, throughput) a partir das threads de trabalho
+            job_finished_callback: Chamado com (job_index, job) ao fim de cada arquivo
+            copy_strategies: Ordem de tentativa da copia (kernel primeiro, userspace por ultimo)
+            journal: TransferJournal opcional para retomar envios interrompidos
+        """
+        self.jobs = list(jobs)
+        self.journal = journal
+        self.copy_strategies = tuple(copy_strategies) or (COPY_USERSPACE,)
+        self.progress_callback = progress_callback
+        self.job_finished_callback = job_finished_callback
+        self._cancel_event = threading.Event()
+        self._lock = threading.Lock()
+        self._last_progress = 0.0
+        self.started_at = None
+        self.finished_at = None
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    def is_cancelled(self):
+        return self._cancel_event.is_set()
+
+    @property
+    def total_size(self):
+        return sum(job.size for job in self.jobs)
+
+    @property
+    def total_transferred(self):
+        return sum(job.transferred for job in self.jobs)
+
+    @property
+    def throughput(self):
+        """Bytes por segundo agregados de toda a fila"""
+        if self.started_at is None:
+            return 0.0
+        end = self.finished_at if self.finished_at is not None else time.monotonic()
+        elapsed = end - self.started_at
+        return self.total_transferred / elapsed if elapsed > 0 else 0.0
+
+    def group_by_device(self):
+        groups = {}
+        for index, job in enumerate(self.jobs):
+            try:
+                key = job.device_pair()
+            except OSError:
+                key = (None, None)
+            groups.setdefault(key, []).append(index)
+        return groups
+
+    def run(self):
+        """Executa todas as transferencias e bloqueia ate o fim"""
+        self.started_at = time.monotonic()
+        for job in self.jobs:
+            try:
+                job.refresh_source()
+            except OSError:
+                if not job.committed:
+                    job.size = 0
+
+        workers = []
+        for indexes in self.group_by_device().values():
+            worker = threading.Thread(target=self._run_group, args=(indexes,), daemon=True)
+            workers.append(worker)
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        self.finished_at = time.monotonic()
+        return self.jobs
+
+    def _run_group(self, indexes):
+        for index in indexes:
+            job = self.jobs[index]
+            if self.is_cancelled():
+                job.status = STATUS_CANCELLED
+                self._notify_finished(index, job)
+                continue
+
+            job.status = STATUS_RUNNING
+            job.started_at = time.monotonic()
+            try:
+                self._transfer(index, job)
+                job.status = STATUS_DONE
+            except TransferCancelled:
+                job.status = STATUS_CANCELLED
+            except Exception as e:
+                job.status = STATUS_FAILED
+                job.error = str(e)
+            job.finished_at = time.monotonic()
+            metrics.record(
+                f"transfer.{job.method or job.mode}", job.finished_at - job.started_at, error=job.status == STATUS_FAILED
+            )
+            metrics.count(f"transfer.{job.status}")
+            if job.status == STATUS_DONE:
+                metrics.count("transfer.bytes", job.transferred)
+            self._notify_progress(index, job, force=True)
+            self._notify_finished(index, job)
+
+    def _transfer(self, index, job):
+        if job.committed:
+            # O app caiu depois do rename final e antes de apagar a origem
+            if job.move and job.destination.exists():
+                job.source.unlink(missing_ok=True)
+            job.transferred = job.size
+            self._journal_remove(job)
+            return
+
+        if job.destination.exists():
+            raise FileExistsError(f"{job.destination.name}: já existe na pasta Kodi")
+
+        same_device = get_device_id(job.source) == get_device_id(job.destination.parent)
+        if job.move and same_device:
+            os.rename(job.source, job.destination)
+            job.method = SEND_MODE_RENAME
+            job.transferred = job.size
+            self._journal_remove(job)
+            return
+
+        if job.mode == SEND_MODE_HARDLINK and same_device:
+            try:
+                os.link(job.source, job.destination)
+                job.method = SEND_MODE_HARDLINK
+                job.transferred = job.size
+                self._journal_remove(job)
+                return
+            except FileExistsError:
+                raise
+            except OSError:
+                # Sistemas de arquivos sem hardlink (FAT, alguns SMB) caem na copia
+                pass
+
+        if self.journal is not None:
+            self.journal.record_planned(job)
+
+        try:
+            if job.mode == SEND_MODE_REFLINK and self._reflink(job):
+                job.method = SEND_MODE_REFLINK
+                job.transferred = job.size
+            else:
+                self._copy_chunked(index, job)
+                job.method = SEND_MODE_COPY
+                self._verify(job)
+            shutil.copystat(job.source, job.temp_path)
+            if job.destination.exists():
+                raise FileExistsError(f"{job.destination.name}: já existe na pasta Kodi")
+            # O nome final so aparece quando o arquivo esta completo e verificado
+            os.replace(job.temp_path, job.destination)
+        except (TransferCancelled, TransferVerifyError, FileExistsError):
+            job.temp_path.unlink(missing_ok=True)
+            self._journal_remove(job)
+            raise
+        except BaseException:
+            # Falha de E/S (rede caiu, disco cheio): com diario o parcial fica para retomar
+            if self.journal is None:
+                job.temp_path.unlink(missing_ok=True)
+            raise
+
+        if self.journal is not None:
+            self.journal.record_committed(job)
+        if job.move:
+            job.source.unlink()
+        self._journal_remove(job)
+
+    def _journal_remove(self, job):
+        if self.journal is not None:
+            self.journal.remove(job)
+
+    @staticmethod
+    def _reflink(job):
+        """Tenta clonar o arquivo via FICLONE; retorna False para cair na copia"""
+        if fcntl is None:
+            return False
+        with open(job.source, "rb") as src, open(job.temp_path, "wb") as dst:
+            try:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+                return True
+            except OSError:
+                pass
+        job.temp_path.unlink(missing_ok=True)
+        return False
+
+    def _copy_chunked(self, index, job):
+        """
+        Copia em blocos grandes pelo kernel (copy_file_range/sendfile), sem
+        passar os dados pelo Python. No modo de verificacao completa o checksum
+        da origem e calculado durante a copia, relendo o bloco recem copiado
+        do cache de paginas.
+        """
+        offset = 0
+        if job.resume_offset and job.temp_path.exists() and job.temp_path.stat().st_size >= job.resume_offset:
+            offset = min(job.resume_offset, job.size)
+        hasher = None
+        if job.verify == VERIFY_FULL:
+            hasher = hash_file(job.source, offset) if offset else new_hasher()
+
+        strategies = list(self.copy_strategies)
+        with open(job.source, "rb") as src, open(job.temp_path, "r+b" if offset else "wb") as dst:
+            src_fd = src.fileno()
+            dst_fd = dst.fileno()
+            # Descarta o que passou do ultimo offset confirmado
+            dst.truncate(offset)
+            job.transferred = offset
+            last_checkpoint = offset
+            while True:
+                if self.is_cancelled():
+                    raise TransferCancelled()
+                count = self.CHUNK_SIZE
+                copied, data = self._copy_range(strategies, src_fd, dst_fd, offset, count)
+                if copied == 0 and offset < job.size and strategies[0] != COPY_USERSPACE:
+                    # Alguns sistemas de arquivos devolvem 0 antes do fim pelo kernel
+                    strategies.pop(0)
+                    continue
+                if copied == 0:
+                    break
+                if hasher is not None:
+                    hasher.update(data if data is not None else read_at(src_fd, offset, copied))
+                offset += copied
+                job.transferred = offset
+                if self.journal is not None and offset - last_checkpoint >= self.CHECKPOINT_SIZE:
+                    os.fsync(dst_fd)
+                    self.journal.record_progress(job, offset)
+                    last_checkpoint = offset
+                self._notify_progress(index, job)
+            job.copy_strategy = strategies[0]
+            if job.verify != VERIFY_NONE:
+                os.fsync(dst_fd)
+        if hasher is not None:
+            job.checksum = hasher.hexdigest()
+
+    @staticmethod
+    def _copy_range(strategies, src_fd, dst_fd, offset, count):
+        """
+        Copia um bloco com a primeira estrategia suportada, descartando as
+        que falharem. Retorna (bytes copiados, dados lidos ou None).
+        """
+        while True:
+            strategy = strategies[0]
+            try:
+                if strategy == COPY_COPY_FILE_RANGE and hasattr(os, "copy_file_range"):
+                    return os.copy_file_range(src_fd, dst_fd, count, offset, offset), None
+                if strategy == COPY_SENDFILE and hasattr(os, "sendfile"):
+                    os.lseek(dst_fd, offset, os.SEEK_SET)
+                    return os.sendfile(dst_fd, src_fd, offset, count), None
+                if strategy == COPY_USERSPACE:
+                    data = read_at(src_fd, offset, count)
+                    os.lseek(dst_fd, offset, os.SEEK_SET)
+                    view = memoryview(data)
+                    while view:
+                        written = os.write(dst_fd, view)
+                        view = view[written:]
+                    return len(data), data
+            except OSError:
+                if strategy == COPY_USERSPACE:
+                    raise
+            # Estrategia indisponivel (kernel antigo, EXDEV, SMB...): tenta a proxima
+            strategies.pop(0)
+            if not strategies:
+                strategies.append(COPY_USERSPACE)
+
+    @staticmethod
+    def _verify(job):
+        """Confere o destino antes de qualquer remocao da origem"""
+        if job.verify == VERIFY_NONE:
+            return
+
+        source_size = job.source.stat().st_size
+        destination_size = job.temp_path.stat().st_size
+        if source_size != destination_size:
+            raise TransferVerifyError(
+                f"falha na verificacao: tamanho {destination_size} difere da origem ({source_size})"
+            )
+
+        if job.verify == VERIFY_FULL:
+            if hash_file(job.temp_path).hexdigest() != job.checksum:
+                raise TransferVerifyError("falha na verificacao: checksum do destino difere da origem")
+            job.verified = True
+            return
+
+        if source_size == 0:
+            job.verified = True
+            return
+        step = max(source_size // SAMPLE_BLOCKS, 1)
+        offsets = sorted({min(i * step, max(source_size - SAMPLE_BLOCK_SIZE, 0)) for i in range(SAMPLE_BLOCKS)})
+        offsets.append(max(source_size - SAMPLE_BLOCK_SIZE, 0))
+        with open(job.source, "rb") as src, open(job.temp_path, "rb") as dst:
+            drop_page_cache(dst.fileno())
+            for offset in offsets:
+                if read_at(src.fileno(), offset, SAMPLE_BLOCK_SIZE) != read_at(dst.fileno(), offset, SAMPLE_BLOCK_SIZE):
+                    raise TransferVerifyError(f"falha na verificacao: bloco no offset {offset} difere da origem")
+        job.verified = True
+
+    def _notify_progress(self, index, job, force=False):
+        if not self.progress_callback:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._last_progress < self.PROGRESS_INTERVAL:
+                return
+            self._last_progress = now
+        self.progress_callback(index, job, self.total_transferred, self.total_size, self.throughput)
+
+    def _notify_finished(self, index, job):
+        if self.job_finished_callback:
+            self.job_finished_callback(index, job)
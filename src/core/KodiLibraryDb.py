@@ -0,0 +1,218 @@
+"""
+Leitura do banco de videos do Kodi (MyVideosNNN.db, Kodi 17 ou mais novo)
+
+O banco e aberto somente leitura e so como arquivo local: o SQLite nao
+tem travas confiaveis em compartilhamentos de rede, e o Kodi pode estar
+gravando nele. Com KODI_DB_PATH configurado, a biblioteca do Kodi
+(filmes, series e episodios com ids TMDB/IMDb) substitui a varredura da
+pasta Kodi no painel e na checagem de duplicados.
+"""
+
+import re
+import sqlite3
+from pathlib import Path
+
+from src.core import metrics
+from src.core.config import get_setting
+
+DATABASE_PATTERN = re.compile(r"^MyVideos(\d+)\.db$", re.IGNORECASE)
+
+
+def find_video_database(path):
+    """O proprio arquivo, ou o MyVideosNNN.db mais novo da pasta Database do Kodi"""
+    path = Path(path)
+    if path.is_file():
+        return path
+    if not path.is_dir():
+        return None
+    candidates = []
+    for child in path.iterdir():
+        match = DATABASE_PATTERN.match(child.name)
+        if match and child.is_file():
+            candidates.append((int(match.group(1)), child))
+    return max(candidates)[1] if candidates else None
+
+
+def is_local_path(path):
+    text = str(path)
+    return "://" not in text and not text.startswith(("\\\\", "//"))
+
+
+def open_read_only(path):
+    if not is_local_path(path):
+        raise ValueError(f"O banco do Kodi precisa ser um arquivo local: {path}")
+    return sqlite3.connect(f"{Path(path).resolve().as_uri()}?mode=ro", uri=True)
+
+
+def _year(date):
+    date = str(date or "")
+    return date[:4] if date[:4].isdigit() else ""
+
+
+def _number(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class KodiLibrary:
+    """
+    Filmes, series e episodios indexados pelo Kodi. Os caminhos ficam
+    relativos a pasta Kodi (como o Kodi a enxerga), no mesmo formato do
+    indice que a varredura da pasta produz.
+    """
+
+    def __init__(self, movies=None, shows=None, episodes=None, root=None):
+        self.movies = movies or []
+        self.shows = shows or []
+        self.episodes = episodes or []
+        self.root = root or ""
+        self._movie_ids = None
+        self._episode_ids = None
+
+    @classmethod
+    def from_settings(cls, kodi_root):
+        """
+        Carrega o banco de KODI_DB_PATH (arquivo ou pasta Database). Os
+        caminhos sao relativos a KODI_RPC_PATH ou, sem ele, a pasta Kodi
+        local. Retorna None quando KODI_DB_PATH esta vazio.
+        """
+        configured = (get_setting("KODI_DB_PATH") or "").strip()
+        if not configured:
+            return None
+        database = find_video_database(configured) if is_local_path(configured) else configured
+        if database is None:
+            raise ValueError(f"Banco MyVideos nao encontrado em {configured}")
+        root = (get_setting("KODI_RPC_PATH") or "").strip() or str(kodi_root or "")
+        return cls.load(database, root)
+
+    @classmethod
+    def load(cls, database, root=""):
+        with metrics.span("kodi.db"):
+            connection = open_read_only(database)
+            try:
+                connection.row_factory = sqlite3.Row
+                ids = cls._load_unique_ids(connection)
+                movies = [
+                    {
+                        "title": row["c00"],
+                        "year": _year(cls._column(row, "premiered") or cls._column(row, "c07")),
+                        "file": cls._file_path(row),
+                        **ids.get(("movie", row["idMovie"]), cls._legacy_ids(row)),
+                    }
+                    for row in connection.execute("SELECT * FROM movie_view")
+                ]
+                shows = {}
+                for row in connection.execute("SELECT * FROM tvshow_view"):
+                    shows[row["idShow"]] = {
+                        "title": row["c00"],
+                        "year": _year(row["c05"]),
+                        "folder": row["strPath"] or "",
+                        **ids.get(("tvshow", row["idShow"]), {}),
+                    }
+                episodes = []
+                for row in connection.execute("SELECT * FROM episode_view"):
+                    show = shows.get(row["idShow"], {})
+                    episodes.append(
+                        {
+                            "title": row["c00"],
+                            "season": _number(row["c12"]),
+                            "episode": _number(row["c13"]),
+                            "file": cls._file_path(row),
+                            "show_title": show.get("title", ""),
+                            "show_year": show.get("year", ""),
+                            "show_tmdb": show.get("tmdb"),
+                            "show_imdb": show.get("imdb"),
+                        }
+                    )
+            except sqlite3.Error as e:
+                raise ValueError(f"Banco do Kodi invalido ou versao nao suportada: {e}")
+            finally:
+                connection.close()
+        metrics.count("kodi.db.items", len(movies) + len(episodes))
+        return cls(movies, list(shows.values()), episodes, root)
+
+    @staticmethod
+    def _column(row, name):
+        return row[name] if name in row.keys() else None
+
+    @staticmethod
+    def _file_path(row):
+        filename = row["strFileName"] or ""
+        # Arquivos em partes (stack://) e caminhos completos ja vem prontos
+        if "://" in filename:
+            return filename
+        return f"{row['strPath'] or ''}{filename}"
+
+    @staticmethod
+    def _legacy_ids(row):
+        """Bancos antigos sem a tabela uniqueid guardam o id do IMDb em c09"""
+        value = str(KodiLibrary._column(row, "c09") or "")
+        return {"imdb": value} if value.startswith("tt") else {}
+
+    @staticmethod
+    def _load_unique_ids(connection):
+        ids = {}
+        try:
+            rows = connection.execute("SELECT media_id, media_type, type, value FROM uniqueid")
+            for row in rows:
+                source = (row["type"] or "").lower()
+                if source in ("tmdb", "imdb") and row["value"]:
+                    ids.setdefault((row["media_type"], row["media_id"]), {})[source] = str(row["value"])
+        except sqlite3.OperationalError:
+            return {}
+        return ids
+
+    def relative_path(self, path):
+        """Caminho relativo (posix) a raiz, ou None se estiver fora dela"""
+        root = self.root.replace("\\", "/").rstrip("/") + "/"
+        path = (path or "").replace("\\", "/")
+        if not root.strip("/") or not path.lower().startswith(root.lower()):
+            return None
+        return path[len(root):]
+
+    def relative_paths(self):
+        """Arquivos da biblioteca dentro da pasta Kodi, para o painel e o indice de duplicados"""
+        paths = (self.relative_path(entry["file"]) for entry in self.movies + self.episodes)
+        return sorted({path for path in paths if path}, key=str.lower)
+
+    def _build_id_index(self):
+        self._movie_ids = set()
+        for movie in self.movies:
+            for source in ("tmdb", "imdb"):
+                if movie.get(source):
+                    self._movie_ids.add((source, movie[source]))
+        self._episode_ids = set()
+        for episode in self.episodes:
+            for source in ("tmdb", "imdb"):
+                if episode.get(f"show_{source}"):
+                    self._episode_ids.add((source, episode[f"show_{source}"], episode["season"], episode["episode"]))
+
+    def contains_media(self, media):
+        """True se o resultado TMDB escolhido (media do TransferJob) ja esta na biblioteca"""
+        result = (media or {}).get("result")
+        if not result:
+            return False
+        if self._movie_ids is None:
+            self._build_id_index()
+        if media.get("type") == "tv":
+            series = media.get("series") or {}
+            season = _number(result.get("season_number"))
+            episode = _number(result.get("episode_number"))
+            return any(
+                (source, value, season, episode) in self._episode_ids
+                for source, value in _media_ids(series)
+            )
+        return any(key in self._movie_ids for key in _media_ids(result))
+
+
+def _media_ids(result):
+    """[(fonte, id)] de um resultado TMDB, no formato da tabela uniqueid do Kodi"""
+    keys = []
+    if result.get("id") is not None:
+        keys.append(("tmdb", str(result["id"])))
+    imdb_id = result.get("imdb_id") or (result.get("external_ids") or {}).get("imdb_id")
+    if imdb_id:
+        keys.append(("imdb", imdb_id))
+    return keys
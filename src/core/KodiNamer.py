@@ -12,6 +12,16 @@ class KodiNamer:
     
     # Caracteres inválidos para nomes de arquivos no Windows/Linux
     INVALID_CHARS = r'[<>:"/\\|?*]'
+
+    # Ids embutidos no nome: tt0133093, imdbid-tt0133093, tmdbid-603, {tmdb-603}, [tmdbid=603]
+    IMDB_ID_PATTERN = r"(?<![a-z0-9])(?:imdb(?:id)?[-=_ ]?)?(tt\d{7,9})(?![0-9])"
+    TMDB_ID_PATTERN = r"(?<![a-z0-9])tmdb(?:id)?[-=_ ]?(\d+)(?![0-9])"
+
+    # Tags de release/qualidade que nao fazem parte do titulo
+    RELEASE_TAGS_PATTERN = r"\b(\d{3,4}p|\d{3,4}i|4k|uhd|hdr|10bit|dublado|dual|dual\s*audio|dual\s*5\.1|5\.1|camrip|webrip|web[-\s]?dl|web\s*rip|web|hdrip|brrip|blu\s*ray|bluray|remux|proper|repack|extended|unrated|dc|ltd|xvid|x264|x265|h264|h265|dvdrip|dvd|subs|hdcam|cam|ts|tc|sdr|2160p|web-dl|h265|aoc|ddp5|atmos|r5)\b"
+
+    # Marcador de episodio: S01E01 ou 1x01
+    EPISODE_MARKER_PATTERN = r"\bS\d{1,2}E\d{1,2}\b|\b\d{1,2}x\d{1,2}\b"
     
     @staticmethod
     def sanitize_filename(filename):
@@ -40,17 +50,15 @@ class KodiNamer:
     def clean_filename(filename):
         """Remove extensão e caracteres especiais do nome do arquivo e captura o ano"""
         name, _ = os.path.splitext(filename)
+        # Ids (tt0133093, tmdbid-603) nao fazem parte do titulo nem do ano
+        name = re.sub(KodiNamer.IMDB_ID_PATTERN, " ", name, flags=re.IGNORECASE)
+        name = re.sub(KodiNamer.TMDB_ID_PATTERN, " ", name, flags=re.IGNORECASE)
         year_match = re.search(r"\b(19\d{2}|20\d{2})\b", name)
         year = int(year_match.group(1)) if year_match else None
         name = name.replace('.', ' ').replace('-', ' ')
         clean_name = name.lower()
         
-        clean_name = re.sub(
-            r"\b(\d{3,4}p|\d{3,4}i|4k|uhd|hdr|10bit|dublado|dual|dual\s*audio|dual\s*5\.1|5\.1|camrip|webrip|web[-\s]?dl|web\s*rip|web|hdrip|brrip|blu\s*ray|bluray|remux|proper|repack|extended|unrated|dc|ltd|xvid|x264|x265|h264|h265|dvdrip|dvd|subs|hdcam|cam|ts|tc|sdr|2160p|web-dl|h265|aoc|ddp5|atmos|r5)\b",
-            " ",
-            clean_name,
-            flags=re.IGNORECASE,
-        )
+        clean_name = re.sub(KodiNamer.RELEASE_TAGS_PATTERN, " ", clean_name, flags=re.IGNORECASE)
         clean_name = re.sub(r'\s+', ' ', clean_name)
         clean_name = re.sub(r'[^\w\s]', '', clean_name)
         # Remove qualquer numero do nome
@@ -58,6 +66,23 @@ class KodiNamer:
         clean_name = re.sub(r'\s+', ' ', clean_name)
         return clean_name.strip(), year
     
+    @staticmethod
+    def extract_external_ids(text):
+        """
+        Ids TMDB/IMDb embutidos em um nome de arquivo ou pasta
+
+        Returns:
+            {"tmdb": "603", "imdb": "tt0133093"} so com os ids encontrados
+        """
+        ids = {}
+        tmdb_match = re.search(KodiNamer.TMDB_ID_PATTERN, text or "", re.IGNORECASE)
+        if tmdb_match:
+            ids["tmdb"] = tmdb_match.group(1)
+        imdb_match = re.search(KodiNamer.IMDB_ID_PATTERN, text or "", re.IGNORECASE)
+        if imdb_match:
+            ids["imdb"] = imdb_match.group(1).lower()
+        return ids
+
     @staticmethod
     def format_kodi_name(title, year):
         """
@@ -73,7 +98,7 @@ class KodiNamer:
         return KodiNamer.KODI_FORMAT.format(title=title.strip(), year=year)
     
     @staticmethod
-    def suggest_kodi_filename(original_filename, tmdb_title, tmdb_year):
+    def suggest_kodi_filename(original_filename, tmdb_title, tmdb_year, quality=None):
         """
         Sugere um novo nome de arquivo compatível com Kodi
         
@@ -81,6 +106,7 @@ class KodiNamer:
             original_filename: Nome do arquivo original
             tmdb_title: Título do TMDB
             tmdb_year: Ano do TMDB
+            quality: Resolução opcional ao final (ex.: "1080p"), que o Kodi ignora ao identificar
             
         Returns:
             Novo nome de arquivo sugerido
@@ -89,6 +115,8 @@ class KodiNamer:
         # Sanitiza o título antes de formatar
         clean_title = KodiNamer.sanitize_filename(tmdb_title)
         kodi_name = KodiNamer.format_kodi_name(clean_title, tmdb_year)
+        if quality:
+            kodi_name = f"{kodi_name} {quality}"
         return kodi_name + ext
 
     @staticmethod
@@ -102,7 +130,19 @@ class KodiNamer:
         return None, None
 
     @staticmethod
-    def suggest_episode_filename(original_filename, series_title, season, episode, episode_title):
+    def extract_series_name(filename):
+        """Retorna o nome da serie (texto antes de S01E01/1x01) limpo para busca e o ano"""
+        name, ext = os.path.splitext(filename)
+        match = re.search(KodiNamer.EPISODE_MARKER_PATTERN, name, re.IGNORECASE)
+        if match:
+            name = name[:match.start()]
+        if not name.strip(" .-_"):
+            # "S01E01.mkv": sem nome antes do episodio (a extensao nao vira titulo)
+            return "", None
+        return KodiNamer.clean_filename(name + ext)
+
+    @staticmethod
+    def suggest_episode_filename(original_filename, series_title, season, episode, episode_title, quality=None):
         _, ext = os.path.splitext(original_filename)
         season_str = f"S{int(season):02d}" if season is not None else "S00"
         episode_str = f"E{int(episode):02d}" if episode is not None else "E00"
@@ -112,6 +152,8 @@ class KodiNamer:
         base = f"{clean_series_title} - {season_str}{episode_str}"
         if title:
             base = f"{base} - {title}"
+        if quality:
+            base = f"{base} {quality}"
         return f"{base}{ext}"
 
     @staticmethod
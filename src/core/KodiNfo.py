@@ -0,0 +1,218 @@
+"""
+Arquivos .nfo no formato do Kodi (movie, tvshow e episodedetails)
+
+Gerados a partir dos dados do TMDB que o KodiBot ja buscou, com o id TMDB
+como uniqueid padrao: o Kodi importa o item sem consultar o scraper.
+"""
+
+import os
+import re
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from src.core import metrics
+from src.core.FileTransfer import STATUS_DONE
+from src.core.KodiNamer import KodiNamer
+
+IMAGE_BASE_URL = "https://image.tmdb.org/t/p/original"
+TVSHOW_NFO = "tvshow.nfo"
+MOVIE_NFO = "movie.nfo"
+# .nfo de release costuma ser pequeno; arquivos maiores nao sao lidos inteiros
+MAX_NFO_BYTES = 256 * 1024
+
+NFO_TMDB_PATTERNS = (
+    r"<uniqueid[^>]*type=[\"']tmdb[\"'][^>]*>\s*(\d+)\s*<",
+    r"<tmdbid>\s*(\d+)\s*<",
+    r"themoviedb\.org/(?:movie|tv)/(\d+)",
+)
+
+
+def nfo_path(video_path):
+    return Path(video_path).with_suffix(".nfo")
+
+
+def series_folder(video_path, kodi_root):
+    """
+    Pasta da serie (<Kodi>/Series/<Serie>) de um episodio enviado, ou None
+    quando o destino nao fica dentro de Series/<Serie>/ (ex.: episodio solto
+    na pasta Kodi): nesse caso nao ha onde gravar tvshow.nfo e as artes da serie
+    """
+    kodi_root = Path(kodi_root)
+    try:
+        parts = Path(video_path).relative_to(kodi_root).parts
+    except ValueError:
+        return None
+    if len(parts) < 3 or parts[0] != "Series":
+        return None
+    return kodi_root.joinpath(*parts[:2])
+
+
+def _year(date):
+    return date.split("-")[0] if date else ""
+
+
+def _add(parent, tag, value, **attrib):
+    if value in (None, "", []):
+        return None
+    element = ET.SubElement(parent, tag, attrib)
+    element.text = str(value)
+    return element
+
+
+def _add_rating(root, result):
+    if result.get("vote_average") is None:
+        return
+    ratings = ET.SubElement(root, "ratings")
+    rating = ET.SubElement(ratings, "rating", {"name": "themoviedb", "max": "10", "default": "true"})
+    _add(rating, "value", result.get("vote_average"))
+    _add(rating, "votes", result.get("vote_count"))
+
+
+def _add_common(root, result, media_type):
+    """Campos que existem tanto na busca quanto nos detalhes do TMDB"""
+    _add(root, "plot", result.get("overview"))
+    _add(root, "tagline", result.get("tagline"))
+    _add_rating(root, result)
+    _add(root, "uniqueid", result.get("id"), type="tmdb", default="true")
+    imdb_id = result.get("imdb_id") or (result.get("external_ids") or {}).get("imdb_id")
+    _add(root, "uniqueid", imdb_id, type="imdb")
+    for genre in result.get("genres") or []:
+        _add(root, "genre", genre.get("name"))
+    if media_type != "episode":
+        _add(root, "thumb", _image_url(result.get("poster_path")), aspect="poster")
+        backdrop = _image_url(result.get("backdrop_path"))
+        if backdrop:
+            fanart = ET.SubElement(root, "fanart")
+            _add(fanart, "thumb", backdrop)
+
+
+def _image_url(path):
+    return f"{IMAGE_BASE_URL}{path}" if path else None
+
+
+def _indent(element, level=0):
+    """Recuo de dois espacos por nivel (ET.indent so existe a partir do Python 3.9)"""
+    padding = "\n" + "  " * level
+    if len(element):
+        if not (element.text or "").strip():
+            element.text = padding + "  "
+        for child in element:
+            _indent(child, level + 1)
+        if not (child.tail or "").strip():
+            child.tail = padding
+    if level and not (element.tail or "").strip():
+        element.tail = padding
+
+
+def _to_xml(root):
+    _indent(root)
+    return '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n' + ET.tostring(root, encoding="unicode") + "\n"
+
+
+def build_movie_nfo(movie):
+    root = ET.Element("movie")
+    _add(root, "title", movie.get("title"))
+    _add(root, "originaltitle", movie.get("original_title"))
+    _add(root, "year", _year(movie.get("release_date")))
+    _add(root, "premiered", movie.get("release_date"))
+    _add(root, "runtime", movie.get("runtime"))
+    _add_common(root, movie, "movie")
+    return _to_xml(root)
+
+
+def build_tvshow_nfo(series):
+    root = ET.Element("tvshow")
+    _add(root, "title", series.get("name"))
+    _add(root, "originaltitle", series.get("original_name"))
+    _add(root, "year", _year(series.get("first_air_date")))
+    _add(root, "premiered", series.get("first_air_date"))
+    _add_common(root, series, "tvshow")
+    return _to_xml(root)
+
+
+def build_episode_nfo(episode, series=None):
+    root = ET.Element("episodedetails")
+    _add(root, "title", episode.get("name"))
+    _add(root, "showtitle", (series or {}).get("name"))
+    _add(root, "season", episode.get("season_number"))
+    _add(root, "episode", episode.get("episode_number"))
+    _add(root, "aired", episode.get("air_date"))
+    _add(root, "runtime", episode.get("runtime"))
+    _add_common(root, episode, "episode")
+    _add(root, "thumb", _image_url(episode.get("still_path")))
+    return _to_xml(root)
+
+
+def read_nfo_ids(path):
+    """
+    Ids TMDB/IMDb de um .nfo existente (XML do Kodi, ou so a URL do IMDb/TMDB
+    como nos .nfo de release). Retorna {} se nao houver ou nao der para ler.
+    """
+    try:
+        with open(path, "rb") as handle:
+            text = handle.read(MAX_NFO_BYTES).decode("utf-8", errors="ignore")
+    except OSError:
+        return {}
+
+    ids = {}
+    for pattern in NFO_TMDB_PATTERNS:
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            ids["tmdb"] = match.group(1)
+            break
+    imdb_id = KodiNamer.extract_external_ids(text).get("imdb")
+    if imdb_id:
+        ids["imdb"] = imdb_id
+    return ids
+
+
+def write_text_atomic(path, text):
+    path = Path(path)
+    temp_path = path.with_name(path.name + ".tmp")
+    temp_path.write_text(text, encoding="utf-8")
+    os.replace(temp_path, path)
+
+
+def write_job_nfo(job, kodi_root):
+    """
+    Grava o .nfo ao lado do arquivo enviado (e o tvshow.nfo da serie, se
+    ainda nao existir e o episodio estiver em Series/<Serie>/). Retorna os
+    caminhos gravados.
+    """
+    media = job.media or {}
+    result = media.get("result")
+    if not result:
+        return []
+
+    written = []
+    if media.get("type") == "tv":
+        series = media.get("series")
+        folder = series_folder(job.destination, kodi_root) if series else None
+        if folder is not None:
+            show_nfo = folder / TVSHOW_NFO
+            if not show_nfo.exists():
+                write_text_atomic(show_nfo, build_tvshow_nfo(series))
+                written.append(show_nfo)
+        text = build_episode_nfo(result, series)
+    else:
+        text = build_movie_nfo(result)
+
+    path = nfo_path(job.destination)
+    write_text_atomic(path, text)
+    written.append(path)
+    return written
+
+
+def write_nfo_files(jobs, kodi_root):
+    """Grava os .nfo dos envios concluidos. Retorna (caminhos, erros)"""
+    written = []
+    errors = []
+    for job in jobs:
+        if job.status != STATUS_DONE:
+            continue
+        try:
+            with metrics.span("nfo.write"):
+                written.extend(write_job_nfo(job, kodi_root))
+        except OSError as e:
+            errors.append(f"{job.label}: erro ao gravar .nfo ({e})")
+    return written, errors
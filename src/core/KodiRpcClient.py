@@ -0,0 +1,140 @@
+from pathlib import Path, PurePosixPath
+
+from src.core import metrics
+from src.core.config import get_setting
+from src.core.FileTransfer import STATUS_DONE
+from src.core.TmdbClient import get_requests
+
+
+class KodiRpcClient:
+    """
+    Cliente JSON-RPC do Kodi para atualizar a biblioteca so nas pastas que
+    receberam arquivos, em vez de varrer a biblioteca inteira
+    """
+
+    def __init__(self, url, kodi_root, remote_root=None, user=None, password=None, timeout=10):
+        """
+        Args:
+            url: Endpoint JSON-RPC (ex.: http://kodi.local:8080/jsonrpc)
+            kodi_root: Pasta Kodi local usada pelo KodiBot
+            remote_root: A mesma pasta vista pelo Kodi (ex.: smb://nas/kodi/);
+                sem ela, o caminho local e enviado como esta
+            user, password: Credenciais do servidor web do Kodi
+        """
+        self.url = url
+        self.kodi_root = Path(kodi_root)
+        self.remote_root = remote_root or ""
+        self.auth = (user, password or "") if user else None
+        self.timeout = timeout
+
+    @classmethod
+    def from_settings(cls, kodi_root):
+        """Retorna o cliente configurado ou None quando KODI_RPC_URL esta vazio"""
+        url = (get_setting("KODI_RPC_URL") or "").strip()
+        if not url or not kodi_root:
+            return None
+        return cls(
+            url,
+            kodi_root,
+            remote_root=(get_setting("KODI_RPC_PATH") or "").strip() or None,
+            user=(get_setting("KODI_RPC_USER") or "").strip() or None,
+            password=get_setting("KODI_RPC_PASSWORD"),
+        )
+
+    def library_target(self, destination):
+        """
+        O que o Kodi deve varrer para um arquivo enviado: series sao varridas
+        pela pasta da serie (Series/<Serie>), que e o que o scraper de TV
+        espera; arquivos soltos na raiz (ou em Series/) sao varridos pelo
+        proprio arquivo, para nunca pedir a biblioteca inteira
+        """
+        destination = Path(destination)
+        folder = destination.parent
+        try:
+            parts = folder.relative_to(self.kodi_root).parts
+        except ValueError:
+            return folder
+        if len(parts) > 1 and parts[0] == "Series":
+            return self.kodi_root.joinpath(*parts[:2])
+        if parts in ((), ("Series",)):
+            return destination
+        return folder
+
+    def to_remote_path(self, path, folder=True):
+        """Caminho como o Kodi ve; pastas terminam com separador, arquivos nao"""
+        path = Path(path)
+        if self.remote_root:
+            relative = PurePosixPath(*path.relative_to(self.kodi_root).parts).as_posix()
+            remote = self.remote_root.rstrip("/\\")
+            remote_path = remote if relative == "." else f"{remote}/{relative}"
+            return remote_path + "/" if folder else remote_path
+        if not folder:
+            return str(path)
+        separator = "\\" if "\\" in str(path) else "/"
+        return str(path).rstrip("/\\") + separator
+
+    def coalesce(self, destinations):
+        """
+        Um alvo por pasta (ou arquivo solto); alvos dentro de uma pasta ja
+        listada sao descartados. A raiz Kodi nunca e um alvo.
+        """
+        targets = {self.library_target(destination) for destination in destinations}
+        targets.discard(self.kodi_root)
+        kept = []
+        for target in sorted(targets, key=lambda path: len(path.parts)):
+            if any(parent == target or parent in target.parents for parent in kept):
+                continue
+            kept.append(target)
+        return sorted(kept, key=str)
+
+    def call(self, payload):
+        requests = get_requests()
+        try:
+            with metrics.span("kodi.rpc"):
+                response = requests.post(self.url, json=payload, auth=self.auth, timeout=self.timeout)
+                response.raise_for_status()
+                return response.json()
+        except (requests.RequestException, ValueError) as e:
+            raise Exception(f"Erro ao falar com o Kodi: {str(e)}")
+
+    def scan_directories(self, destinations):
+        """
+        Pede ao Kodi um VideoLibrary.Scan por alvo de coalesce(), todos em uma
+        unica requisicao JSON-RPC em lote. Retorna os caminhos enviados.
+        """
+        files = {Path(destination) for destination in destinations}
+        directories = [self.to_remote_path(target, folder=target not in files) for target in self.coalesce(files)]
+        if not directories:
+            return []
+        batch = [
+            {
+                "jsonrpc": "2.0",
+                "method": "VideoLibrary.Scan",
+                "params": {"directory": directory, "showdialogs": False},
+                "id": index,
+            }
+            for index, directory in enumerate(directories, start=1)
+        ]
+        responses = self.call(batch)
+        if isinstance(responses, dict):
+            responses = [responses]
+        errors = [response["error"].get("message", "erro") for response in responses or [] if response.get("error")]
+        if errors:
+            raise Exception(f"Kodi recusou a atualizacao: {'; '.join(errors)}")
+        return directories
+
+
+def sent_files(jobs):
+    return {job.destination for job in jobs if job.status == STATUS_DONE}
+
+
+def update_kodi_library(jobs, kodi_root):
+    """
+    Atualiza a biblioteca do Kodi com os destinos dos envios concluidos, se
+    o JSON-RPC estiver configurado. Retorna os caminhos pedidos ao Kodi.
+    """
+    client = KodiRpcClient.from_settings(kodi_root)
+    destinations = sent_files(jobs)
+    if client is None or not destinations:
+        return []
+    return client.scan_directories(destinations)
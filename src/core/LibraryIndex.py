@@ -0,0 +1,147 @@
+"""
+Indice por titulo/ano (filmes) e serie/temporada/episodio do que ja esta
+na biblioteca do Kodi, para pular a busca no TMDB de arquivos repetidos
+
+As chaves usam os mesmos padroes da busca (KodiNamer), entao
+"Inception.2010.1080p.mkv" e "Inception (2010).mkv" caem na mesma chave;
+ao contrario da limpeza para busca, os numeros do titulo ficam, para que
+"Toy Story 3" e "1917" nao se confundam com outros titulos.
+Vem da varredura da pasta Kodi e, com KODI_DB_PATH, tambem dos titulos do
+banco do Kodi.
+"""
+
+import os
+import re
+import unicodedata
+from pathlib import PurePosixPath
+
+from src.core import metrics
+from src.core.KodiNamer import KodiNamer
+
+SEASON_FOLDER_PATTERN = re.compile(r"^(temporada|season|staffel|saison)\s*\d+$", re.IGNORECASE)
+YEAR_PATTERN = re.compile(r"\b(19\d{2}|20\d{2})\b")
+
+
+def title_key(title):
+    """Titulo sem acentos, pontuacao e caixa; os numeros ficam ("Toy Story 3" != "Toy Story")"""
+    title = unicodedata.normalize("NFKD", title or "")
+    title = "".join(char for char in title if not unicodedata.combining(char)).lower()
+    title = re.sub(r"[^a-z0-9\s]", " ", title)
+    return re.sub(r"\s+", " ", title).strip()
+
+
+def split_title(name):
+    """
+    (titulo, ano) de um nome sem extensao, mantendo os numeros do titulo.
+    O ano e o ultimo ano que vem depois de algum texto ("1917 (2019)",
+    "Blade Runner 2049 (2017)"); o que vem depois dele (tags de release)
+    e descartado.
+    """
+    name = re.sub(KodiNamer.IMDB_ID_PATTERN, " ", name, flags=re.IGNORECASE)
+    name = re.sub(KodiNamer.TMDB_ID_PATTERN, " ", name, flags=re.IGNORECASE)
+    name = name.replace(".", " ").replace("_", " ")
+    year = None
+    for match in YEAR_PATTERN.finditer(name):
+        if title_key(name[:match.start()]):
+            year = match
+    if year is not None:
+        name = name[:year.start()]
+    name = re.sub(KodiNamer.RELEASE_TAGS_PATTERN, " ", name, flags=re.IGNORECASE)
+    return name.strip(" -([{"), int(year.group(1)) if year is not None else None
+
+
+def _year(value):
+    value = str(value or "")
+    return int(value) if value.isdigit() else None
+
+
+def _series_part(filename):
+    """Texto antes de S01E01/1x01, sem a extensao"""
+    name = os.path.splitext(filename)[0]
+    match = re.search(KodiNamer.EPISODE_MARKER_PATTERN, name, re.IGNORECASE)
+    return name[:match.start()] if match else name
+
+
+def parse_name(filename, media_type):
+    """
+    Chave de um arquivo: ("movie", titulo, ano), ("tv", serie, ano, temporada,
+    episodio) ou None quando o nome nao basta
+    """
+    if media_type == "tv":
+        season, episode = KodiNamer.extract_episode_info(filename)
+        if episode is None:
+            return None
+        series, year = split_title(_series_part(filename))
+        return ("tv", title_key(series), year, season if season is not None else 1, episode)
+    title, year = split_title(os.path.splitext(filename)[0])
+    return ("movie", title_key(title), year)
+
+
+class LibraryIndex:
+    def __init__(self):
+        # (tipo, titulo[, temporada, episodio]) -> {ano ou None: caminho na biblioteca}
+        self._entries = {}
+
+    @classmethod
+    def build(cls, kodi_entries, kodi_library=None):
+        """Indice dos caminhos relativos da pasta Kodi e, se houver, da KodiLibrary"""
+        index = cls()
+        with metrics.span("library.index"):
+            for relative in kodi_entries or []:
+                index.add_path(relative)
+            if kodi_library is not None:
+                for movie in kodi_library.movies:
+                    path = kodi_library.relative_path(movie["file"]) or movie["file"]
+                    index.add(("movie", title_key(movie["title"])), _year(movie.get("year")), path)
+                for episode in kodi_library.episodes:
+                    if episode.get("episode") is None:
+                        continue
+                    path = kodi_library.relative_path(episode["file"]) or episode["file"]
+                    key = ("tv", title_key(episode["show_title"]), episode["season"] or 1, episode["episode"])
+                    index.add(key, _year(episode.get("show_year")), path)
+        return index
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, key, year, path):
+        if not key[1]:
+            return
+        self._entries.setdefault(key, {}).setdefault(year, path)
+
+    def add_path(self, relative):
+        """Arquivo da pasta Kodi; episodios sem a serie no nome usam a pasta da serie"""
+        path = PurePosixPath(relative)
+        season, episode = KodiNamer.extract_episode_info(path.name)
+        if episode is None:
+            title, year = split_title(path.stem)
+            self.add(("movie", title_key(title)), year, relative)
+            return
+        series, year = split_title(_series_part(path.name))
+        if not title_key(series):
+            folders = [part for part in path.parts[:-1] if not SEASON_FOLDER_PATTERN.match(part)]
+            if folders:
+                series, year = split_title(folders[-1])
+        self.add(("tv", title_key(series), season if season is not None else 1, episode), year, relative)
+
+    def match(self, key):
+        """
+        Caminho na biblioteca para a chave de parse_name(), ou None. O ano
+        precisa bater; sem ano de um dos lados, so vale se o titulo (com os
+        numeros) tiver uma unica entrada.
+        """
+        if key is None or not key[1]:
+            return None
+        media_type, title, year = key[0], key[1], key[2]
+        lookup = (media_type, title) if media_type == "movie" else (media_type, title, key[3], key[4])
+        years = self._entries.get(lookup)
+        if not years:
+            return None
+        if year is not None and year in years:
+            return years[year]
+        if len(years) == 1 and (year is None or None in years):
+            return next(iter(years.values()))
+        return None
+
+    def match_name(self, filename, media_type):
+        return self.match(parse_name(filename, media_type))
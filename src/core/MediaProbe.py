@@ -0,0 +1,398 @@
+"""
+Leitura do cabecalho de arquivos Matroska (.mkv) e MP4 (.mp4/.m4v/.mov)
+
+Sem ffprobe nem dependencias: o arquivo e mapeado (mmap) e so os
+elementos do cabecalho sao lidos (Info/Tracks no Matroska, moov no MP4),
+entao o sistema operacional traz do disco ou do compartilhamento apenas
+as poucas paginas tocadas. Resultado:
+
+    {"container": "matroska", "duration": 8880.5, "title": "Inception (2010)",
+     "width": 1920, "height": 800, "video_codec": "hevc", "audio_languages": ["por", "eng"]}
+
+Os resultados ficam em media_probe.json na pasta de configuracao, valendo
+enquanto tamanho e mtime do arquivo forem os mesmos.
+"""
+
+import json
+import mmap
+import os
+import struct
+import threading
+
+from src.core import metrics
+from src.core.TaskScheduler import PRIORITY_SEARCH, map_tasks
+from src.core.config import get_config_dir
+
+PROBE_FILENAME = "media_probe.json"
+MAX_ENTRIES = 20000
+
+# Matroska (EBML)
+EBML_HEADER = 0x1A45DFA3
+MKV_SEGMENT = 0x18538067
+MKV_SEEK_HEAD = 0x114D9B74
+MKV_SEEK = 0x4DBB
+MKV_SEEK_ID = 0x53AB
+MKV_SEEK_POSITION = 0x53AC
+MKV_INFO = 0x1549A966
+MKV_TIMECODE_SCALE = 0x2AD7B1
+MKV_DURATION = 0x4489
+MKV_TITLE = 0x7BA9
+MKV_TRACKS = 0x1654AE6B
+MKV_TRACK_ENTRY = 0xAE
+MKV_TRACK_TYPE = 0x83
+MKV_CODEC_ID = 0x86
+MKV_LANGUAGE = 0x22B59C
+MKV_LANGUAGE_IETF = 0x22B59D
+MKV_VIDEO = 0xE0
+MKV_PIXEL_WIDTH = 0xB0
+MKV_PIXEL_HEIGHT = 0xBA
+MKV_CLUSTER = 0x1F43B675
+MKV_TRACK_VIDEO = 1
+MKV_TRACK_AUDIO = 2
+
+# MP4: caixas que so contem outras caixas
+MP4_CONTAINERS = {b"moov", b"trak", b"mdia", b"minf", b"stbl", b"udta", b"ilst"}
+
+VIDEO_CODECS = {
+    "V_MPEG4/ISO/AVC": "h264",
+    "V_MPEGH/ISO/HEVC": "hevc",
+    "V_AV1": "av1",
+    "V_VP9": "vp9",
+    "V_VP8": "vp8",
+    "V_MPEG2": "mpeg2",
+    "V_MPEG4/ISO/ASP": "mpeg4",
+    "avc1": "h264",
+    "avc3": "h264",
+    "hvc1": "hevc",
+    "hev1": "hevc",
+    "av01": "av1",
+    "vp09": "vp9",
+    "mp4v": "mpeg4",
+}
+
+
+class ProbeError(ValueError):
+    pass
+
+
+def _read_vint(data, offset, keep_marker=False):
+    """Inteiro de tamanho variavel do EBML: (valor, bytes usados); None = tamanho desconhecido"""
+    if offset >= len(data):
+        raise ProbeError("cabecalho Matroska truncado")
+    first = data[offset]
+    length = 1
+    mask = 0x80
+    while length <= 8 and not first & mask:
+        length += 1
+        mask >>= 1
+    if length > 8 or offset + length > len(data):
+        raise ProbeError("inteiro EBML invalido")
+    value = first if keep_marker else first & (mask - 1)
+    for byte in data[offset + 1:offset + length]:
+        value = (value << 8) | byte
+    if not keep_marker and value == (1 << (7 * length)) - 1:
+        return None, length
+    return value, length
+
+
+def _elements(data, start, end):
+    """(id, inicio dos dados, fim dos dados) dos elementos EBML entre start e end"""
+    offset = start
+    while offset < end:
+        element_id, id_length = _read_vint(data, offset, keep_marker=True)
+        size, size_length = _read_vint(data, offset + id_length)
+        data_start = offset + id_length + size_length
+        data_end = end if size is None else min(data_start + size, end)
+        yield element_id, data_start, data_end
+        offset = data_end
+
+
+def _uint(data, start, end):
+    return int.from_bytes(data[start:end], "big")
+
+
+def _text(data, start, end):
+    return bytes(data[start:end]).split(b"\0", 1)[0].decode("utf-8", "replace").strip()
+
+
+def _probe_matroska(data):
+    info = {"container": "matroska", "audio_languages": []}
+    segment = None
+    for element_id, start, end in _elements(data, 0, len(data)):
+        if element_id == MKV_SEGMENT:
+            segment = (start, end)
+            break
+    if segment is None:
+        raise ProbeError("segmento Matroska nao encontrado")
+
+    segment_start, segment_end = segment
+    found = {}
+    seek_positions = {}
+    for element_id, start, end in _elements(data, segment_start, segment_end):
+        if element_id == MKV_CLUSTER:
+            # Daqui para frente so ha video; o resto vem pelo SeekHead
+            break
+        if element_id in (MKV_INFO, MKV_TRACKS):
+            found[element_id] = (start, end)
+        elif element_id == MKV_SEEK_HEAD:
+            seek_positions.update(_seek_head(data, start, end))
+        if MKV_INFO in found and MKV_TRACKS in found:
+            break
+    for element_id in (MKV_INFO, MKV_TRACKS):
+        if element_id not in found and element_id in seek_positions:
+            position = segment_start + seek_positions[element_id]
+            for found_id, start, end in _elements(data, position, min(segment_end, len(data))):
+                if found_id == element_id:
+                    found[element_id] = (start, end)
+                break
+
+    if MKV_INFO in found:
+        _matroska_info(data, *found[MKV_INFO], info)
+    if MKV_TRACKS in found:
+        _matroska_tracks(data, *found[MKV_TRACKS], info)
+    return info
+
+
+def _seek_head(data, start, end):
+    positions = {}
+    for element_id, seek_start, seek_end in _elements(data, start, end):
+        if element_id != MKV_SEEK:
+            continue
+        target = position = None
+        for child_id, child_start, child_end in _elements(data, seek_start, seek_end):
+            if child_id == MKV_SEEK_ID:
+                target = _uint(data, child_start, child_end)
+            elif child_id == MKV_SEEK_POSITION:
+                position = _uint(data, child_start, child_end)
+        if target is not None and position is not None:
+            positions.setdefault(target, position)
+    return positions
+
+
+def _matroska_info(data, start, end, info):
+    scale = 1000000
+    duration = None
+    for element_id, child_start, child_end in _elements(data, start, end):
+        if element_id == MKV_TIMECODE_SCALE:
+            scale = _uint(data, child_start, child_end) or scale
+        elif element_id == MKV_DURATION:
+            size = child_end - child_start
+            if size in (4, 8):
+                duration = struct.unpack(">f" if size == 4 else ">d", data[child_start:child_end])[0]
+        elif element_id == MKV_TITLE:
+            info["title"] = _text(data, child_start, child_end) or None
+    if duration is not None:
+        info["duration"] = round(duration * scale / 1e9, 3)
+
+
+def _matroska_tracks(data, start, end, info):
+    for element_id, track_start, track_end in _elements(data, start, end):
+        if element_id != MKV_TRACK_ENTRY:
+            continue
+        track = {"language": "eng"}
+        for child_id, child_start, child_end in _elements(data, track_start, track_end):
+            if child_id == MKV_TRACK_TYPE:
+                track["type"] = _uint(data, child_start, child_end)
+            elif child_id == MKV_CODEC_ID:
+                track["codec"] = _text(data, child_start, child_end)
+            elif child_id == MKV_LANGUAGE:
+                track["language"] = _text(data, child_start, child_end)
+            elif child_id == MKV_LANGUAGE_IETF:
+                track["language_ietf"] = _text(data, child_start, child_end)
+            elif child_id == MKV_VIDEO:
+                for video_id, video_start, video_end in _elements(data, child_start, child_end):
+                    if video_id == MKV_PIXEL_WIDTH:
+                        track["width"] = _uint(data, video_start, video_end)
+                    elif video_id == MKV_PIXEL_HEIGHT:
+                        track["height"] = _uint(data, video_start, video_end)
+        if track.get("type") == MKV_TRACK_VIDEO and "width" not in info:
+            info["width"] = track.get("width")
+            info["height"] = track.get("height")
+            info["video_codec"] = VIDEO_CODECS.get(track.get("codec"), track.get("codec"))
+        elif track.get("type") == MKV_TRACK_AUDIO:
+            _add_language(info, track.get("language_ietf") or track["language"])
+
+
+def _add_language(info, language):
+    language = (language or "und").lower()
+    if language not in info["audio_languages"]:
+        info["audio_languages"].append(language)
+
+
+def _boxes(data, start, end):
+    """(tipo, inicio dos dados, fim) das caixas MP4 entre start e end"""
+    offset = start
+    while offset + 8 <= end:
+        size, box_type = struct.unpack(">I4s", data[offset:offset + 8])
+        header = 8
+        if size == 1:
+            if offset + 16 > end:
+                return
+            size = struct.unpack(">Q", data[offset + 8:offset + 16])[0]
+            header = 16
+        elif size == 0:
+            size = end - offset
+        if size < header:
+            raise ProbeError("caixa MP4 invalida")
+        yield box_type, offset + header, min(offset + size, end)
+        offset += size
+
+
+def _probe_mp4(data):
+    info = {"container": "mp4", "audio_languages": []}
+    moov = None
+    for box_type, start, end in _boxes(data, 0, len(data)):
+        # O mdat (o video) e pulado pelo tamanho, sem ser lido
+        if box_type == b"moov":
+            moov = (start, end)
+            break
+    if moov is None:
+        raise ProbeError("caixa moov nao encontrada")
+    _mp4_walk(data, *moov, info, track=None)
+    return info
+
+
+def _mp4_walk(data, start, end, info, track):
+    for box_type, box_start, box_end in _boxes(data, start, end):
+        if box_type == b"trak":
+            track = {}
+            _mp4_walk(data, box_start, box_end, info, track)
+            _mp4_track(info, track)
+            track = None
+        elif box_type == b"meta":
+            # meta e uma full box (versao/flags) no MP4, mas nao no QuickTime
+            quicktime = data[box_start + 4:box_start + 8] in (b"hdlr", b"keys", b"ilst")
+            children = box_start if quicktime else box_start + 4
+            _mp4_walk(data, children, box_end, info, track)
+        elif box_type in MP4_CONTAINERS:
+            _mp4_walk(data, box_start, box_end, info, track)
+        elif box_type == b"mvhd":
+            _mp4_mvhd(data, box_start, info)
+        elif box_type == b"\xa9nam":
+            for child_type, child_start, child_end in _boxes(data, box_start, box_end):
+                if child_type == b"data":
+                    info["title"] = _text(data, child_start + 8, child_end) or None
+        elif track is not None:
+            _mp4_track_box(data, box_type, box_start, box_end, track)
+
+
+def _mp4_mvhd(data, start, info):
+    if data[start] == 1:
+        timescale, duration = struct.unpack(">IQ", data[start + 20:start + 32])
+    else:
+        timescale, duration = struct.unpack(">II", data[start + 12:start + 20])
+    if timescale:
+        info["duration"] = round(duration / timescale, 3)
+
+
+def _mp4_track_box(data, box_type, start, end, track):
+    if box_type == b"tkhd" and end - start >= 8:
+        # Largura e altura (ponto fixo 16.16) sao os ultimos campos
+        width, height = struct.unpack(">II", data[end - 8:end])
+        track["width"], track["height"] = width >> 16, height >> 16
+    elif box_type == b"hdlr":
+        # O primeiro hdlr e o da midia; um udta/meta da trilha traz outro ("mdir")
+        track.setdefault("handler", bytes(data[start + 8:start + 12]))
+    elif box_type == b"mdhd":
+        offset = start + (32 if data[start] == 1 else 20)
+        packed = struct.unpack(">H", data[offset:offset + 2])[0]
+        if packed:
+            track["language"] = "".join(chr(((packed >> shift) & 0x1F) + 0x60) for shift in (10, 5, 0))
+    elif box_type == b"stsd" and end - start >= 16:
+        track["codec"] = bytes(data[start + 12:start + 16]).decode("latin-1")
+
+
+def _mp4_track(info, track):
+    if track.get("handler") == b"vide" and "width" not in info:
+        info["width"] = track.get("width")
+        info["height"] = track.get("height")
+        info["video_codec"] = VIDEO_CODECS.get(track.get("codec"), track.get("codec"))
+    elif track.get("handler") == b"soun":
+        _add_language(info, track.get("language"))
+
+
+def probe(path):
+    """Dados do cabecalho do arquivo, ou None se nao for Matroska/MP4 legivel"""
+    with metrics.span("probe"):
+        try:
+            with open(path, "rb") as file:
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    if data[:4] == EBML_HEADER.to_bytes(4, "big"):
+                        return _probe_matroska(data)
+                    if data[4:8] in (b"ftyp", b"moov", b"free", b"wide", b"mdat"):
+                        return _probe_mp4(data)
+        except (OSError, ValueError, struct.error, IndexError):
+            # ValueError inclui ProbeError e o mmap de arquivo vazio
+            metrics.count("probe.errors")
+    return None
+
+
+def resolution_label(info):
+    """Rotulo 2160p/1080p/720p/480p pela largura ou altura (filmes widescreen tem altura cortada)"""
+    width = (info or {}).get("width") or 0
+    height = (info or {}).get("height") or 0
+    for label, min_width, min_height in (("2160p", 3200, 2000), ("1080p", 1800, 1000), ("720p", 1200, 700)):
+        if width >= min_width or height >= min_height:
+            return label
+    if height >= 400:
+        return "480p"
+    return None
+
+
+class MediaProbeCache:
+    def __init__(self, path=None):
+        self.path = path or get_config_dir() / PROBE_FILENAME
+        self._entries = None
+        self._lock = threading.Lock()
+        self._dirty = False
+
+    @property
+    def entries(self):
+        if self._entries is None:
+            try:
+                data = json.loads(self.path.read_text(encoding="utf-8"))
+                self._entries = data if isinstance(data, dict) else {}
+            except (OSError, ValueError):
+                self._entries = {}
+        return self._entries
+
+    def get(self, path):
+        """Dados do cabecalho (do cache se o arquivo nao mudou), ou None"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        key = str(path)
+        with self._lock:
+            entry = self.entries.get(key)
+        if entry and entry.get("size") == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns:
+            metrics.count("probe.cache_hit")
+            return entry.get("info")
+        info = probe(path)
+        with self._lock:
+            entries = self.entries
+            entries.pop(key, None)
+            entries[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "info": info}
+            while len(entries) > MAX_ENTRIES:
+                entries.pop(next(iter(entries)))
+            self._dirty = True
+        return info
+
+    def get_many(self, paths, scheduler=None, priority=PRIORITY_SEARCH, token=None):
+        """
+        [info] na ordem de paths, em paralelo pelo scheduler na classe
+        priority (sem ele, em serie); em compartilhamentos a latencia de
+        cada arquivo se sobrepoe
+        """
+        return map_tasks(self.get, list(paths), scheduler, priority, token)
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = json.dumps(self.entries, ensure_ascii=False)
+            self._dirty = False
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_name(self.path.name + ".tmp")
+        temp_path.write_text(payload, encoding="utf-8")
+        os.replace(temp_path, self.path)
@@ -0,0 +1,117 @@
+import json
+import os
+import threading
+
+from src.core.config import get_config_dir
+
+SESSION_FILENAME = "session.json"
+MAX_ENTRIES = 20000
+MAX_CANDIDATES = 10
+
+# Campos do TMDB que a tabela, o poster, os .nfo e as artes usam
+RESULT_FIELDS = (
+    "id",
+    "title",
+    "original_title",
+    "name",
+    "original_name",
+    "original_language",
+    "release_date",
+    "first_air_date",
+    "air_date",
+    "overview",
+    "poster_path",
+    "backdrop_path",
+    "still_path",
+    "vote_average",
+    "vote_count",
+    "season_number",
+    "episode_number",
+)
+
+
+def compact_result(result):
+    if not result:
+        return result
+    return {key: result[key] for key in RESULT_FIELDS if key in result}
+
+
+class SessionStore:
+    """
+    Estado de cada arquivo entre execucoes (resultados, escolha, nome
+    sugerido, marcado para envio), na pasta de configuracao. A chave e o
+    caminho; o estado so vale enquanto tamanho e mtime do arquivo forem os
+    mesmos.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or get_config_dir() / SESSION_FILENAME
+        self._entries = None
+        self._lock = threading.Lock()
+
+    @property
+    def entries(self):
+        if self._entries is None:
+            try:
+                data = json.loads(self.path.read_text(encoding="utf-8"))
+                self._entries = data.get("files", {}) if isinstance(data, dict) else {}
+            except (OSError, ValueError):
+                self._entries = {}
+        return self._entries
+
+    @staticmethod
+    def signature(path):
+        stat = os.stat(path)
+        return stat.st_size, stat.st_mtime_ns
+
+    def lookup(self, path):
+        """Estado salvo do arquivo, ou None se nao existir ou se o arquivo mudou"""
+        key = str(path)
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        try:
+            size, mtime = self.signature(path)
+        except OSError:
+            return None
+        if entry.get("size") != size or entry.get("mtime_ns") != mtime:
+            with self._lock:
+                self.entries.pop(key, None)
+            return None
+        return entry.get("state")
+
+    def update(self, path, state):
+        try:
+            size, mtime = self.signature(path)
+        except OSError:
+            return
+        state = dict(state)
+        state["results"] = [compact_result(result) for result in (state.get("results") or [])[:MAX_CANDIDATES]]
+        state["series"] = compact_result(state.get("series"))
+        with self._lock:
+            entries = self.entries
+            entries.pop(str(path), None)
+            entries[str(path)] = {"size": size, "mtime_ns": mtime, "state": state}
+            # dict mantem a ordem de insercao: os mais antigos saem primeiro
+            while len(entries) > MAX_ENTRIES:
+                entries.pop(next(iter(entries)))
+
+    def remove(self, path):
+        with self._lock:
+            self.entries.pop(str(path), None)
+
+    def prune_folder(self, folder, existing_paths):
+        """Esquece arquivos da pasta que nao existem mais nela"""
+        prefix = str(folder).rstrip(os.sep) + os.sep
+        existing = {str(path) for path in existing_paths}
+        with self._lock:
+            for key in [key for key in self.entries if key.startswith(prefix) and key not in existing]:
+                del self.entries[key]
+
+    def save(self):
+        with self._lock:
+            payload = json.dumps({"version": 1, "files": self.entries}, ensure_ascii=False)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_name(self.path.name + ".tmp")
+        temp_path.write_text(payload, encoding="utf-8")
+        os.replace(temp_path, self.path)
@@ -0,0 +1,330 @@
+"""
+Fila unica de tarefas em segundo plano, com classes de prioridade
+
+Um so conjunto de threads atende, nesta ordem:
+    PRIORITY_INTERACTIVE  o que o usuario esta olhando (poster da linha, series, temporadas)
+    PRIORITY_SEARCH       buscas em lote no TMDB
+    PRIORITY_PREFETCH     traducoes e outros dados adiantados
+    PRIORITY_ARTWORK      artes e .nfo depois do envio
+
+Cada classe tem um limite de tarefas simultaneas; como os limites das
+classes de lote somam menos que o total de threads, sempre sobra uma
+thread para uma tarefa interativa. Tarefas canceladas pelo CancelToken
+saem da fila sem rodar, e o callback nao e chamado.
+
+Trabalho paralelo dentro de uma tarefa (temporadas, alternativas de busca,
+traducoes) passa por um TaskGroup na mesma classe, nunca por um pool
+proprio: assim o limite da classe vale para tudo o que ela dispara.
+"""
+
+import collections
+import itertools
+import threading
+import time
+
+from src.core import metrics, profiling
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_SEARCH = 1
+PRIORITY_PREFETCH = 2
+PRIORITY_ARTWORK = 3
+
+CLASS_NAMES = {
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_SEARCH: "search",
+    PRIORITY_PREFETCH: "prefetch",
+    PRIORITY_ARTWORK: "artwork",
+}
+
+DEFAULT_WORKERS = 7
+DEFAULT_LIMITS = {
+    PRIORITY_INTERACTIVE: DEFAULT_WORKERS,
+    PRIORITY_SEARCH: 3,
+    PRIORITY_PREFETCH: 1,
+    PRIORITY_ARTWORK: 2,
+}
+# Threads paradas por mais tempo que isso terminam; voltam sob demanda
+IDLE_TIMEOUT = 30.0
+
+
+class TaskCancelled(Exception):
+    pass
+
+
+class CancelToken:
+    """
+    Compartilhado entre quem agenda e a tarefa; fn(token) pode checar no meio
+    do trabalho. Com parent, cancelar o pai tambem cancela este.
+    """
+
+    def __init__(self, parent=None):
+        self._event = threading.Event()
+        self.parent = parent
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set() or (self.parent is not None and self.parent.cancelled)
+
+    def raise_if_cancelled(self):
+        if self.cancelled:
+            raise TaskCancelled()
+
+
+class _Task:
+    __slots__ = ("fn", "priority", "token", "callback", "submitted")
+
+    def __init__(self, fn, priority, token, callback):
+        self.fn = fn
+        self.priority = priority
+        self.token = token
+        self.callback = callback
+        self.submitted = time.perf_counter()
+
+
+class _Call:
+    __slots__ = ("fn", "args", "task", "done", "result", "error")
+
+    def __init__(self, fn, args):
+        self.fn = fn
+        self.args = args
+        self.task = None
+        self.done = False
+        self.result = None
+        self.error = None
+
+    def value(self):
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class TaskGroup:
+    """
+    Sub-tarefas de uma tarefa, na mesma classe de prioridade: entram na fila
+    do scheduler e contam no limite da classe. Uma thread do scheduler que
+    espera o grupo executa ela mesma as sub-tarefas ainda na fila, entao
+    nunca fica parada esperando vaga da propria classe (com a classe cheia,
+    as sub-tarefas simplesmente rodam em serie).
+
+    Como gerenciador de contexto, cancela na saida o que ainda nao rodou.
+    """
+
+    def __init__(self, scheduler, priority=PRIORITY_SEARCH, token=None):
+        self.scheduler = scheduler
+        self.priority = priority
+        self.token = CancelToken(token)
+        self._changed = threading.Condition()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.cancel()
+
+    def cancel(self):
+        self.token.cancel()
+        with self._changed:
+            self._changed.notify_all()
+
+    def submit(self, fn, *args):
+        """Agenda fn(*args); o retorno vai para result() ou as_completed()"""
+        call = _Call(fn, args)
+        call.task = self.scheduler._enqueue(lambda token: self._execute(call), self.priority, None, self.token)
+        return call
+
+    def _execute(self, call):
+        try:
+            self.token.raise_if_cancelled()
+            call.result = call.fn(*call.args)
+        except Exception as e:
+            call.error = e
+        with self._changed:
+            call.done = True
+            self._changed.notify_all()
+
+    def as_completed(self, calls):
+        """Gera as chamadas conforme terminam; TaskCancelled se o grupo for cancelado antes"""
+        pending = list(calls)
+        while pending:
+            finished = [call for call in pending if call.done]
+            for call in finished:
+                pending.remove(call)
+                yield call
+            if finished or not pending:
+                continue
+            self.token.raise_if_cancelled()
+            claimed = next((call for call in pending if self.scheduler._claim(call.task)), None)
+            if claimed is not None:
+                self._execute(claimed)
+                continue
+            with self._changed:
+                if not any(call.done for call in pending):
+                    # Com timeout: tarefas canceladas saem da fila sem avisar o grupo
+                    self._changed.wait(0.1)
+
+    def result(self, call):
+        for _ in self.as_completed([call]):
+            pass
+        return call.value()
+
+    def map(self, fn, items):
+        """[fn(item) ...] na ordem dos itens; a primeira excecao e repassada"""
+        calls = [self.submit(fn, item) for item in items]
+        for _ in self.as_completed(calls):
+            pass
+        return [call.value() for call in calls]
+
+
+def map_tasks(fn, items, scheduler=None, priority=PRIORITY_SEARCH, token=None):
+    """
+    [fn(item) ...] na ordem dos itens: com scheduler, como sub-tarefas da
+    classe priority (TaskGroup); sem ele, em serie na thread atual
+    """
+    items = list(items)
+    if scheduler is None or len(items) < 2:
+        return [fn(item) for item in items]
+    with TaskGroup(scheduler, priority, token) as group:
+        return group.map(fn, items)
+
+
+class TaskScheduler:
+    def __init__(self, workers=DEFAULT_WORKERS, limits=None):
+        self.workers = workers
+        self.limits = dict(DEFAULT_LIMITS)
+        self.limits.update(limits or {})
+        self._queues = {priority: collections.deque() for priority in CLASS_NAMES}
+        self._running = dict.fromkeys(CLASS_NAMES, 0)
+        self._condition = threading.Condition()
+        self._threads = []
+        self._thread_ids = itertools.count()
+        self._stopped = False
+        # Marca as threads deste scheduler: so elas executam sub-tarefas na espera
+        self._local = threading.local()
+
+    def submit(self, fn, priority=PRIORITY_SEARCH, callback=None, token=None):
+        """
+        Agenda fn(token). callback(resultado, erro) roda na thread de
+        trabalho quando a tarefa termina sem ser cancelada. Retorna o token.
+        """
+        token = token or CancelToken()
+        self._enqueue(fn, priority, callback, token)
+        return token
+
+    def group(self, priority=PRIORITY_SEARCH, token=None):
+        """TaskGroup para paralelizar trabalho dentro de uma tarefa da classe priority"""
+        return TaskGroup(self, priority, token)
+
+    def _enqueue(self, fn, priority, callback, token):
+        if priority not in self._queues:
+            raise ValueError(f"Prioridade desconhecida: {priority}")
+        task = _Task(fn, priority, token, callback)
+        with self._condition:
+            if self._stopped:
+                raise RuntimeError("TaskScheduler ja foi encerrado")
+            self._queues[priority].append(task)
+            self._publish_depths()
+            if len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._worker, name=f"kodibot-task-{next(self._thread_ids)}", daemon=True)
+                self._threads.append(thread)
+                thread.start()
+            self._condition.notify()
+        return task
+
+    def _claim(self, task):
+        """
+        Tira da fila uma sub-tarefa que ainda nao comecou, para a thread que
+        a espera executa-la. So vale dentro de uma tarefa deste scheduler;
+        fora dele (ex.: a thread principal da CLI) quem espera so espera.
+        """
+        if getattr(self._local, "priority", None) is None:
+            return False
+        with self._condition:
+            try:
+                self._queues[task.priority].remove(task)
+            except ValueError:
+                return False
+            self._publish_depths()
+            return True
+
+    def depths(self):
+        """{classe: (na fila, rodando)}"""
+        with self._condition:
+            return {
+                CLASS_NAMES[priority]: (len(self._queues[priority]), self._running[priority])
+                for priority in CLASS_NAMES
+            }
+
+    def shutdown(self):
+        """Descarta o que ainda esta na fila; tarefas ja em andamento terminam sozinhas"""
+        with self._condition:
+            self._stopped = True
+            for queue in self._queues.values():
+                for task in queue:
+                    task.token.cancel()
+                queue.clear()
+            self._publish_depths()
+            self._condition.notify_all()
+
+    def _publish_depths(self):
+        for priority, name in CLASS_NAMES.items():
+            metrics.gauge(f"scheduler.{name}.queued", len(self._queues[priority]))
+            metrics.gauge(f"scheduler.{name}.running", self._running[priority])
+
+    def _next_task(self):
+        """Tarefa mais prioritaria cuja classe esta abaixo do limite (com o lock)"""
+        for priority, queue in self._queues.items():
+            while queue and queue[0].token.cancelled:
+                queue.popleft()
+                metrics.count(f"scheduler.{CLASS_NAMES[priority]}.cancelled")
+            if queue and self._running[priority] < self.limits[priority]:
+                return queue.popleft()
+        return None
+
+    def _worker(self):
+        while True:
+            # Perfil de uma acao que ja terminou nao deve seguir nesta thread
+            profiling.release_thread()
+            with self._condition:
+                task = self._next_task()
+                while task is None and not self._stopped:
+                    idle = not self._condition.wait(IDLE_TIMEOUT)
+                    task = self._next_task()
+                    if task is None and idle:
+                        break
+                if task is None:
+                    self._threads.remove(threading.current_thread())
+                    return
+                self._running[task.priority] += 1
+                self._publish_depths()
+            try:
+                self._run(task)
+            finally:
+                with self._condition:
+                    self._running[task.priority] -= 1
+                    self._publish_depths()
+                    # Uma vaga da classe abriu: outra thread pode pegar a proxima dela
+                    self._condition.notify_all()
+
+    def _run(self, task):
+        name = CLASS_NAMES[task.priority]
+        metrics.record(f"scheduler.{name}.wait", time.perf_counter() - task.submitted)
+        result = error = None
+        try:
+            self._local.priority = task.priority
+            with profiling.thread_profile(), metrics.span(f"scheduler.{name}.run"):
+                task.token.raise_if_cancelled()
+                result = task.fn(task.token)
+        except TaskCancelled:
+            pass
+        except Exception as e:
+            error = e
+        finally:
+            self._local.priority = None
+        if task.token.cancelled:
+            metrics.count(f"scheduler.{name}.cancelled")
+            return
+        if task.callback is not None:
+            task.callback(result, error)
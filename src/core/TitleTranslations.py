@@ -0,0 +1,196 @@
+"""
+Titulos de filmes e series em todos os idiomas, buscados uma vez por
+titulo (traducoes anexadas aos detalhes do TMDB, append_to_response) e
+guardados na pasta de configuracao. Nomes de episodio vem da temporada
+buscada no idioma dos nomes, uma vez por (serie, temporada, idioma).
+
+Com eles, trocar o idioma dos nomes (ou usar o titulo original) so
+recalcula os nomes sugeridos, sem buscar os arquivos de novo.
+"""
+
+import json
+import os
+import threading
+from src.core import metrics
+from src.core.config import get_config_dir
+from src.core.TaskScheduler import PRIORITY_PREFETCH, map_tasks
+
+TRANSLATIONS_FILENAME = "translations.json"
+NAMING_ORIGINAL = "original"
+
+
+def _key(media_type, tmdb_id, season_number=None):
+    key = f"{'tv' if media_type == 'tv' else 'movie'}:{tmdb_id}"
+    return key if season_number is None else f"{key}:s{season_number}"
+
+
+def details_translations(details):
+    """Lista de traducoes anexada a /movie/{id} ou /tv/{id} (append_to_response=translations)"""
+    return ((details or {}).get("translations") or {}).get("translations") or []
+
+
+def parse_translations(translations, media_type):
+    """{"pt-BR": titulo, "pt": titulo, ...} a partir da lista do TMDB"""
+    field = "name" if media_type == "tv" else "title"
+    titles = {}
+    for translation in translations or []:
+        title = ((translation.get("data") or {}).get(field) or "").strip()
+        language = translation.get("iso_639_1")
+        if not title or not language:
+            continue
+        region = translation.get("iso_3166_1")
+        if region:
+            titles[f"{language}-{region}"] = title
+        titles.setdefault(language, title)
+    return titles
+
+
+def parse_episode_names(season_details):
+    """{"1": nome, ...} dos episodios de uma temporada"""
+    names = {}
+    for episode in (season_details or {}).get("episodes", []):
+        name = (episode.get("name") or "").strip()
+        if name and episode.get("episode_number") is not None:
+            names[str(episode["episode_number"])] = name
+    return names
+
+
+class TitleTranslations:
+    """
+    Chaves: ("movie", id) e ("tv", id) para titulos; ("tv", id, temporada,
+    idioma) para os nomes de episodio daquela temporada
+    """
+
+    def __init__(self, path=None):
+        self.path = path or get_config_dir() / TRANSLATIONS_FILENAME
+        self._entries = None
+        self._lock = threading.Lock()
+
+    @property
+    def entries(self):
+        if self._entries is None:
+            try:
+                data = json.loads(self.path.read_text(encoding="utf-8"))
+                self._entries = data if isinstance(data, dict) else {}
+            except (OSError, ValueError):
+                self._entries = {}
+        return self._entries
+
+    def has(self, media_type, tmdb_id, season_number=None, language=None):
+        with self._lock:
+            entry = self.entries.get(_key(media_type, tmdb_id, season_number))
+        if season_number is None:
+            return entry is not None
+        return language in (entry or {})
+
+    def store(self, media_type, tmdb_id, translations):
+        titles = parse_translations(translations, media_type)
+        with self._lock:
+            self.entries[_key(media_type, tmdb_id)] = titles
+
+    def store_details(self, media_type, details):
+        """Guarda as traducoes que vieram junto dos detalhes. Retorna True se havia"""
+        if not details or details.get("id") is None or "translations" not in details:
+            return False
+        self.store(media_type, details["id"], details_translations(details))
+        return True
+
+    def store_episodes(self, series_id, season_number, language, season_details):
+        names = parse_episode_names(season_details)
+        with self._lock:
+            self.entries.setdefault(_key("tv", series_id, season_number), {})[language] = names
+
+    def title(self, media_type, tmdb_id, language):
+        """Titulo no idioma (pt-BR, ou so pt), ou None se nao houver traducao"""
+        if not language:
+            return None
+        with self._lock:
+            titles = self.entries.get(_key(media_type, tmdb_id)) or {}
+        return titles.get(language) or titles.get(language.split("-")[0])
+
+    def episode_title(self, series_id, season_number, episode_number, language):
+        """Nome do episodio no idioma, ou None se a temporada nao foi buscada nele"""
+        if not language or episode_number is None:
+            return None
+        with self._lock:
+            languages = self.entries.get(_key("tv", series_id, season_number)) or {}
+        return (languages.get(language) or {}).get(str(episode_number))
+
+    def fetch_missing(self, client, keys, scheduler=None, priority=PRIORITY_PREFETCH, token=None):
+        """
+        Busca as traducoes das chaves ainda nao guardadas, em paralelo pelo
+        scheduler na classe priority (sem ele, em serie): os detalhes do
+        titulo com as traducoes anexadas, ou a temporada no idioma pedido.
+        Retorna quantas buscou
+        """
+        missing = sorted({key for key in keys if not self.has(*key)}, key=str)
+        if not missing:
+            return 0
+
+        def fetch(key):
+            try:
+                if len(key) == 4:
+                    _, series_id, season_number, language = key
+                    details = client.get_tv_season_details(series_id, season_number, language=language)
+                    self.store_episodes(series_id, season_number, language, details)
+                    return True
+                media_type, tmdb_id = key
+                get_details = client.get_tv_details if media_type == "tv" else client.get_movie_details
+                details = get_details(tmdb_id, append=("translations",))
+                self.store(media_type, tmdb_id, details_translations(details))
+                return True
+            except Exception:
+                # Sem traducao o nome usa o titulo da busca; tenta de novo na proxima vez
+                return False
+
+        with metrics.span("translations.fetch"):
+            fetched = sum(map_tasks(fetch, missing, scheduler, priority, token))
+        metrics.count("translations.fetched", fetched)
+        return fetched
+
+    def save(self):
+        with self._lock:
+            payload = json.dumps(self.entries, ensure_ascii=False)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_name(self.path.name + ".tmp")
+        temp_path.write_text(payload, encoding="utf-8")
+        os.replace(temp_path, self.path)
+
+
+def naming_title(result, media_type, language, translations=None):
+    """
+    Titulo usado no nome do arquivo: o original com NAMING_ORIGINAL, a
+    traducao guardada para o idioma, ou o titulo que veio na busca
+    """
+    original_key = "original_name" if media_type == "tv" else "original_title"
+    title_key = "name" if media_type == "tv" else "title"
+    if language == NAMING_ORIGINAL:
+        return result.get(original_key) or result.get(title_key, "")
+    if translations is not None and result.get("id") is not None:
+        translated = translations.title(media_type, result["id"], language)
+        if translated:
+            return translated
+    # O TMDB deixa vazia a traducao do idioma original
+    if language and result.get("original_language") == language.split("-")[0] and result.get(original_key):
+        return result[original_key]
+    return result.get(title_key, "")
+
+
+def episode_language(series, language):
+    """Idioma dos nomes de episodio: com NAMING_ORIGINAL, o idioma original da serie"""
+    if language == NAMING_ORIGINAL:
+        return (series or {}).get("original_language")
+    return language
+
+
+def naming_episode_title(episode, series, language, translations=None):
+    """Nome do episodio no idioma dos nomes, se a temporada foi buscada nele, ou o da busca"""
+    language = episode_language(series, language)
+    series_id = (series or {}).get("id")
+    if translations is not None and language and series_id is not None:
+        translated = translations.episode_title(
+            series_id, episode.get("season_number"), episode.get("episode_number"), language
+        )
+        if translated:
+            return translated
+    return episode.get("name", "")
@@ -1,7 +1,14 @@
-import requests
-
+from src.core import metrics
 from src.core.config import get_setting
 
+
+def get_requests():
+    """Importa requests sob demanda (so na primeira chamada a API)"""
+    import requests
+
+    return requests
+
+
 class TMDBClient:
     """Cliente para interagir com a API do TheMovieDB"""
     
@@ -12,9 +19,40 @@ class TMDBClient:
         self.language = get_setting("APP_LANGUAGE", "en")
         if not self.api_key:
             raise ValueError("TMDB_API_KEY não configurada nas configuracoes")
+
+    def _get(self, endpoint, params, error_message):
+        requests = get_requests()
+        metrics.count("tmdb.requests")
+        try:
+            with metrics.span("tmdb.http"):
+                response = requests.get(endpoint, params=params, timeout=10)
+                response.raise_for_status()
+                return response.json()
+        except requests.RequestException as e:
+            metrics.count("tmdb.errors")
+            raise Exception(f"{error_message}: {str(e)}")
+
+    def set_language(self, language):
+        """Idioma das proximas consultas (APP_LANGUAGE e lido so na criacao do cliente)"""
+        self.language = language or "en"
+
+    def validate_api_key(self):
+        """
+        Confere a chave na API. Retorna True/False, ou None quando nao foi
+        possivel consultar (sem rede)
+        """
+        requests = get_requests()
+        try:
+            response = requests.get(
+                f"{self.BASE_URL}/configuration", params={'api_key': self.api_key}, timeout=10
+            )
+        except requests.RequestException:
+            return None
+        if response.status_code == 401:
+            return False
+        return response.ok
         
     def search_movie(self, query, year=None):
-        print(f"Buscando filme: {query}")
         """
         Busca um filme na base de dados do TMDB
         
@@ -29,22 +67,16 @@ class TMDBClient:
         params = {
             'api_key': self.api_key,
             'query': query,
-            'language': get_setting("APP_LANGUAGE", "en")
+            'language': self.language
         }
         
         if year:
             params['year'] = year
             
-        try:
-            response = requests.get(endpoint, params=params, timeout=10)
-            response.raise_for_status()
-            print(response.json())
-            return response.json().get('results', [])
-        except requests.RequestException as e:
-            raise Exception(f"Erro ao buscar filme: {str(e)}")
+        data = self._get(endpoint, params, "Erro ao buscar filme")
+        return data.get('results', [])
 
     def search_tv(self, query, year=None):
-        print(f"Buscando serie: {query}")
         """
         Busca uma serie na base de dados do TMDB
         
@@ -59,26 +91,22 @@ class TMDBClient:
         params = {
             'api_key': self.api_key,
             'query': query,
-            'language': get_setting("APP_LANGUAGE", "en")
+            'language': self.language
         }
         
         if year:
             params['first_air_date_year'] = year
             
-        try:
-            response = requests.get(endpoint, params=params, timeout=10)
-            response.raise_for_status()
-            print(response.json())
-            return response.json().get('results', [])
-        except requests.RequestException as e:
-            raise Exception(f"Erro ao buscar serie: {str(e)}")
+        data = self._get(endpoint, params, "Erro ao buscar serie")
+        return data.get('results', [])
     
-    def get_movie_details(self, movie_id):
+    def get_movie_details(self, movie_id, append=None):
         """
         Obtém detalhes completos de um filme
         
         Args:
             movie_id: ID do filme no TMDB
+            append: Secoes extras na mesma chamada (append_to_response), ex.: ("translations",)
             
         Returns:
             Dicionário com detalhes do filme
@@ -88,39 +116,44 @@ class TMDBClient:
             'api_key': self.api_key,
             'language': self.language
         }
+        if append:
+            params['append_to_response'] = ",".join(append)
         
-        try:
-            response = requests.get(endpoint, params=params, timeout=10)
-            response.raise_for_status()
-            print(response.json())
-            return response.json()
-        except requests.RequestException as e:
-            raise Exception(f"Erro ao buscar detalhes: {str(e)}")
+        return self._get(endpoint, params, "Erro ao buscar detalhes")
+
+    def find_by_imdb_id(self, imdb_id):
+        """
+        Busca exata pelo id do IMDb (tt...)
+
+        Returns:
+            Dicionario com movie_results, tv_results e tv_episode_results
+        """
+        endpoint = f"{self.BASE_URL}/find/{imdb_id}"
+        params = {
+            'api_key': self.api_key,
+            'external_source': 'imdb_id',
+            'language': self.language
+        }
 
-    def get_tv_details(self, tv_id):
+        return self._get(endpoint, params, "Erro ao buscar pelo id do IMDb")
+
+    def get_tv_details(self, tv_id, append=None):
         endpoint = f"{self.BASE_URL}/tv/{tv_id}"
         params = {
             'api_key': self.api_key,
             'language': self.language
         }
+        if append:
+            params['append_to_response'] = ",".join(append)
 
-        try:
-            response = requests.get(endpoint, params=params, timeout=10)
-            response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
-            raise Exception(f"Erro ao buscar detalhes da serie: {str(e)}")
+        return self._get(endpoint, params, "Erro ao buscar detalhes da serie")
 
-    def get_tv_season_details(self, tv_id, season_number):
+    def get_tv_season_details(self, tv_id, season_number, language=None):
+        """Temporada com os episodios, no idioma das buscas ou em language"""
         endpoint = f"{self.BASE_URL}/tv/{tv_id}/season/{season_number}"
         params = {
             'api_key': self.api_key,
-            'language': self.language
+            'language': language or self.language
         }
 
-        try:
-            response = requests.get(endpoint, params=params, timeout=10)
-            response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
-            raise Exception(f"Erro ao buscar temporada: {str(e)}")
+        return self._get(endpoint, params, "Erro ao buscar temporada")
@@ -0,0 +1,100 @@
+import json
+import os
+import threading
+
+from src.core.config import get_config_dir
+
+JOURNAL_FILENAME = "transfers.json"
+
+ENTRY_PLANNED = "planned"
+ENTRY_COPYING = "copying"
+ENTRY_COMMITTED = "committed"
+
+
+class TransferJournal:
+    """
+    Diario persistido das transferencias planejadas e em andamento.
+
+    Cada envio fica registrado do planejamento ate a conclusao; se o app
+    fechar ou a rede cair no meio, as entradas restantes permitem retomar a
+    copia a partir do ultimo offset confirmado em disco (fsync), desde que
+    tamanho e mtime da origem ainda sejam os registrados.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or get_config_dir() / JOURNAL_FILENAME
+        self._lock = threading.Lock()
+        self.entries = self._read()
+
+    def _read(self):
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        entries = data.get("entries", []) if isinstance(data, dict) else []
+        return {entry["id"]: entry for entry in entries if isinstance(entry, dict) and entry.get("id")}
+
+    def _save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_name(self.path.name + ".tmp")
+        payload = {"version": 1, "entries": list(self.entries.values())}
+        with open(temp_path, "w", encoding="utf-8") as handle:
+            json.dump(payload, handle, ensure_ascii=False, indent=2)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(temp_path, self.path)
+
+    def record_planned(self, job):
+        with self._lock:
+            self.entries[job.journal_id] = {
+                "id": job.journal_id,
+                "source": str(job.source),
+                "destination": str(job.destination),
+                "temp": str(job.temp_path),
+                "label": job.label,
+                "move": job.move,
+                "mode": job.mode,
+                "verify": job.verify,
+                "size": job.size,
+                "mtime_ns": job.source_mtime_ns,
+                "verified_offset": job.resume_offset,
+                "status": ENTRY_PLANNED,
+            }
+            self._save()
+
+    def record_progress(self, job, verified_offset):
+        self._update(job, status=ENTRY_COPYING, verified_offset=verified_offset)
+
+    def record_committed(self, job):
+        self._update(job, status=ENTRY_COMMITTED, verified_offset=job.size)
+
+    def _update(self, job, **fields):
+        with self._lock:
+            entry = self.entries.get(job.journal_id)
+            if entry is None:
+                return
+            entry.update(fields)
+            self._save()
+
+    def remove(self, job_or_id):
+        journal_id = getattr(job_or_id, "journal_id", job_or_id)
+        with self._lock:
+            if self.entries.pop(journal_id, None) is not None:
+                self._save()
+
+    def pending(self):
+        with self._lock:
+            return [dict(entry) for entry in self.entries.values()]
+
+    def discard_all(self):
+        """Descarta as entradas pendentes e apaga os arquivos temporarios"""
+        with self._lock:
+            for entry in self.entries.values():
+                temp = entry.get("temp")
+                if temp and entry.get("status") != ENTRY_COMMITTED:
+                    try:
+                        os.unlink(temp)
+                    except OSError:
+                        pass
+            self.entries = {}
+            self._save()
@@ -0,0 +1,218 @@
+import os
+import shutil
+from pathlib import Path
+
+from src.core.FileTransfer import (
+    SEND_MODE_COPY,
+    SEND_MODE_HARDLINK,
+    SEND_MODE_RENAME,
+    VERIFY_SAMPLE,
+    TransferJob,
+    format_size,
+    get_device_id,
+)
+
+
+def find_existing_ancestor(path):
+    current = Path(path)
+    while not current.exists() and current.parent != current:
+        current = current.parent
+    return current
+
+
+class PlanItem:
+    """Uma linha marcada para envio, ja resolvida em origem e destino"""
+
+    def __init__(self, source, destination, label=None, row=None, media=None):
+        self.source = Path(source)
+        self.destination = Path(destination)
+        self.label = label or self.source.name
+        self.row = row
+        self.media = media
+        self.size = 0
+        self.source_device = None
+        self.destination_device = None
+        self.error = None
+
+    @property
+    def same_device(self):
+        return self.source_device is not None and self.source_device == self.destination_device
+
+
+class TransferPlan:
+    """Resultado do planejamento: o que sera enviado, o que foi recusado e por que"""
+
+    def __init__(self, move=False, mode=SEND_MODE_COPY):
+        self.move = move or mode == SEND_MODE_RENAME
+        self.mode = mode
+        self.items = []
+        self.blocking_errors = []
+        # dispositivo -> {"path", "required", "free"}
+        self.devices = {}
+
+    @property
+    def accepted_items(self):
+        return [item for item in self.items if item.error is None]
+
+    @property
+    def rejected_items(self):
+        return [item for item in self.items if item.error is not None]
+
+    @property
+    def total_bytes(self):
+        return sum(item.size for item in self.accepted_items)
+
+    @property
+    def can_send(self):
+        return not self.blocking_errors and bool(self.accepted_items)
+
+    def needs_copy(self, item):
+        """Indica se o item vai de fato gravar bytes no destino"""
+        if not item.same_device:
+            return True
+        if self.move or self.mode == SEND_MODE_HARDLINK:
+            return False
+        return True
+
+    def directories(self):
+        return sorted({item.destination.parent for item in self.accepted_items}, key=str)
+
+    def create_directories(self):
+        """Cria cada pasta de destino uma unica vez"""
+        for folder in self.directories():
+            folder.mkdir(parents=True, exist_ok=True)
+
+    def build_jobs(self, verify=VERIFY_SAMPLE):
+        return [
+            TransferJob(
+                item.source,
+                item.destination,
+                move=self.move,
+                label=item.label,
+                mode=self.mode,
+                verify=verify,
+                media=item.media,
+            )
+            for item in self.accepted_items
+        ]
+
+    def error_messages(self):
+        return [f"{item.label}: {item.error}" for item in self.rejected_items]
+
+    def summary(self):
+        accepted = self.accepted_items
+        lines = [f"Arquivos a enviar: {len(accepted)} ({format_size(self.total_bytes)})"]
+        if self.rejected_items:
+            lines.append(f"Ignorados por erro: {len(self.rejected_items)}")
+
+        for info in self.devices.values():
+            lines.append(
+                f"Destino {info['path']}: precisa {format_size(info['required'])}, "
+                f"livre {format_size(info['free'])}"
+            )
+
+        instant = [item for item in accepted if not self.needs_copy(item)]
+        cross_device_moves = [item for item in accepted if self.move and not item.same_device]
+        if instant:
+            lines.append(f"{len(instant)} arquivo(s) no mesmo disco: envio instantaneo, sem copia")
+        if cross_device_moves:
+            lines.append(
+                f"{len(cross_device_moves)} arquivo(s) serao movidos entre discos "
+                "(copia verificada e depois remocao da origem)"
+            )
+
+        lines.extend(self.blocking_errors)
+        return "\n".join(lines)
+
+
+class TransferPlanner:
+    """
+    Resolve todas as linhas marcadas em um plano antes de mover qualquer byte:
+    origem ausente, destino existente, colisao de nomes no lote e no indice do
+    Kodi, espaco livre por dispositivo e movimentos entre discos.
+    """
+
+    # Folga para o arquivo .kodibot-part e metadados do sistema de arquivos
+    FREE_SPACE_MARGIN = 64 * 1024 * 1024
+
+    def __init__(self, kodi_root=None, kodi_index=None, move=False, mode=SEND_MODE_COPY, kodi_library=None):
+        """
+        Args:
+            kodi_root: Pasta raiz do Kodi, base dos caminhos do indice
+            kodi_index: Caminhos relativos (posix) ja existentes na pasta Kodi
+            move: Remove a origem apos o envio
+            mode: Modo de envio (SEND_MODE_*)
+            kodi_library: KodiLibrary do banco do Kodi; recusa itens cujo id
+                TMDB/IMDb ja esta na biblioteca, mesmo com outro nome
+        """
+        self.kodi_root = Path(kodi_root) if kodi_root else None
+        self.kodi_index = {entry.lower() for entry in (kodi_index or [])}
+        self.kodi_library = kodi_library
+        self.move = move
+        self.mode = mode
+        self.items = []
+
+    def add(self, source, destination, label=None, row=None, media=None):
+        item = PlanItem(source, destination, label=label, row=row, media=media)
+        self.items.append(item)
+        return item
+
+    def _in_kodi_index(self, destination):
+        if not self.kodi_root or not self.kodi_index:
+            return False
+        try:
+            relative = destination.relative_to(self.kodi_root).as_posix()
+        except ValueError:
+            return False
+        return relative.lower() in self.kodi_index
+
+    def build(self):
+        plan = TransferPlan(move=self.move, mode=self.mode)
+        plan.items = self.items
+        seen_destinations = {}
+        device_paths = {}
+
+        for item in self.items:
+            try:
+                stat = os.stat(item.source)
+            except OSError:
+                item.error = "arquivo de origem não encontrado"
+                continue
+            item.size = stat.st_size
+            item.source_device = stat.st_dev
+
+            key = os.path.normcase(str(item.destination)).lower()
+            if key in seen_destinations:
+                item.error = f"mesmo nome de destino que {seen_destinations[key].label}"
+                continue
+            seen_destinations[key] = item
+
+            if self._in_kodi_index(item.destination) or item.destination.exists():
+                item.error = f"{item.destination.name} já existe na pasta Kodi"
+                continue
+
+            if self.kodi_library is not None and self.kodi_library.contains_media(item.media):
+                item.error = "já está na biblioteca do Kodi"
+                continue
+
+            folder = item.destination.parent
+            item.destination_device = get_device_id(folder)
+            device_paths.setdefault(item.destination_device, find_existing_ancestor(folder))
+
+        for device, path in device_paths.items():
+            required = sum(
+                item.size
+                for item in plan.accepted_items
+                if item.destination_device == device and plan.needs_copy(item)
+            )
+            try:
+                free = shutil.disk_usage(path).free
+            except OSError:
+                continue
+            plan.devices[device] = {"path": str(path), "required": required, "free": free}
+            if required and required + self.FREE_SPACE_MARGIN > free:
+                plan.blocking_errors.append(
+                    f"Espaco insuficiente em {path}: faltam {format_size(required + self.FREE_SPACE_MARGIN - free)}"
+                )
+
+        return plan
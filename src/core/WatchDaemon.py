@@ -0,0 +1,390 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from src.core import metrics
+from src.core.config import get_config_dir
+from src.core.FileTransfer import SEND_MODE_COPY, VERIFY_SAMPLE
+from src.core.LibraryIndex import LibraryIndex
+from src.core.pipeline import (
+    DEFAULT_MIN_CONFIDENCE,
+    ITEM_ACCEPTED,
+    ITEM_ERROR,
+    ITEM_IN_LIBRARY,
+    ITEM_NOT_FOUND,
+    ITEM_REVIEW,
+    ITEM_SENT,
+    BatchPipeline,
+    MediaItem,
+    external_ids_for,
+    load_kodi_index,
+    post_transfer,
+    scan_video_files,
+)
+
+QUEUE_FILENAME = "daemon_queue.json"
+
+JOB_QUEUED = "queued"
+JOB_PROCESSING = "processing"
+JOB_REVIEW = "review"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+MAX_ATTEMPTS = 3
+RECENT_FAILURES = 20
+# Enviados ficam visiveis em /queue por um dia; retidos/falhas, os mais recentes
+DONE_RETENTION = 24 * 3600
+MAX_FINISHED_JOBS = 500
+
+
+class WatchDaemon:
+    """
+    Processa downloads continuamente: observa a pasta de filmes, enfileira os
+    arquivos que pararam de crescer e os passa pelo mesmo pipeline da CLI.
+    Resultados de baixa confianca ficam retidos para revisao. A fila e
+    persistida na pasta de configuracao e sobrevive a reinicios.
+
+    A fila nao cresce sem limite: itens cuja origem sumiu saem dela, e
+    enviados antigos e retidos/falhas alem de MAX_FINISHED_JOBS viram so
+    uma assinatura (tamanho, mtime) em handled, para nao serem reenfileirados
+    enquanto o arquivo nao mudar.
+    """
+
+    def __init__(
+        self,
+        client,
+        watch_folder,
+        kodi_folder,
+        min_confidence=DEFAULT_MIN_CONFIDENCE,
+        move=False,
+        mode=SEND_MODE_COPY,
+        verify=VERIFY_SAMPLE,
+        poll_interval=10,
+        settle_seconds=30,
+        journal=None,
+        state_path=None,
+        write_nfo=False,
+        download_artwork=False,
+        probe_cache=None,
+        name_resolution=False,
+    ):
+        self.client = client
+        self.watch_folder = Path(watch_folder)
+        self.kodi_folder = Path(kodi_folder)
+        self.min_confidence = min_confidence
+        self.move = move
+        self.mode = mode
+        self.verify = verify
+        self.poll_interval = poll_interval
+        self.settle_seconds = settle_seconds
+        self.journal = journal
+        self.write_nfo = write_nfo
+        self.download_artwork = download_artwork
+        self.probe_cache = probe_cache
+        self.name_resolution = name_resolution
+        self.state_path = state_path or get_config_dir() / QUEUE_FILENAME
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        # caminho -> (tamanho, mtime, desde quando esta assim)
+        self._observed = {}
+        # caminho -> [tamanho, mtime] de arquivos ja tratados e tirados da fila
+        self.handled = {}
+        self.jobs = self._load()
+        self.recent_failures = deque(maxlen=RECENT_FAILURES)
+        self.started_at = time.time()
+        self.files_done = 0
+        self.bytes_done = 0
+        self.http_server = None
+        self.last_post_transfer = None
+
+    def _load(self):
+        try:
+            data = json.loads(self.state_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        handled = data.get("handled")
+        if isinstance(handled, dict):
+            self.handled = handled
+        jobs = {job["path"]: job for job in data.get("jobs", []) if isinstance(job, dict) and job.get("path")}
+        for job in jobs.values():
+            # Interrompido no meio do processamento: volta para a fila
+            if job.get("status") == JOB_PROCESSING:
+                job["status"] = JOB_QUEUED
+        return jobs
+
+    def _save(self):
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.state_path.with_name(self.state_path.name + ".tmp")
+        temp_path.write_text(
+            json.dumps(
+                {"version": 1, "jobs": list(self.jobs.values()), "handled": self.handled},
+                ensure_ascii=False,
+                indent=2,
+            ),
+            encoding="utf-8",
+        )
+        os.replace(temp_path, self.state_path)
+
+    def poll_once(self):
+        """
+        Varre a pasta, enfileira os arquivos estaveis ha settle_seconds e
+        poda a fila; grava o estado uma vez por varredura, se algo mudou
+        """
+        now = time.time()
+        seen = set()
+        changed = False
+        for path in scan_video_files(self.watch_folder):
+            key = str(path)
+            seen.add(key)
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            signature = (stat.st_size, stat.st_mtime)
+            previous = self._observed.get(key)
+            if previous is None or previous[:2] != signature:
+                self._observed[key] = (*signature, now)
+                continue
+            if now - previous[2] < self.settle_seconds:
+                continue
+
+            with self._lock:
+                job = self.jobs.get(key)
+                if job and (job.get("size"), job.get("mtime")) == signature:
+                    continue
+                if tuple(self.handled.get(key) or ()) == signature:
+                    continue
+                self.handled.pop(key, None)
+                self.jobs[key] = {
+                    "path": key,
+                    "size": stat.st_size,
+                    "mtime": stat.st_mtime,
+                    "status": JOB_QUEUED,
+                    "attempts": 0,
+                    "queued_at": now,
+                    "updated_at": now,
+                    "error": None,
+                    "match": None,
+                    "suggested_name": None,
+                    "destination": None,
+                    "confidence": None,
+                }
+                changed = True
+
+        for key in list(self._observed):
+            if key not in seen:
+                del self._observed[key]
+
+        with self._lock:
+            # Pasta fora do ar (ex.: compartilhamento desmontado): nada de podar
+            if self.watch_folder.is_dir():
+                changed = self._prune(seen, now) or changed
+            if changed:
+                self._save()
+
+    def _prune(self, seen, now):
+        """Tira da fila o que ja terminou (com o lock); retorna se algo mudou"""
+        removed = 0
+        for key, job in list(self.jobs.items()):
+            if key not in seen and job["status"] not in (JOB_QUEUED, JOB_PROCESSING):
+                del self.jobs[key]
+                removed += 1
+        for key in list(self.handled):
+            if key not in seen:
+                del self.handled[key]
+                removed += 1
+
+        finished = sorted(
+            (job for job in self.jobs.values() if job["status"] in (JOB_FAILED, JOB_REVIEW)),
+            key=lambda job: job.get("updated_at") or 0,
+        )
+        retired = finished[:max(len(finished) - MAX_FINISHED_JOBS, 0)]
+        retired.extend(
+            job for job in self.jobs.values()
+            if job["status"] == JOB_DONE and now - (job.get("updated_at") or 0) > DONE_RETENTION
+        )
+        for job in retired:
+            self.handled[job["path"]] = [job.get("size"), job.get("mtime")]
+            del self.jobs[job["path"]]
+        return bool(removed or retired)
+
+    def process_queue(self):
+        with self._lock:
+            queued = [job for job in self.jobs.values() if job["status"] == JOB_QUEUED]
+            # Sem gravar agora: interrompido, o item volta como "queued" de qualquer jeito
+            for job in queued:
+                job["status"] = JOB_PROCESSING
+        if not queued:
+            return 0
+
+        groups = {"movie": [], "tv": []}
+        for job in queued:
+            path = Path(job["path"])
+            if not path.exists():
+                self._finish(job, JOB_FAILED, error="arquivo de origem não encontrado")
+                continue
+            item = MediaItem(path, self.watch_folder)
+            item.media_type = "tv" if item.episode is not None else "movie"
+            item.external_ids = external_ids_for(path, item.media_type)
+            groups[item.media_type].append((job, item))
+
+        sent_jobs = []
+        for media_type, pairs in groups.items():
+            if pairs:
+                sent_jobs.extend(self._process_group(media_type, pairs))
+        self._post_transfer(sent_jobs)
+        with self._lock:
+            self._save()
+        return len(queued)
+
+    def _post_transfer(self, jobs):
+        """.nfo, artes e uma atualizacao da biblioteca por rodada, com as pastas de todos os envios"""
+        if not jobs:
+            return
+        report = post_transfer(
+            jobs, self.kodi_folder, write_nfo=self.write_nfo, download_artwork=self.download_artwork
+        )
+        if report["kodi_scan"] or report["errors"]:
+            self.last_post_transfer = {
+                "at": time.time(),
+                "directories": report["kodi_scan"],
+                "error": "; ".join(report["errors"]) or None,
+            }
+
+    def _process_group(self, media_type, pairs):
+        pipeline = BatchPipeline(
+            self.client,
+            media_type=media_type,
+            min_confidence=self.min_confidence,
+            probe_cache=self.probe_cache,
+            name_resolution=self.name_resolution,
+        )
+        pipeline.items = [item for _, item in pairs]
+        jobs = []
+        try:
+            pipeline.probe_items()
+            kodi_index, kodi_library, _ = load_kodi_index(self.kodi_folder)
+            pipeline.match_library(LibraryIndex.build(kodi_index, kodi_library))
+            pipeline.resolve()
+            plan = pipeline.plan(
+                self.kodi_folder, move=self.move, mode=self.mode, kodi_index=kodi_index, kodi_library=kodi_library
+            )
+            if plan.blocking_errors:
+                for item in pipeline.items:
+                    if item.status == ITEM_ACCEPTED:
+                        item.status = ITEM_ERROR
+                        item.error = "; ".join(plan.blocking_errors)
+            elif plan.accepted_items:
+                jobs = pipeline.transfer(plan, verify=self.verify, journal=self.journal)
+        except Exception as e:
+            for item in pipeline.items:
+                item.status = ITEM_ERROR
+                item.error = str(e)
+
+        for job, item in pairs:
+            job["match"] = item.to_dict()["match"]
+            job["suggested_name"] = item.suggested_name
+            job["destination"] = str(item.destination) if item.destination else None
+            job["confidence"] = round(item.confidence, 3)
+            if item.status == ITEM_SENT:
+                self.files_done += 1
+                self.bytes_done += job.get("size") or 0
+                self._finish(job, JOB_DONE)
+            elif item.status in (ITEM_REVIEW, ITEM_NOT_FOUND, ITEM_IN_LIBRARY):
+                self._finish(job, JOB_REVIEW, error=item.error)
+            elif item.status == ITEM_ERROR and job.get("attempts", 0) + 1 < MAX_ATTEMPTS:
+                # Erro de rede/API: tenta de novo na proxima rodada
+                job["attempts"] = job.get("attempts", 0) + 1
+                self._finish(job, JOB_QUEUED, error=item.error)
+            else:
+                self._finish(job, JOB_FAILED, error=item.error or item.status)
+        return jobs
+
+    def _finish(self, job, status, error=None):
+        with self._lock:
+            job["status"] = status
+            job["error"] = error
+            job["updated_at"] = time.time()
+            if status == JOB_FAILED:
+                self.recent_failures.append(
+                    {"path": job["path"], "error": error, "at": job["updated_at"]}
+                )
+
+    def status(self):
+        with self._lock:
+            counts = {}
+            for job in self.jobs.values():
+                counts[job["status"]] = counts.get(job["status"], 0) + 1
+            uptime = max(time.time() - self.started_at, 1e-6)
+            return {
+                "watch_folder": str(self.watch_folder),
+                "kodi_folder": str(self.kodi_folder),
+                "uptime_seconds": round(uptime, 1),
+                "queue_depth": counts.get(JOB_QUEUED, 0) + counts.get(JOB_PROCESSING, 0),
+                "observed_files": len(self._observed),
+                "jobs": counts,
+                "throughput": {
+                    "files_done": self.files_done,
+                    "bytes_done": self.bytes_done,
+                    "files_per_hour": round(self.files_done * 3600 / uptime, 2),
+                    "bytes_per_second": round(self.bytes_done / uptime, 1),
+                },
+                "recent_failures": list(self.recent_failures),
+                "last_post_transfer": self.last_post_transfer,
+            }
+
+    def jobs_with_status(self, status=None):
+        with self._lock:
+            return [dict(job) for job in self.jobs.values() if status is None or job["status"] == status]
+
+    def start_http(self, port, host="127.0.0.1"):
+        """Sobe o endpoint local (/status, /queue, /review, /metrics) em uma thread"""
+        daemon = self
+
+        class StatusHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split("?", 1)[0].rstrip("/") or "/status"
+                if path == "/metrics":
+                    # Formato texto do Prometheus
+                    body = metrics.to_prometheus().encode("utf-8")
+                    content_type = "text/plain; version=0.0.4; charset=utf-8"
+                else:
+                    routes = {
+                        "/status": daemon.status,
+                        "/queue": daemon.jobs_with_status,
+                        "/review": lambda: daemon.jobs_with_status(JOB_REVIEW),
+                        "/metrics.json": metrics.snapshot,
+                    }
+                    handler = routes.get(path)
+                    if handler is None:
+                        self.send_error(404)
+                        return
+                    body = json.dumps(handler(), ensure_ascii=False).encode("utf-8")
+                    content_type = "application/json; charset=utf-8"
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.http_server = ThreadingHTTPServer((host, port), StatusHandler)
+        threading.Thread(target=self.http_server.serve_forever, daemon=True).start()
+        return self.http_server
+
+    def stop(self):
+        self._stop_event.set()
+        if self.http_server is not None:
+            self.http_server.shutdown()
+
+    def run_forever(self):
+        while not self._stop_event.is_set():
+            self.poll_once()
+            self.process_queue()
+            self._stop_event.wait(self.poll_interval)
@@ -0,0 +1,207 @@
+"""
+Metricas de desempenho: spans de tempo, contadores e medidores (gauges)
+
+Desligadas por padrao; ligue com METRICS_ENABLED=true nas configuracoes,
+KODIBOT_METRICS=1 no ambiente ou enable(). Desligadas, span() devolve um
+contexto vazio compartilhado e count() retorna na primeira linha.
+
+Exemplo:
+    with metrics.span("tmdb.http"):
+        ...
+    metrics.count("image_cache.hit")
+"""
+
+import json
+import os
+import re
+import threading
+import time
+
+from src.core.config import get_setting
+
+# Limites (em segundos) dos buckets do histograma exportado para Prometheus
+BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_lock = threading.Lock()
+_spans = {}
+_counters = {}
+_gauges = {}
+_started_at = time.time()
+_enabled = False
+
+
+def _truthy(value):
+    return (value or "").strip().lower() in {"1", "true", "yes", "on", "sim"}
+
+
+def load_enabled():
+    """Liga as metricas conforme o ambiente ou as configuracoes"""
+    global _enabled
+    try:
+        setting = get_setting("METRICS_ENABLED")
+    except OSError:
+        setting = None
+    _enabled = _truthy(os.getenv("KODIBOT_METRICS")) or _truthy(setting)
+    return _enabled
+
+
+def enable(value=True):
+    global _enabled
+    _enabled = bool(value)
+
+
+def is_enabled():
+    return _enabled
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("name", "started")
+
+    def __init__(self, name):
+        self.name = name
+        self.started = 0.0
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        record(self.name, time.perf_counter() - self.started, error=exc_type is not None)
+        return False
+
+
+def span(name):
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name)
+
+
+def record(name, seconds, error=False):
+    """Registra uma duracao ja medida (para trechos que nao cabem em um with)"""
+    if not _enabled:
+        return
+    with _lock:
+        stats = _spans.get(name)
+        if stats is None:
+            stats = _spans[name] = {
+                "count": 0,
+                "errors": 0,
+                "total": 0.0,
+                "max": 0.0,
+                "buckets": [0] * len(BUCKETS),
+            }
+        stats["count"] += 1
+        stats["total"] += seconds
+        if seconds > stats["max"]:
+            stats["max"] = seconds
+        if error:
+            stats["errors"] += 1
+        for index, limit in enumerate(BUCKETS):
+            if seconds <= limit:
+                stats["buckets"][index] += 1
+                break
+
+
+def count(name, value=1):
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def gauge(name, value):
+    """Valor atual de uma medida que sobe e desce (ex.: profundidade de fila)"""
+    if not _enabled:
+        return
+    with _lock:
+        _gauges[name] = value
+
+
+def reset():
+    global _started_at
+    with _lock:
+        _spans.clear()
+        _counters.clear()
+        _gauges.clear()
+        _started_at = time.time()
+
+
+def snapshot():
+    with _lock:
+        spans = {
+            name: {
+                "count": stats["count"],
+                "errors": stats["errors"],
+                "total_ms": round(stats["total"] * 1000, 3),
+                "mean_ms": round(stats["total"] * 1000 / stats["count"], 3) if stats["count"] else 0.0,
+                "max_ms": round(stats["max"] * 1000, 3),
+                "buckets": dict(zip((str(limit) for limit in BUCKETS), stats["buckets"])),
+            }
+            for name, stats in sorted(_spans.items())
+        }
+        return {
+            "enabled": _enabled,
+            "since": _started_at,
+            "elapsed_seconds": round(time.time() - _started_at, 3),
+            "spans": spans,
+            "counters": dict(sorted(_counters.items())),
+            "gauges": dict(sorted(_gauges.items())),
+        }
+
+
+def to_json(data=None):
+    return json.dumps(data or snapshot(), indent=2)
+
+
+def _metric_name(name):
+    return "kodibot_" + re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+
+def to_prometheus(data=None):
+    """Formato texto do Prometheus (para o textfile collector do node_exporter)"""
+    data = data or snapshot()
+    lines = []
+    for name, value in data["counters"].items():
+        metric = _metric_name(name) + "_total"
+        lines.append(f"# TYPE {metric} counter")
+        lines.append(f"{metric} {value}")
+    for name, value in data.get("gauges", {}).items():
+        metric = _metric_name(name)
+        lines.append(f"# TYPE {metric} gauge")
+        lines.append(f"{metric} {value}")
+    for name, stats in data["spans"].items():
+        metric = _metric_name(name) + "_seconds"
+        lines.append(f"# TYPE {metric} histogram")
+        cumulative = 0
+        for limit, bucket_count in stats["buckets"].items():
+            cumulative += bucket_count
+            lines.append(f'{metric}_bucket{{le="{limit}"}} {cumulative}')
+        lines.append(f'{metric}_bucket{{le="+Inf"}} {stats["count"]}')
+        lines.append(f"{metric}_sum {stats['total_ms'] / 1000:.6f}")
+        lines.append(f"{metric}_count {stats['count']}")
+        if stats["errors"]:
+            lines.append(f"# TYPE {metric[:-len('_seconds')]}_errors_total counter")
+            lines.append(f"{metric[:-len('_seconds')]}_errors_total {stats['errors']}")
+    return "\n".join(lines) + "\n"
+
+
+def write_export(path):
+    """Grava o snapshot; extensao .prom gera o formato Prometheus, o resto JSON"""
+    path = str(path)
+    text = to_prometheus() if path.endswith(".prom") else to_json()
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as handle:
+        handle.write(text)
+    os.replace(temp_path, path)
+    return path
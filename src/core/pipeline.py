@@ -0,0 +1,814 @@
+"""
+Pipeline sem interface grafica: varredura -> interpretacao -> busca ->
+ranking -> planejamento -> envio. Usado pela CLI e reaproveitado pela janela
+principal; nao importa PyQt6.
+"""
+
+import difflib
+import os
+import re
+import time
+from pathlib import Path
+
+from src.core import metrics
+from src.core.ArtworkDownloader import ART_DOWNLOADED, ART_FAILED, ArtworkDownloader
+from src.core.FileTransfer import SEND_MODE_COPY, STATUS_DONE, VERIFY_SAMPLE, TransferQueue
+from src.core.KodiNamer import KodiNamer
+from src.core.KodiLibraryDb import KodiLibrary
+from src.core.LibraryIndex import LibraryIndex
+from src.core.MediaProbe import resolution_label
+from src.core.KodiNfo import MOVIE_NFO, TVSHOW_NFO, nfo_path, read_nfo_ids, write_nfo_files
+from src.core.KodiRpcClient import update_kodi_library
+from src.core.TaskScheduler import PRIORITY_SEARCH, TaskGroup, TaskScheduler, map_tasks
+from src.core.TransferPlanner import TransferPlanner
+
+ITEM_PENDING = "pending"
+ITEM_ACCEPTED = "accepted"
+ITEM_REVIEW = "review"
+ITEM_NOT_FOUND = "not_found"
+ITEM_ERROR = "error"
+ITEM_SKIPPED = "skipped"
+ITEM_IN_LIBRARY = "in_library"
+ITEM_SENT = "sent"
+ITEM_FAILED = "failed"
+
+DEFAULT_MIN_CONFIDENCE = 0.8
+# Candidatos ate esta distancia do melhor sao desempatados pela duracao do arquivo
+RUNTIME_TIE_MARGIN = 0.1
+MAX_RUNTIME_LOOKUPS = 3
+
+
+def scan_video_files(folder):
+    """Lista os videos da pasta (recursivo), ordenados pelo caminho relativo"""
+    folder_path = Path(folder)
+    found = []
+    stack = [str(folder_path)]
+    started = time.perf_counter()
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    # d_type do scandir evita um stat por arquivo (importante em SMB)
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif KodiNamer.is_video_file(entry.name) and entry.is_file():
+                        found.append(Path(entry.path))
+        except OSError:
+            continue
+    result = sorted(found, key=lambda path: path.relative_to(folder_path).as_posix().lower())
+    metrics.record("scan.videos", time.perf_counter() - started)
+    metrics.count("scan.files", len(result))
+    return result
+
+
+def scan_kodi_files(folder):
+    """Lista os videos ja presentes na pasta do Kodi como caminhos relativos (posix)"""
+    folder_path = Path(folder)
+    return sorted(
+        (path.relative_to(folder_path).as_posix() for path in scan_video_files(folder_path)),
+        key=str.lower,
+    )
+
+
+def load_kodi_index(kodi_path):
+    """
+    Indice da pasta Kodi para o painel e a checagem de duplicados. Com
+    KODI_DB_PATH, vem do banco do Kodi (sem varrer o compartilhamento); se o
+    banco falhar, a pasta e varrida. Retorna (caminhos relativos, KodiLibrary
+    ou None, erro do banco ou None).
+    """
+    try:
+        library = KodiLibrary.from_settings(kodi_path)
+    except (OSError, ValueError) as e:
+        metrics.count("kodi.db.errors")
+        return scan_kodi_files(kodi_path), None, str(e)
+    if library is None:
+        return scan_kodi_files(kodi_path), None, None
+    return library.relative_paths(), library, None
+
+
+def result_title(result, media_type):
+    if media_type == "tv":
+        return result.get("name", "N/A")
+    return result.get("title", "N/A")
+
+
+def result_date(result, media_type):
+    if media_type == "tv":
+        return result.get("first_air_date", "") or ""
+    return result.get("release_date", "") or ""
+
+
+def result_year(result, media_type):
+    release_date = result_date(result, media_type)
+    return release_date.split("-")[0] if release_date else ""
+
+
+def result_label(result, media_type):
+    title = result_title(result, media_type)
+    year = result_year(result, media_type)
+    return f"{title} ({year})" if year else title
+
+
+def sort_results_by_date(results, media_type):
+    """Ordena os resultados pelo lancamento, mais recente primeiro (padrao da interface)"""
+    if not results:
+        return results
+    return sorted(results, key=lambda result: result_date(result, media_type), reverse=True)
+
+
+def normalize_title(title):
+    title = (title or "").lower()
+    title = re.sub(r"[^\w\s]", " ", title)
+    title = re.sub(r"\d+", " ", title)
+    return re.sub(r"\s+", " ", title).strip()
+
+
+def runtime_score(duration, runtime):
+    """1 se a duracao do arquivo (s) bate com a do TMDB (min), 0.5 se perto, 0 se nao"""
+    distance = abs(duration / 60 - runtime)
+    return 1.0 if distance <= 5 else 0.5 if distance <= 15 else 0.0
+
+
+def score_result(query, year, result, media_type, duration=None):
+    """
+    Confianca (0 a 1) de que o resultado corresponde ao arquivo: semelhanca
+    do titulo (traduzido ou original) com a busca, ajustada pelo ano e, se
+    o resultado tiver runtime, pela duracao lida do arquivo.
+    """
+    normalized_query = normalize_title(query)
+    original_key = "original_name" if media_type == "tv" else "original_title"
+    similarity = max(
+        difflib.SequenceMatcher(None, normalized_query, normalize_title(candidate)).ratio()
+        for candidate in (result_title(result, media_type), result.get(original_key, ""))
+    )
+    score = similarity
+    if year:
+        result_year_value = result_year(result, media_type)
+        if not result_year_value.isdigit():
+            year_score = 0.0
+        else:
+            distance = abs(int(result_year_value) - int(year))
+            year_score = 1.0 if distance == 0 else 0.5 if distance == 1 else 0.0
+        score = similarity * 0.8 + year_score * 0.2
+    if duration and result.get("runtime"):
+        score = score * 0.85 + runtime_score(duration, result["runtime"]) * 0.15
+    return score
+
+
+def rank_results(query, year, results, media_type, duration=None):
+    """Retorna [(confianca, resultado)] do melhor para o pior; empate vai para o mais recente"""
+    with metrics.span("rank"):
+        ranked = [(score_result(query, year, result, media_type, duration), result) for result in results or []]
+        ranked.sort(key=lambda pair: (pair[0], result_date(pair[1], media_type)), reverse=True)
+    return ranked
+
+
+def search_media(client, query, year, media_type):
+    if media_type == "tv":
+        return client.search_tv(query, year or None)
+    return client.search_movie(query, year or None)
+
+
+def fetch_seasons(client, keys, scheduler=None, priority=PRIORITY_SEARCH, token=None):
+    """
+    Detalhes de cada (id da serie, temporada), buscados uma vez cada; em
+    paralelo pelo scheduler, na classe da tarefa que chama. Temporadas com
+    erro voltam como {}.
+    """
+    def fetch(key):
+        try:
+            return key, client.get_tv_season_details(*key)
+        except Exception:
+            return key, {}
+
+    keys = sorted(set(keys), key=str)
+    if not keys:
+        return {}
+    return dict(map_tasks(fetch, keys, scheduler, priority, token))
+
+
+def index_episodes(seasons):
+    """Indice (id da serie, temporada, episodio) -> episodio, sobre todas as temporadas"""
+    index = {}
+    for (series_id, season_number), details in seasons.items():
+        for episode in (details or {}).get("episodes", []):
+            index[(series_id, season_number, episode.get("episode_number"))] = episode
+    return index
+
+
+def _nfo_names(folder, listing_cache):
+    """Nomes dos .nfo da pasta (uma listagem por pasta, compartilhada entre os arquivos)"""
+    key = str(folder)
+    if listing_cache is None or key not in listing_cache:
+        names = set()
+        try:
+            with os.scandir(folder) as entries:
+                names = {entry.name for entry in entries if entry.name.lower().endswith(".nfo")}
+        except OSError:
+            pass
+        if listing_cache is None:
+            return names
+        listing_cache[key] = names
+    return listing_cache[key]
+
+
+def external_ids_for(path, media_type, listing_cache=None):
+    """
+    Ids TMDB/IMDb do arquivo: no nome, no nome da pasta (ex.: "Filme (1999)
+    [tmdbid-603]") ou no .nfo ao lado. Em series valem so os ids da serie
+    (pastas e tvshow.nfo); o .nfo do episodio tem os ids do episodio.
+    """
+    path = Path(path)
+    names = [path.name, path.parent.name]
+    if media_type == "tv":
+        names = [path.name, path.parent.name, path.parent.parent.name]
+    for name in names:
+        ids = KodiNamer.extract_external_ids(name)
+        if ids:
+            return ids
+
+    if media_type == "tv":
+        sidecars = [path.parent / TVSHOW_NFO, path.parent.parent / TVSHOW_NFO]
+    else:
+        sidecars = [nfo_path(path), path.parent / MOVIE_NFO]
+    for sidecar in sidecars:
+        if sidecar.name in _nfo_names(sidecar.parent, listing_cache):
+            ids = read_nfo_ids(sidecar)
+            if ids:
+                return ids
+    return {}
+
+
+def lookup_by_ids(client, ids, media_type):
+    """
+    Resultado exato pelo id, sem busca textual: /movie/{id} ou /tv/{id} com o
+    id TMDB, /find/{id} com o do IMDb. Retorna None se o id nao existir.
+    """
+    if ids.get("tmdb"):
+        if media_type == "tv":
+            result = client.get_tv_details(ids["tmdb"])
+        else:
+            result = client.get_movie_details(ids["tmdb"])
+        return result if result and result.get("id") else None
+
+    if ids.get("imdb"):
+        found = client.find_by_imdb_id(ids["imdb"])
+        if media_type != "tv":
+            results = found.get("movie_results") or []
+            return results[0] if results else None
+        results = found.get("tv_results") or []
+        if results:
+            return results[0]
+        # Id de episodio: a serie vem de show_id
+        episodes = found.get("tv_episode_results") or []
+        if episodes and episodes[0].get("show_id"):
+            return client.get_tv_details(episodes[0]["show_id"])
+    return None
+
+
+def fallback_variants(query, year, media_type, alternate_type=True):
+    """
+    Buscas alternativas para quando (query, year) nao acha nada, em ordem de
+    preferencia: sem ano, ano -1 e +1, titulo encurtado e o outro tipo
+    """
+    variants = []
+    if year:
+        variants.append((query, None, media_type))
+        variants.extend((query, int(year) + delta, media_type) for delta in (-1, 1))
+    words = (query or "").split()
+    for keep in (len(words) - 1, len(words) - 2):
+        shortened = " ".join(words[:keep])
+        if keep >= 1 and len(shortened) >= 3:
+            variants.append((shortened, None, media_type))
+    if alternate_type and query:
+        variants.append((query, year, "movie" if media_type == "tv" else "tv"))
+    seen = {(query, year or None, media_type)}
+    unique = []
+    for variant in variants:
+        if variant not in seen:
+            seen.add(variant)
+            unique.append(variant)
+    return unique
+
+
+def _search_variant(client, query, year, media_type):
+    try:
+        return search_media(client, query, year, media_type)
+    except Exception:
+        # Erro em uma alternativa nao derruba a busca
+        return []
+
+
+def search_with_fallback(
+    client, query, year, media_type, alternate_type=True, scheduler=None, priority=PRIORITY_SEARCH, token=None
+):
+    """
+    Busca normal; sem resultados, tenta as alternativas de fallback_variants.
+    Com scheduler, elas sao disparadas juntas como sub-tarefas da classe da
+    busca (TaskGroup, dentro do limite dela); sem ele, uma a uma.
+
+    A ordem de preferencia e intencional: "sem ano" ganha de "ano +1" mesmo
+    que este responda antes. As respostas sao lidas conforme chegam, e uma
+    alternativa vence assim que todas as preferidas a ela voltaram vazias,
+    sem esperar as seguintes; as que ainda nao comecaram sao canceladas.
+    Retorna (resultados, tipo dos resultados).
+    """
+    results = search_media(client, query, year, media_type) if query else []
+    if results:
+        return results, media_type
+    variants = fallback_variants(query, year, media_type, alternate_type)
+    if not variants:
+        return [], media_type
+
+    metrics.count("search.fallback")
+    if scheduler is None:
+        for variant in variants:
+            found = _search_variant(client, *variant)
+            if found:
+                metrics.count("search.fallback.hit")
+                return found, variant[2]
+        return [], media_type
+
+    with TaskGroup(scheduler, priority, token) as group:
+        calls = [group.submit(_search_variant, client, *variant) for variant in variants]
+        for _ in group.as_completed(calls):
+            for (_, _, variant_type), call in zip(variants, calls):
+                if not call.done:
+                    break
+                if call.result:
+                    metrics.count("search.fallback.hit")
+                    return call.result, variant_type
+    return [], media_type
+
+
+def tv_destination_folder(kodi_path, series_title, series_year, season_number):
+    """Pasta Kodi de uma temporada: Series/<Serie (Ano)>/Temporada NN"""
+    series_folder_name = KodiNamer.format_series_name_for_kodi(series_title, series_year)
+    season_folder_name = f"Temporada {int(season_number):02d}"
+    return Path(kodi_path) / "Series" / series_folder_name / season_folder_name
+
+
+class MediaItem:
+    """Estado de um arquivo ao longo do pipeline"""
+
+    def __init__(self, path, root=None):
+        self.path = Path(path)
+        self.relative = self.path.relative_to(root).as_posix() if root else self.path.name
+        self.query, self.year = KodiNamer.clean_filename(self.path.name)
+        self.season, self.episode = KodiNamer.extract_episode_info(self.path.name)
+        self.series_query, self.series_year = KodiNamer.extract_series_name(self.path.name)
+        self.media_type = "movie"
+        self.external_ids = {}
+        self.candidates = []
+        self.chosen = None
+        self.confidence = 0.0
+        self.series = None
+        self.season_poster = None
+        # Episodios da temporada do arquivo (opcoes de escolha na interface)
+        self.season_episodes = []
+        self.suggested_name = None
+        self.destination = None
+        # Caminho do mesmo titulo/episodio ja presente na biblioteca do Kodi
+        self.library_match = None
+        # Cabecalho do arquivo (MediaProbe): duracao, titulo embutido, resolucao, idiomas
+        self.probe = None
+        self.status = ITEM_PENDING
+        self.error = None
+
+    def to_dict(self):
+        chosen = None
+        if self.chosen is not None:
+            chosen = {
+                "id": self.chosen.get("id"),
+                "title": result_title(self.chosen, self.media_type),
+                "year": result_year(self.chosen, self.media_type),
+            }
+            if self.series is not None:
+                chosen["series_id"] = self.series.get("id")
+                chosen["series"] = self.series.get("name")
+        return {
+            "file": self.relative,
+            "type": self.media_type,
+            "query": self.series_query if self.media_type == "tv" else self.query,
+            "year": self.year,
+            "ids": self.external_ids or None,
+            "status": self.status,
+            "confidence": round(self.confidence, 3),
+            "match": chosen,
+            "candidates": [candidate.get("id") for candidate in self.candidates[:10]],
+            "suggested_name": self.suggested_name,
+            "destination": str(self.destination) if self.destination else None,
+            "library": self.library_match,
+            "media": self.probe,
+            "error": self.error,
+        }
+
+    @property
+    def duration(self):
+        return (self.probe or {}).get("duration")
+
+    def apply_probe_title(self):
+        """
+        Usa o titulo embutido no arquivo quando o nome nao basta: o ano, se o
+        titulo bater com o nome, ou a busca inteira se o nome nao tiver titulo
+        """
+        title = (self.probe or {}).get("title")
+        if not title:
+            return
+        tag_query, tag_year = KodiNamer.clean_filename(title + self.path.suffix)
+        if not self.query:
+            self.query, self.year = tag_query, self.year or tag_year
+        elif not self.year and tag_year and normalize_title(tag_query) == normalize_title(self.query):
+            self.year = tag_year
+
+    def media_info(self):
+        return {
+            "type": self.media_type,
+            "result": self.chosen,
+            "series": self.series,
+            "season_poster_path": self.season_poster,
+        }
+
+
+def post_transfer(
+    jobs,
+    kodi_root,
+    write_nfo=False,
+    update_library=True,
+    download_artwork=False,
+    image_cache=None,
+    scheduler=None,
+    token=None,
+):
+    """
+    Etapas depois do envio: grava os .nfo e baixa as artes (antes da
+    varredura, para o Kodi ler tudo localmente) e pede ao Kodi a atualizacao
+    das pastas enviadas. Com scheduler, os downloads entram na classe de artes.
+    """
+    report = {"nfo_files": 0, "artwork_files": 0, "kodi_scan": [], "errors": []}
+    if write_nfo:
+        written, errors = write_nfo_files(jobs, kodi_root)
+        report["nfo_files"] = len(written)
+        report["errors"].extend(errors)
+    if download_artwork:
+        downloader = ArtworkDownloader(image_cache=image_cache, scheduler=scheduler, token=token)
+        tasks = downloader.download(jobs, kodi_root)
+        report["artwork_files"] = sum(1 for task in tasks if task.status == ART_DOWNLOADED)
+        report["errors"].extend(
+            f"{task.label}: erro ao baixar {task.destination.name} ({task.error})"
+            for task in tasks
+            if task.status == ART_FAILED
+        )
+    if update_library:
+        try:
+            report["kodi_scan"] = update_kodi_library(jobs, kodi_root)
+        except Exception as e:
+            report["errors"].append(str(e))
+    return report
+
+
+class BatchPipeline:
+    """Executa o fluxo completo para uma pasta, sem interface grafica"""
+
+    def __init__(
+        self,
+        client,
+        media_type="movie",
+        min_confidence=DEFAULT_MIN_CONFIDENCE,
+        workers=8,
+        probe_cache=None,
+        name_resolution=False,
+        scheduler=None,
+        priority=PRIORITY_SEARCH,
+        token=None,
+    ):
+        """
+        Args:
+            workers: Chamadas ao TMDB em paralelo quando o pipeline tem o
+                proprio scheduler (CLI, watch)
+            scheduler, priority, token: TaskScheduler da interface; o
+                trabalho paralelo do pipeline vira sub-tarefa da classe
+                priority e respeita o limite dela
+        """
+        self.client = client
+        self.media_type = media_type
+        self.min_confidence = min_confidence
+        self.workers = max(int(workers), 1)
+        self.scheduler = scheduler or TaskScheduler(workers=self.workers, limits={priority: self.workers})
+        self.priority = priority
+        self.token = token
+        # MediaProbeCache: sem ele os arquivos nao sao abertos
+        self.probe_cache = probe_cache
+        self.name_resolution = name_resolution
+        self.items = []
+
+    def scan(self, folder):
+        root = Path(folder)
+        return self.load(scan_video_files(root), root)
+
+    def load(self, paths, root=None):
+        """Interpreta uma lista de arquivos ja conhecida (ex.: a tabela da interface)"""
+        with metrics.span("parse"):
+            self.items = [MediaItem(path, root) for path in paths]
+        listing_cache = {}
+        with metrics.span("parse.ids"):
+            for item in self.items:
+                item.media_type = self.media_type
+                item.external_ids = external_ids_for(item.path, self.media_type, listing_cache)
+        self.probe_items()
+        return self.items
+
+    def probe_items(self):
+        """Le o cabecalho dos arquivos (em paralelo, com cache) e aplica o titulo embutido"""
+        if self.probe_cache is None or not self.items:
+            return
+        infos = self.probe_cache.get_many([item.path for item in self.items], self.scheduler, self.priority, self.token)
+        for item, info in zip(self.items, infos):
+            item.probe = info
+            item.apply_probe_title()
+        try:
+            self.probe_cache.save()
+        except OSError:
+            pass
+
+    def quality_for(self, item):
+        return resolution_label(item.probe) if self.name_resolution else None
+
+    def match_library(self, library_index):
+        """
+        Marca (ITEM_IN_LIBRARY) os itens cujo titulo/ano ou episodio ja esta
+        na biblioteca do Kodi; resolve() nao busca esses. Retorna quantos
+        """
+        matched = 0
+        with metrics.span("library.match"):
+            for item in self.items:
+                if item.status != ITEM_PENDING:
+                    continue
+                item.library_match = library_index.match_name(item.path.name, item.media_type)
+                if item.library_match:
+                    item.status = ITEM_IN_LIBRARY
+                    item.error = f"ja esta na biblioteca do Kodi: {item.library_match}"
+                    matched += 1
+        metrics.count("library.matched", matched)
+        return matched
+
+    def searchable_items(self):
+        return [item for item in self.items if item.status != ITEM_IN_LIBRARY]
+
+    def resolve(self):
+        """Busca e ranqueia todos os itens (buscas repetidas sao feitas uma vez)"""
+        if self.media_type == "tv":
+            self._resolve_tv()
+        else:
+            self._resolve_movies()
+        return self.items
+
+    def _map(self, fn, items):
+        """fn(item) de cada item, como sub-tarefas da classe do pipeline no scheduler"""
+        return map_tasks(fn, items, self.scheduler, self.priority, self.token)
+
+    def _parallel_search(self, keys, media_type):
+        """{(query, year): (resultados, erro, tipo dos resultados)}, com fallback para buscas vazias"""
+        def run(key):
+            query, year = key
+            try:
+                # Series nao tentam filme: sem episodio o arquivo nao teria nome
+                results, result_type = search_with_fallback(
+                    self.client,
+                    query,
+                    year,
+                    media_type,
+                    alternate_type=media_type == "movie",
+                    scheduler=self.scheduler,
+                    priority=self.priority,
+                    token=self.token,
+                )
+                return key, (results, None, result_type)
+            except Exception as e:
+                return key, ([], str(e), media_type)
+
+        return dict(self._map(run, keys))
+
+    def _parallel_lookup(self, items, media_type):
+        """Resolve pelos ids (cada id uma vez). Retorna {ids: resultado ou None}"""
+        keys = sorted({tuple(sorted(item.external_ids.items())) for item in items if item.external_ids})
+
+        def run(key):
+            try:
+                return key, lookup_by_ids(self.client, dict(key), media_type)
+            except Exception:
+                # Falha na busca exata: o item volta para a busca por texto
+                return key, None
+
+        if not keys:
+            return {}
+        found = dict(self._map(run, keys))
+        metrics.count("lookup.by_id", sum(1 for result in found.values() if result))
+        return found
+
+    @staticmethod
+    def _id_result(item, found):
+        if not item.external_ids:
+            return None
+        return found.get(tuple(sorted(item.external_ids.items())))
+
+    def _fetch_runtimes(self, items, responses):
+        """
+        Duracao no TMDB (minutos) dos candidatos empatados de itens com
+        duracao conhecida, ex.: remake e original com o mesmo titulo. So
+        esses vao aos detalhes, no maximo MAX_RUNTIME_LOOKUPS por item.
+        """
+        ids = set()
+        for item in items:
+            if not item.duration or (item.query, item.year) not in responses:
+                continue
+            results, error, result_type = responses[(item.query, item.year)]
+            if error or result_type != "movie":
+                continue
+            ranked = rank_results(item.query, item.year, results, "movie")
+            tied = [result for score, result in ranked if score >= ranked[0][0] - RUNTIME_TIE_MARGIN] if ranked else []
+            if len(tied) > 1:
+                ids.update(result["id"] for result in tied[:MAX_RUNTIME_LOOKUPS] if result.get("id") is not None)
+        if not ids:
+            return {}
+
+        def fetch(movie_id):
+            try:
+                return movie_id, self.client.get_movie_details(movie_id).get("runtime")
+            except Exception:
+                return movie_id, None
+
+        with metrics.span("rank.runtime"):
+            runtimes = dict(self._map(fetch, sorted(ids)))
+        metrics.count("rank.runtime_lookups", len(ids))
+        return {movie_id: runtime for movie_id, runtime in runtimes.items() if runtime}
+
+    def _accept(self, item, confidence):
+        item.confidence = confidence
+        item.status = ITEM_ACCEPTED if confidence >= self.min_confidence else ITEM_REVIEW
+
+    def _resolve_movies(self):
+        items = self.searchable_items()
+        found = self._parallel_lookup(items, "movie")
+        keys = sorted(
+            {(item.query, item.year) for item in items if item.query and not self._id_result(item, found)},
+            key=str,
+        )
+        responses = self._parallel_search(keys, "movie")
+        runtimes = self._fetch_runtimes(
+            [item for item in items if not self._id_result(item, found)], responses
+        )
+        for item in items:
+            exact = self._id_result(item, found)
+            if exact:
+                item.candidates = [exact]
+                item.chosen = exact
+                item.suggested_name = KodiNamer.suggest_kodi_filename(
+                    item.path.name, result_title(exact, "movie"), result_year(exact, "movie"), self.quality_for(item)
+                )
+                self._accept(item, 1.0)
+                continue
+            if not item.query:
+                item.status = ITEM_NOT_FOUND
+                continue
+            results, error, result_type = responses[(item.query, item.year)]
+            if error:
+                item.status = ITEM_ERROR
+                item.error = error
+                continue
+            if result_type != "movie":
+                # Achou so como serie: fica para revisao, sem nome sugerido
+                item.status = ITEM_REVIEW
+                item.error = f"nenhum filme encontrado; serie com esse nome: {result_label(results[0], result_type)}"
+                continue
+            if runtimes:
+                results = [
+                    {**result, "runtime": runtimes[result.get("id")]} if result.get("id") in runtimes else result
+                    for result in results
+                ]
+            ranked = rank_results(item.query, item.year, results, "movie", item.duration)
+            if not ranked:
+                item.status = ITEM_NOT_FOUND
+                continue
+            item.candidates = [result for _, result in ranked]
+            confidence, item.chosen = ranked[0]
+            item.suggested_name = KodiNamer.suggest_kodi_filename(
+                item.path.name,
+                result_title(item.chosen, "movie"),
+                result_year(item.chosen, "movie"),
+                self.quality_for(item),
+            )
+            self._accept(item, confidence)
+
+    def _resolve_tv(self):
+        items = self.searchable_items()
+        found = self._parallel_lookup([item for item in items if item.episode], "tv")
+        keys = sorted(
+            {
+                (item.series_query, item.series_year)
+                for item in items
+                if item.series_query and item.episode and not self._id_result(item, found)
+            },
+            key=str,
+        )
+        responses = self._parallel_search(keys, "tv")
+        series_by_key = {}
+        for key, (results, error, _) in responses.items():
+            ranked = rank_results(key[0], key[1], results, "tv")
+            series_by_key[key] = (ranked[0] if ranked else None, error)
+
+        def series_for(item):
+            exact = self._id_result(item, found)
+            if exact:
+                return (1.0, exact), None
+            return series_by_key.get((item.series_query, item.series_year), (None, None))
+
+        needed_seasons = set()
+        for item in items:
+            best, _ = series_for(item)
+            if best is not None and item.season is not None:
+                needed_seasons.add((best[1].get("id"), item.season))
+
+        seasons = fetch_seasons(self.client, needed_seasons, self.scheduler, self.priority, self.token)
+        episodes = index_episodes(seasons)
+
+        for item in items:
+            if item.episode is None or not (item.series_query or self._id_result(item, found)):
+                item.status = ITEM_NOT_FOUND
+                item.error = "episodio nao identificado no nome"
+                continue
+            best, error = series_for(item)
+            if error:
+                item.status = ITEM_ERROR
+                item.error = error
+                continue
+            if best is None:
+                item.status = ITEM_NOT_FOUND
+                continue
+            confidence, item.series = best
+            season_details = seasons.get((item.series.get("id"), item.season), {})
+            item.season_episodes = season_details.get("episodes", [])
+            item.season_poster = season_details.get("poster_path")
+            episode = episodes.get((item.series.get("id"), item.season, item.episode))
+            if episode is None:
+                item.status = ITEM_NOT_FOUND
+                item.error = f"episodio S{item.season:02d}E{item.episode:02d} nao encontrado"
+                continue
+            item.chosen = episode
+            series_title = KodiNamer.format_series_name_for_kodi(
+                item.series.get("name", ""), result_year(item.series, "tv") or None
+            )
+            item.suggested_name = KodiNamer.suggest_episode_filename(
+                item.path.name, series_title, item.season, item.episode, episode.get("name", ""), self.quality_for(item)
+            )
+            self._accept(item, confidence)
+
+    def destination_for(self, item, kodi_path):
+        if item.media_type == "tv" and item.series is not None:
+            folder = tv_destination_folder(
+                kodi_path, item.series.get("name", ""), result_year(item.series, "tv") or None, item.season
+            )
+            return folder / item.suggested_name
+        return Path(kodi_path) / item.suggested_name
+
+    def plan(self, kodi_path, move=False, mode=SEND_MODE_COPY, kodi_index=None, kodi_library=None):
+        """Monta o plano de envio com os itens aceitos automaticamente"""
+        if kodi_index is None:
+            kodi_index, kodi_library, _ = load_kodi_index(kodi_path)
+        planner = TransferPlanner(
+            kodi_root=kodi_path, kodi_index=kodi_index, move=move, mode=mode, kodi_library=kodi_library
+        )
+        for index, item in enumerate(self.items):
+            if item.status != ITEM_ACCEPTED:
+                continue
+            item.destination = self.destination_for(item, kodi_path)
+            planner.add(item.path, item.destination, label=item.relative, row=index, media=item.media_info())
+        plan = planner.build()
+        for plan_item in plan.rejected_items:
+            item = self.items[plan_item.row]
+            item.status = ITEM_SKIPPED
+            item.error = plan_item.error
+        return plan
+
+    def transfer(self, plan, verify=VERIFY_SAMPLE, journal=None, progress_callback=None):
+        plan.create_directories()
+        jobs = plan.build_jobs(verify=verify)
+        rows = [item.row for item in plan.accepted_items]
+        TransferQueue(jobs, progress_callback=progress_callback, journal=journal).run()
+        for row, job in zip(rows, jobs):
+            item = self.items[row]
+            if job.status == STATUS_DONE:
+                item.status = ITEM_SENT
+            else:
+                item.status = ITEM_FAILED
+                item.error = job.error or job.status
+        return jobs
+
+    def summary(self):
+        counts = {}
+        for item in self.items:
+            counts[item.status] = counts.get(item.status, 0) + 1
+        counts["total"] = len(self.items)
+        return counts
@@ -0,0 +1,211 @@
+"""
+Perfilamento (cProfile) de uma sessao inteira ou de uma acao
+
+Ligado por KODIBOT_PROFILE no ambiente ou PROFILE nas configuracoes:
+    session          o processo inteiro, gravado na saida
+    search,send      so as acoes listadas ("Buscar Filmes", "Enviar Arquivos")
+
+Cada perfil gera, em <config>/profiles, um .prof (abrir com pstats ou
+snakeviz) e um .txt com as funcoes mais caras. Threads de trabalho entram
+no mesmo perfil: threading.Thread automaticamente, QThread via
+thread_profile().
+"""
+
+import atexit
+import contextlib
+import cProfile
+import io
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+
+from src.core.config import get_config_dir, get_setting
+
+PROFILE_DIRNAME = "profiles"
+PROFILE_SESSION = "session"
+ACTION_SEARCH = "search"
+ACTION_SEND = "send"
+TOP_N = 40
+
+# A partir do 3.12 o cProfile usa sys.monitoring e ja enxerga todas as
+# threads; antes disso cada thread precisa do proprio profiler
+PER_THREAD_PROFILERS = sys.version_info < (3, 12)
+
+_active = None
+_local = threading.local()
+
+
+def configured_targets():
+    value = os.getenv("KODIBOT_PROFILE")
+    if value is None:
+        try:
+            value = get_setting("PROFILE")
+        except OSError:
+            value = None
+    return {part.strip().lower() for part in (value or "").split(",") if part.strip()}
+
+
+class ProfileSession:
+    def __init__(self, label):
+        self.label = label
+        self.started_at = time.time()
+        self.profilers = []
+        self._lock = threading.Lock()
+        self._main = None
+        self.stopped = False
+
+    def _new_profiler(self):
+        profiler = cProfile.Profile()
+        with self._lock:
+            self.profilers.append(profiler)
+        return profiler
+
+    def _thread_hook(self, frame, event, arg):
+        # Primeiro evento de uma threading.Thread nova: troca o gancho pelo profiler
+        sys.setprofile(None)
+        if self.stopped:
+            return
+        profiler = self._new_profiler()
+        _local.hooked = (self, profiler)
+        profiler.enable()
+
+    def start(self):
+        self._main = self._new_profiler()
+        self._main.enable()
+        if PER_THREAD_PROFILERS:
+            threading.setprofile(self._thread_hook)
+
+    @contextlib.contextmanager
+    def thread_profile(self):
+        if not PER_THREAD_PROFILERS:
+            yield
+            return
+        # O profiler deste bloco substitui o que o gancho instalou na thread
+        release_thread(force=True)
+        profiler = self._new_profiler()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+
+    def stop(self):
+        """Para o perfil e grava .prof e .txt. Retorna o caminho do .prof"""
+        if PER_THREAD_PROFILERS:
+            threading.setprofile(None)
+        self.stopped = True
+        self._main.disable()
+        release_thread()
+
+        with self._lock:
+            profilers = list(self.profilers)
+        stats = None
+        for profiler in profilers:
+            try:
+                if stats is None:
+                    stats = pstats.Stats(profiler)
+                else:
+                    stats.add(profiler)
+            except TypeError:
+                # Profiler de thread que nao chegou a registrar nada
+                continue
+        if stats is None:
+            return None
+
+        folder = get_config_dir() / PROFILE_DIRNAME
+        folder.mkdir(parents=True, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self.started_at))
+        base = folder / f"{stamp}-{re.sub(r'[^a-z0-9_-]', '_', self.label.lower())}"
+        prof_path = base.with_suffix(".prof")
+        stats.dump_stats(str(prof_path))
+
+        summary = io.StringIO()
+        summary.write(
+            f"Perfil: {self.label}\n"
+            f"Duracao: {time.time() - self.started_at:.1f} s, {len(profilers)} thread(s)\n\n"
+        )
+        stats.stream = summary
+        summary.write(f"== Top {TOP_N} por tempo acumulado ==\n")
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(TOP_N)
+        summary.write(f"== Top {TOP_N} por tempo proprio ==\n")
+        stats.sort_stats(pstats.SortKey.TIME).print_stats(TOP_N)
+        base.with_suffix(".txt").write_text(summary.getvalue(), encoding="utf-8")
+        return prof_path
+
+
+def release_thread(force=False):
+    """
+    Desliga o profiler que o gancho instalou na thread atual se a sessao dele
+    ja terminou (ou sempre, com force). Antes do 3.12 um profiler so pode ser
+    desligado pela propria thread, entao threads longas (TaskScheduler)
+    chamam isto entre uma tarefa e outra
+    """
+    hooked = getattr(_local, "hooked", None)
+    if hooked is None:
+        return
+    session, profiler = hooked
+    if force or session.stopped:
+        _local.hooked = None
+        profiler.disable()
+
+
+def is_active():
+    return _active is not None
+
+
+def start(label):
+    """Inicia um perfil se nenhum estiver ativo. Retorna True se iniciou"""
+    global _active
+    if _active is not None:
+        return False
+    _active = ProfileSession(label)
+    _active.start()
+    return True
+
+
+def stop():
+    global _active
+    session, _active = _active, None
+    if session is None:
+        return None
+    try:
+        return session.stop()
+    except OSError:
+        return None
+
+
+def start_session_if_enabled(label=PROFILE_SESSION):
+    """Perfila o processo inteiro quando configurado; grava ao sair"""
+    if PROFILE_SESSION not in configured_targets():
+        return False
+    if start(label):
+        atexit.register(stop)
+        return True
+    return False
+
+
+def begin_action(action):
+    """Inicia o perfil de uma acao se ela estiver configurada (e nao houver sessao)"""
+    if _active is None and action in configured_targets():
+        start(action)
+
+
+def end_action(action):
+    """Encerra o perfil aberto por begin_action(action). Retorna o .prof ou None"""
+    if _active is not None and _active.label == action:
+        return stop()
+    return None
+
+
+@contextlib.contextmanager
+def thread_profile():
+    """Para QThread.run(): inclui a thread no perfil ativo, se houver"""
+    session = _active
+    if session is None:
+        yield
+        return
+    with session.thread_profile():
+        yield
@@ -0,0 +1,84 @@
+"""
+Medicao do tempo de inicializacao por fase
+
+Cada fase e marcada com mark(); o relatorio mostra a duracao de cada uma e
+o tempo total desde o inicio do processo, incluindo o primeiro desenho da
+janela (time-to-first-paint).
+"""
+
+import json
+import os
+import sys
+import time
+
+from src.core.config import get_config_dir
+
+REPORT_FILENAME = "startup_timing.json"
+FIRST_PAINT_BUDGET_MS = 300
+
+PROCESS_START = time.perf_counter()
+_phases = []
+_last_mark = PROCESS_START
+
+
+def mark(name):
+    """Registra o fim de uma fase, medida a partir da marca anterior"""
+    global _last_mark
+    now = time.perf_counter()
+    _phases.append(
+        {
+            "name": name,
+            "ms": round((now - _last_mark) * 1000, 1),
+            "since_start_ms": round((now - PROCESS_START) * 1000, 1),
+        }
+    )
+    _last_mark = now
+
+
+def get_phase(name):
+    for phase in _phases:
+        if phase["name"] == name:
+            return phase
+    return None
+
+
+def build_report():
+    first_paint = get_phase("first_paint")
+    first_paint_ms = first_paint["since_start_ms"] if first_paint else None
+    return {
+        "phases": list(_phases),
+        "first_paint_ms": first_paint_ms,
+        "first_paint_budget_ms": FIRST_PAINT_BUDGET_MS,
+        "within_budget": first_paint_ms is not None and first_paint_ms <= FIRST_PAINT_BUDGET_MS,
+    }
+
+
+def format_report(report=None):
+    report = report or build_report()
+    lines = ["Tempo de inicializacao:"]
+    for phase in report["phases"]:
+        lines.append(f"  {phase['name']:<24}{phase['ms']:>9.1f} ms  (t={phase['since_start_ms']:.1f} ms)")
+    if report["first_paint_ms"] is not None:
+        status = "ok" if report["within_budget"] else "ACIMA DO LIMITE"
+        lines.append(
+            f"  primeiro desenho em {report['first_paint_ms']:.1f} ms "
+            f"(limite {report['first_paint_budget_ms']} ms: {status})"
+        )
+    return "\n".join(lines)
+
+
+def save_report():
+    """
+    Grava o relatorio na pasta de configuracao; com KODIBOT_STARTUP_REPORT=1
+    tambem imprime no stderr
+    """
+    report = build_report()
+    try:
+        path = get_config_dir() / REPORT_FILENAME
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    except OSError:
+        pass
+    if os.getenv("KODIBOT_STARTUP_REPORT"):
+        print(format_report(report), file=sys.stderr)
+    return report
@@ -0,0 +1,33 @@
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from src.core.TaskScheduler import PRIORITY_SEARCH, CancelToken, TaskScheduler
+
+
+class QtTaskScheduler(QObject):
+    """
+    TaskScheduler com o retorno na thread da interface: on_done(resultado,
+    erro) chega pelo loop de eventos do Qt, e nao e chamado se o token foi
+    cancelado nesse meio tempo.
+    """
+    task_finished = pyqtSignal(object, object, object, object)
+
+    def __init__(self, parent=None, scheduler=None):
+        super().__init__(parent)
+        self.scheduler = scheduler or TaskScheduler()
+        self.task_finished.connect(self._deliver)
+
+    def run(self, fn, priority=PRIORITY_SEARCH, on_done=None, token=None):
+        """Agenda fn(token) e retorna o token para cancelar"""
+        token = token or CancelToken()
+
+        def callback(result, error):
+            self.task_finished.emit(token, on_done, result, error)
+
+        return self.scheduler.submit(fn, priority, callback, token)
+
+    def _deliver(self, token, on_done, result, error):
+        if on_done is not None and not token.cancelled:
+            on_done(result, error)
+
+    def shutdown(self):
+        self.scheduler.shutdown()
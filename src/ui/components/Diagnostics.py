@@ -0,0 +1,111 @@
+from PyQt6.QtWidgets import (
+    QCheckBox,
+    QDialog,
+    QFileDialog,
+    QHBoxLayout,
+    QHeaderView,
+    QLabel,
+    QMessageBox,
+    QPushButton,
+    QTableWidget,
+    QTableWidgetItem,
+    QVBoxLayout,
+)
+
+from src.core import metrics
+from src.core.config import set_setting
+
+
+class Diagnostics(QDialog):
+    """Mostra os spans, contadores e medidores coletados em src.core.metrics"""
+
+    COLUMNS = ["Metrica", "Chamadas", "Erros", "Total (ms)", "Media (ms)", "Max (ms)"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setObjectName("Diagnostics")
+        self.setWindowTitle("Diagnostico de Desempenho")
+        self.resize(720, 420)
+
+        layout = QVBoxLayout(self)
+
+        self.enabled_checkbox = QCheckBox("Coletar metricas (salvo nas configuracoes)")
+        self.enabled_checkbox.setChecked(metrics.is_enabled())
+        self.enabled_checkbox.toggled.connect(self.on_enabled_toggled)
+        layout.addWidget(self.enabled_checkbox)
+
+        self.summary_label = QLabel("")
+        layout.addWidget(self.summary_label)
+
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        layout.addWidget(self.table)
+
+        buttons = QHBoxLayout()
+        refresh_btn = QPushButton("Atualizar")
+        refresh_btn.clicked.connect(self.refresh)
+        buttons.addWidget(refresh_btn)
+
+        reset_btn = QPushButton("Zerar")
+        reset_btn.clicked.connect(self.on_reset)
+        buttons.addWidget(reset_btn)
+
+        export_btn = QPushButton("Exportar...")
+        export_btn.clicked.connect(self.on_export)
+        buttons.addWidget(export_btn)
+
+        buttons.addStretch()
+        close_btn = QPushButton("Fechar")
+        close_btn.clicked.connect(self.accept)
+        buttons.addWidget(close_btn)
+        layout.addLayout(buttons)
+
+        self.refresh()
+
+    def refresh(self):
+        data = metrics.snapshot()
+        rows = [
+            (name, stats["count"], stats["errors"], stats["total_ms"], stats["mean_ms"], stats["max_ms"])
+            for name, stats in data["spans"].items()
+        ]
+        rows.extend((name, value, "", "", "", "") for name, value in data["counters"].items())
+        rows.extend((name, value, "", "", "", "") for name, value in data["gauges"].items())
+
+        self.table.setRowCount(len(rows))
+        for row, values in enumerate(rows):
+            for column, value in enumerate(values):
+                text = f"{value:.1f}" if isinstance(value, float) else str(value)
+                self.table.setItem(row, column, QTableWidgetItem(text))
+
+        if not data["enabled"]:
+            self.summary_label.setText("Coleta desligada: marque a opcao acima e repita a acao lenta")
+        else:
+            self.summary_label.setText(f"Coletando ha {data['elapsed_seconds']:.0f} s")
+
+    def on_enabled_toggled(self, checked):
+        metrics.enable(checked)
+        try:
+            set_setting("METRICS_ENABLED", "true" if checked else "false")
+        except OSError:
+            pass
+        self.refresh()
+
+    def on_reset(self):
+        metrics.reset()
+        self.refresh()
+
+    def on_export(self):
+        path, _ = QFileDialog.getSaveFileName(
+            self,
+            "Exportar metricas",
+            "kodibot-metrics.json",
+            "JSON (*.json);;Prometheus (*.prom)",
+        )
+        if not path:
+            return
+        try:
+            metrics.write_export(path)
+        except OSError as exc:
+            QMessageBox.critical(self, "Erro", f"Nao foi possivel exportar:\n{exc}")
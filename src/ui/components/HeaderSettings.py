@@ -7,6 +7,7 @@ class HeaderSettings(QWidget):
     refresh_requested = pyqtSignal()
     search_type_changed = pyqtSignal(str)
     more_settings_requested = pyqtSignal()
+    diagnostics_requested = pyqtSignal()
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -35,6 +36,11 @@ class HeaderSettings(QWidget):
         more_settings_btn.clicked.connect(self.more_settings_requested.emit)
         config_layout.addWidget(more_settings_btn)
 
+        diagnostics_btn = QPushButton("📊")
+        diagnostics_btn.setToolTip("Diagnostico de desempenho")
+        diagnostics_btn.clicked.connect(self.diagnostics_requested.emit)
+        config_layout.addWidget(diagnostics_btn)
+
         config_layout.addWidget(QLabel("Tipo:"))
         self.search_type_combo = QComboBox()
         self.search_type_combo.addItem("Filmes", "movie")
@@ -1,5 +1,15 @@
 from PyQt6.QtWidgets import QCheckBox, QComboBox, QDialog, QDialogButtonBox, QFormLayout, QInputDialog, QLineEdit, QWidget
 from src.core.config import set_setting
+from src.core.TitleTranslations import NAMING_ORIGINAL
+from src.core.FileTransfer import (
+    SEND_MODE_COPY,
+    SEND_MODE_HARDLINK,
+    SEND_MODE_REFLINK,
+    SEND_MODE_RENAME,
+    VERIFY_FULL,
+    VERIFY_NONE,
+    VERIFY_SAMPLE,
+)
 
 
 class MoreSettings(QWidget):
@@ -9,6 +19,19 @@ class MoreSettings(QWidget):
         ("Spanish (ES)", "es-ES"),
     ]
 
+    SEND_MODE_OPTIONS = [
+        ("Copiar", SEND_MODE_COPY),
+        ("Mover (renomear no mesmo disco)", SEND_MODE_RENAME),
+        ("Hardlink (mantem o arquivo original)", SEND_MODE_HARDLINK),
+        ("Reflink btrfs/XFS (copia se nao suportado)", SEND_MODE_REFLINK),
+    ]
+
+    VERIFY_OPTIONS = [
+        ("Por amostragem (rapida)", VERIFY_SAMPLE),
+        ("Completa (checksum do arquivo inteiro)", VERIFY_FULL),
+        ("Nenhuma", VERIFY_NONE),
+    ]
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setObjectName("MoreSettings")
@@ -25,7 +48,18 @@ class MoreSettings(QWidget):
             set_setting("TMDB_API_KEY", key)
         return key if ok and key else None
 
-    def open_settings_dialog(self, current_language=None, remove_original_after_send=False):
+    def open_settings_dialog(
+        self,
+        current_language=None,
+        remove_original_after_send=False,
+        current_send_mode=None,
+        current_verify_mode=None,
+        current_kodi_rpc=None,
+        write_nfo=False,
+        download_artwork=False,
+        current_naming_language=None,
+        name_resolution=False,
+    ):
         dialog = QDialog(self)
         dialog.setWindowTitle("Mais Configuracoes")
 
@@ -47,11 +81,92 @@ class MoreSettings(QWidget):
                 
         layout.addRow("Idioma:", language_combo)
 
+        naming_combo = QComboBox(dialog)
+        naming_combo.addItem("Mesmo idioma do app", "")
+        naming_combo.addItem("Titulo original", NAMING_ORIGINAL)
+        for label, value in self.LANGUAGE_OPTIONS:
+            naming_combo.addItem(label, value)
+        naming_index = naming_combo.findData(current_naming_language or "")
+        if naming_index >= 0:
+            naming_combo.setCurrentIndex(naming_index)
+        naming_combo.setToolTip("Idioma do titulo nos nomes sugeridos; trocar nao refaz as buscas")
+        layout.addRow("Titulo nos nomes:", naming_combo)
+
+        name_resolution_checkbox = QCheckBox(dialog)
+        name_resolution_checkbox.setChecked(bool(name_resolution))
+        name_resolution_checkbox.setText("Incluir a resolucao lida do arquivo (ex.: Filme (2010) 1080p.mkv)")
+        layout.addRow("Resolucao no nome:", name_resolution_checkbox)
+
         remove_original_checkbox = QCheckBox(dialog)
         remove_original_checkbox.setChecked(bool(remove_original_after_send))
         remove_original_checkbox.setText("Apagar arquivo da pasta de filmes após enviar")
         layout.addRow("Ao enviar:", remove_original_checkbox)
 
+        send_mode_combo = QComboBox(dialog)
+        for label, value in self.SEND_MODE_OPTIONS:
+            send_mode_combo.addItem(label, value)
+        send_mode_combo.setToolTip(
+            "Renomear, hardlink e reflink so evitam a copia quando as pastas estao no mesmo disco"
+        )
+
+        if current_send_mode:
+            mode_index = send_mode_combo.findData(current_send_mode)
+            if mode_index >= 0:
+                send_mode_combo.setCurrentIndex(mode_index)
+
+        layout.addRow("Modo de envio:", send_mode_combo)
+
+        verify_combo = QComboBox(dialog)
+        for label, value in self.VERIFY_OPTIONS:
+            verify_combo.addItem(label, value)
+        verify_combo.setToolTip("Confere a copia antes de apagar o arquivo original")
+
+        if current_verify_mode:
+            verify_index = verify_combo.findData(current_verify_mode)
+            if verify_index >= 0:
+                verify_combo.setCurrentIndex(verify_index)
+
+        layout.addRow("Verificacao:", verify_combo)
+
+        write_nfo_checkbox = QCheckBox(dialog)
+        write_nfo_checkbox.setChecked(bool(write_nfo))
+        write_nfo_checkbox.setText("Gravar .nfo com os dados do TMDB (Kodi importa sem buscar de novo)")
+        layout.addRow("Arquivos .nfo:", write_nfo_checkbox)
+
+        download_artwork_checkbox = QCheckBox(dialog)
+        download_artwork_checkbox.setChecked(bool(download_artwork))
+        download_artwork_checkbox.setText("Baixar poster, fanart e miniaturas para a pasta do Kodi")
+        layout.addRow("Artes:", download_artwork_checkbox)
+
+        current_kodi_rpc = current_kodi_rpc or {}
+        kodi_rpc_url_input = QLineEdit(dialog)
+        kodi_rpc_url_input.setText(current_kodi_rpc.get("url") or "")
+        kodi_rpc_url_input.setPlaceholderText("http://kodi.local:8080/jsonrpc (vazio desativa)")
+        kodi_rpc_url_input.setToolTip("Apos enviar, pede ao Kodi para atualizar so as pastas que mudaram")
+        layout.addRow("Kodi JSON-RPC:", kodi_rpc_url_input)
+
+        kodi_rpc_path_input = QLineEdit(dialog)
+        kodi_rpc_path_input.setText(current_kodi_rpc.get("path") or "")
+        kodi_rpc_path_input.setPlaceholderText("Pasta Kodi vista pelo Kodi, ex.: smb://nas/kodi/")
+        layout.addRow("Caminho no Kodi:", kodi_rpc_path_input)
+
+        kodi_rpc_user_input = QLineEdit(dialog)
+        kodi_rpc_user_input.setText(current_kodi_rpc.get("user") or "")
+        layout.addRow("Usuario do Kodi:", kodi_rpc_user_input)
+
+        kodi_rpc_password_input = QLineEdit(dialog)
+        kodi_rpc_password_input.setEchoMode(QLineEdit.EchoMode.Password)
+        kodi_rpc_password_input.setPlaceholderText("Deixe vazio para manter a atual")
+        layout.addRow("Senha do Kodi:", kodi_rpc_password_input)
+
+        kodi_db_input = QLineEdit(dialog)
+        kodi_db_input.setText(current_kodi_rpc.get("db_path") or "")
+        kodi_db_input.setPlaceholderText("MyVideosNNN.db ou pasta userdata/Database (vazio desativa)")
+        kodi_db_input.setToolTip(
+            "Le a biblioteca do Kodi (somente leitura, arquivo local) em vez de varrer a pasta Kodi"
+        )
+        layout.addRow("Banco do Kodi:", kodi_db_input)
+
         buttons = QDialogButtonBox(
             QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel,
             parent=dialog
@@ -66,15 +181,39 @@ class MoreSettings(QWidget):
         api_key = api_key_input.text().strip()
         selected_language = language_combo.currentData()
         remove_original = remove_original_checkbox.isChecked()
+        send_mode = send_mode_combo.currentData() or SEND_MODE_COPY
+        verify_mode = verify_combo.currentData() or VERIFY_SAMPLE
+        kodi_rpc_url = kodi_rpc_url_input.text().strip()
+        kodi_rpc_password = kodi_rpc_password_input.text()
 
         if api_key:
             set_setting("TMDB_API_KEY", api_key)
         if selected_language:
             set_setting("APP_LANGUAGE", selected_language)
         set_setting("REMOVE_ORIGINAL_AFTER_SEND", "true" if remove_original else "false")
+        set_setting("SEND_MODE", send_mode)
+        set_setting("VERIFY_MODE", verify_mode)
+        set_setting("NAMING_LANGUAGE", naming_combo.currentData() or "")
+        set_setting("NAME_RESOLUTION", "true" if name_resolution_checkbox.isChecked() else "false")
+        set_setting("WRITE_NFO", "true" if write_nfo_checkbox.isChecked() else "false")
+        set_setting("DOWNLOAD_ARTWORK", "true" if download_artwork_checkbox.isChecked() else "false")
+        set_setting("KODI_RPC_URL", kodi_rpc_url)
+        set_setting("KODI_RPC_PATH", kodi_rpc_path_input.text().strip())
+        set_setting("KODI_RPC_USER", kodi_rpc_user_input.text().strip())
+        if kodi_rpc_password:
+            set_setting("KODI_RPC_PASSWORD", kodi_rpc_password)
+        set_setting("KODI_DB_PATH", kodi_db_input.text().strip())
 
         return {
             "api_key": api_key,
             "language": selected_language,
+            "naming_language": naming_combo.currentData() or "",
+            "name_resolution": name_resolution_checkbox.isChecked(),
             "remove_original_after_send": remove_original,
+            "send_mode": send_mode,
+            "verify_mode": verify_mode,
+            "kodi_rpc_url": kodi_rpc_url,
+            "kodi_db_path": kodi_db_input.text().strip(),
+            "write_nfo": write_nfo_checkbox.isChecked(),
+            "download_artwork": download_artwork_checkbox.isChecked(),
         }
\ No newline at end of file
@@ -136,4 +136,10 @@ class NewFilesList(QWidget):
             self.kodi_files_table.insertRow(row)
             item = QTableWidgetItem(filename)
             item.setFlags(item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-            self.kodi_files_table.setItem(row, 0, item)
\ No newline at end of file
+            self.kodi_files_table.setItem(row, 0, item)
+
+    def insert_kodi_file(self, row, filename):
+        self.kodi_files_table.insertRow(row)
+        item = QTableWidgetItem(filename)
+        item.setFlags(item.flags() & ~Qt.ItemFlag.ItemIsEditable)
+        self.kodi_files_table.setItem(row, 0, item)
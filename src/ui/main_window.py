@@ -1,19 +1,70 @@
-import requests
-import shutil
+import bisect
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit,
     QPushButton, QTableWidgetItem, QMessageBox,
-    QComboBox,
+    QComboBox, QProgressDialog,
 )
-from PyQt6.QtCore import Qt, QThread, pyqtSignal
+from PyQt6.QtCore import Qt, QThread, QTimer, pyqtSignal
 from PyQt6.QtGui import QIcon, QPixmap
 from pathlib import Path
 
+from src.core import metrics, profiling, startup_timing
 from src.core.TmdbClient import TMDBClient
 from src.core.KodiNamer import KodiNamer
+from src.core.LibraryIndex import LibraryIndex
+from src.core.MediaProbe import MediaProbeCache, resolution_label
+from src.core.FileTransfer import (
+    SEND_MODE_COPY,
+    SEND_MODE_HARDLINK,
+    SEND_MODE_REFLINK,
+    SEND_MODES,
+    STATUS_CANCELLED,
+    STATUS_DONE,
+    STATUS_FAILED,
+    VERIFY_MODES,
+    VERIFY_SAMPLE,
+    TransferJob,
+    TransferQueue,
+    format_size,
+)
+from src.core.ArtworkDownloader import POSTER_SIZE, STILL_SIZE, ImageCache, tmdb_image_url
+from src.core.SessionStore import SessionStore
+from src.core.TaskScheduler import (
+    PRIORITY_ARTWORK,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_PREFETCH,
+    PRIORITY_SEARCH,
+    CancelToken,
+)
+from src.core.TitleTranslations import (
+    NAMING_ORIGINAL,
+    TitleTranslations,
+    episode_language,
+    naming_episode_title,
+    naming_title,
+)
+from src.core.TransferJournal import TransferJournal
+from src.core.TransferPlanner import TransferPlanner
+from src.core.pipeline import (
+    ITEM_IN_LIBRARY,
+    BatchPipeline,
+    MediaItem,
+    external_ids_for,
+    fetch_seasons,
+    load_kodi_index,
+    lookup_by_ids,
+    post_transfer,
+    result_label,
+    scan_video_files,
+    search_with_fallback,
+    sort_results_by_date,
+    tv_destination_folder,
+)
 from src.core.assets_handler import get_asset_path
 from src.core.config import get_setting, get_settings_path, set_setting
+from src.ui.QtTaskScheduler import QtTaskScheduler
 from src.ui.components.HeaderSettings import HeaderSettings
+from src.ui.components.Diagnostics import Diagnostics
 from src.ui.components.MoreSettings import MoreSettings
 from src.ui.components.NewFilesList import (
     NewFilesList,
@@ -25,27 +76,119 @@ from src.ui.components.NewFilesList import (
 )
 
 
-class SearchThread(QThread):
-    """Thread para buscar filmes sem bloquear a UI"""
-    search_completed = pyqtSignal(list)
-    search_error = pyqtSignal(str)
-    
-    def __init__(self, query, year, tmdb_client, media_type):
+def search_file(tmdb_client, video_file, media_type, external_ids=None, probe_cache=None, scheduler=None, token=None):
+    """
+    Busca de um arquivo: (resultados, tipo dos resultados). O titulo
+    embutido completa o nome; as alternativas da busca vazia sao
+    sub-tarefas da classe de busca no scheduler
+    """
+    item = MediaItem(video_file)
+    if probe_cache is not None:
+        item.probe = probe_cache.get(video_file)
+        item.apply_probe_title()
+    query, year = item.query, item.year or 0
+    if external_ids:
+        # Id no nome ou no .nfo: uma chamada exata, sem busca por texto
+        try:
+            result = lookup_by_ids(tmdb_client, external_ids, media_type)
+        except Exception:
+            result = None
+        if result:
+            return [result], media_type
+    if not query:
+        return [], media_type
+    return search_with_fallback(
+        tmdb_client, query, year, media_type, scheduler=scheduler, priority=PRIORITY_SEARCH, token=token
+    )
+
+
+def resolve_series_groups(tmdb_client, video_files, library_index=None, probe_cache=None, scheduler=None, token=None):
+    """
+    Agrupa os episodios por serie e resolve cada serie uma vez (menos os ja
+    presentes no Kodi); as buscas internas sao sub-tarefas da classe de busca
+    """
+    pipeline = BatchPipeline(
+        tmdb_client,
+        media_type="tv",
+        probe_cache=probe_cache,
+        scheduler=scheduler,
+        priority=PRIORITY_SEARCH,
+        token=token,
+    )
+    pipeline.load(video_files)
+    if library_index is not None:
+        pipeline.match_library(library_index)
+    return pipeline.resolve()
+
+
+def fetch_translations(translations, tmdb_client, keys, scheduler=None, token=None):
+    """Busca (uma vez por titulo) as traducoes que faltam e grava o cache"""
+    fetched = translations.fetch_missing(tmdb_client, keys, scheduler, PRIORITY_PREFETCH, token)
+    if fetched:
+        try:
+            translations.save()
+        except OSError:
+            pass
+    return fetched
+
+
+class FolderScanThread(QThread):
+    """Thread para varrer as pastas de filmes e do Kodi sem bloquear a UI"""
+    scan_completed = pyqtSignal(str, list, str, list, object, object)
+
+    def __init__(self, movie_folder, kodi_folder):
+        super().__init__()
+        self.movie_folder = movie_folder or ""
+        self.kodi_folder = kodi_folder or ""
+
+    def run(self):
+        video_files = []
+        kodi_entries = []
+        kodi_library = None
+        kodi_error = None
+        with profiling.thread_profile():
+            if self.movie_folder and Path(self.movie_folder).is_dir():
+                video_files = scan_video_files(self.movie_folder)
+            if self.kodi_folder and Path(self.kodi_folder).is_dir():
+                kodi_entries, kodi_library, kodi_error = load_kodi_index(self.kodi_folder)
+        self.scan_completed.emit(
+            self.movie_folder, video_files, self.kodi_folder, kodi_entries, kodi_library, kodi_error
+        )
+
+
+class KeyValidationThread(QThread):
+    """Thread para conferir a TMDB API Key sem atrasar a abertura da janela"""
+    validation_completed = pyqtSignal(object)
+
+    def __init__(self, tmdb_client):
         super().__init__()
-        self.query = query
-        self.year = year
         self.tmdb_client = tmdb_client
-        self.media_type = media_type
-    
+
     def run(self):
-        try:
-            if self.media_type == "tv":
-                results = self.tmdb_client.search_tv(self.query, self.year if self.year > 0 else None)
-            else:
-                results = self.tmdb_client.search_movie(self.query, self.year if self.year > 0 else None)
-            self.search_completed.emit(results)
-        except Exception as e:
-            self.search_error.emit(str(e))
+        with profiling.thread_profile():
+            valid = self.tmdb_client.validate_api_key()
+        self.validation_completed.emit(valid)
+
+
+class TransferThread(QThread):
+    """Thread para enviar arquivos ao Kodi sem bloquear a UI"""
+    progress_changed = pyqtSignal(int, str, float, object, object, float)
+    transfer_completed = pyqtSignal(list)
+
+    def __init__(self, jobs, journal=None):
+        super().__init__()
+        self.queue = TransferQueue(jobs, progress_callback=self._on_progress, journal=journal)
+
+    def cancel(self):
+        self.queue.cancel()
+
+    def _on_progress(self, index, job, total_transferred, total_size, throughput):
+        self.progress_changed.emit(index, job.label, job.throughput, total_transferred, total_size, throughput)
+
+    def run(self):
+        with profiling.thread_profile():
+            jobs = self.queue.run()
+        self.transfer_completed.emit(jobs)
 
 
 class RenomeadorUI(QMainWindow):
@@ -54,22 +197,84 @@ class RenomeadorUI(QMainWindow):
         self.tmdb_client = None
         self.selected_folder = None
         self.video_files = []
-        self.search_thread = None
-        self.current_search_index = 0
+        # Caminho -> linha de video_files, para achar a linha de cada resposta em O(1)
+        self.video_rows = {}
+        self.kodi_entries = []
+        # Chaves em minusculas de kodi_entries, na mesma ordem, para o bisect
+        self.kodi_entry_keys = []
+        self.kodi_library = None
+        # Titulos/episodios ja presentes no Kodi (LibraryIndex), montado na primeira busca
+        self.library_index = None
+        self.library_skipped = 0
+        # Fila unica de tarefas em segundo plano (TMDB, posters, traducoes, artes)
+        self.tasks = QtTaskScheduler(self)
+        # Busca em lote: um token cancela todas as linhas pendentes
+        self.search_token = None
+        self.searches_remaining = 0
+        self.poster_token = None
+        # Busca de serie -> temporadas -> episodios do painel de series
+        self.series_task_token = None
+        # Listagem de .nfo por pasta durante uma busca (external_ids_for)
+        self.nfo_listing_cache = {}
+        self.series_group_token = None
+        self.scan_thread = None
+        self.scan_pending = False
+        self.key_validation_thread = None
+        self.first_paint_done = False
+        self.transfer_thread = None
+        self.transfer_progress = None
+        self.transfer_errors = []
+        self.transfer_journal = TransferJournal()
         self.search_results = []
         self.search_types = []
+        # Serie de cada linha de episodio: {"series": resultado TMDB, "season_poster_path": ...}
+        self.series_info = []
+        self.session_store = SessionStore()
+        self.translations = TitleTranslations()
+        # Cabecalho dos videos (duracao, titulo embutido, resolucao), lido na busca
+        self.probe_cache = MediaProbeCache()
+        # NAME_RESOLUTION, lido sob demanda
+        self.name_resolution = None
+        self.translation_token = None
+        self.pending_translation_keys = set()
+        # Idioma dos titulos nos nomes (NAMING_LANGUAGE ou APP_LANGUAGE), lido sob demanda
+        self.naming_language = None
+        self.restoring_rows = False
         self.active_search_type = "movie"
         self.poster_cache = {}
+        self.image_cache = ImageCache()
         self.series_results = []
+        self.selected_series = None
         self.selected_series_id = None
         self.selected_series_title = ""
         self.selected_series_year = None
         self.selected_season_number = None
+        self.selected_season_poster = None
         self.season_episodes = []
+        # Detalhes de temporada ja buscados: (id da serie, temporada) -> detalhes
+        self.season_details = {}
         
         self.init_ui()
+        self.session_save_timer = QTimer(self)
+        self.session_save_timer.setSingleShot(True)
+        self.session_save_timer.setInterval(1000)
+        self.session_save_timer.timeout.connect(self.save_session)
+        startup_timing.mark("init_ui")
+
+    def finish_startup(self):
         self.init_tmdb()
+        startup_timing.mark("init_tmdb")
         self.load_folder_preference()
+        startup_timing.mark("folder_scan_started")
+        self.check_interrupted_transfers()
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self.first_paint_done:
+            self.first_paint_done = True
+            startup_timing.mark("first_paint")
+            # Configuracao do TMDB e varredura das pastas so depois da janela aparecer
+            QTimer.singleShot(0, self.finish_startup)
     
     def init_ui(self):
         """Inicializa a interface gráfica"""
@@ -91,6 +296,7 @@ class RenomeadorUI(QMainWindow):
         self.header_config.refresh_requested.connect(self.refresh_files_lists)
         self.header_config.search_type_changed.connect(self.on_search_type_changed)
         self.header_config.more_settings_requested.connect(self.open_more_settings)
+        self.header_config.diagnostics_requested.connect(self.open_diagnostics)
         layout.addWidget(self.header_config)
 
         self.search_type_combo = self.header_config.search_type_combo
@@ -139,6 +345,7 @@ class RenomeadorUI(QMainWindow):
         self.select_column = self.files_section.select_column
         self.send_to_kodi_column = self.files_section.send_to_kodi_column
         self.files_table.currentCellChanged.connect(self.on_table_selection_changed)
+        self.files_table.itemChanged.connect(self.on_file_item_changed)
         self.result_delegate.selection_changed.connect(self.on_result_choice_changed)
         layout.addWidget(self.files_section)
         
@@ -163,6 +370,7 @@ class RenomeadorUI(QMainWindow):
         """Inicializa o cliente TMDB"""
         try:
             self.tmdb_client = TMDBClient()
+            self.start_key_validation()
         except OSError as e:
             self.show_file_error("Erro ao ler configuracoes", get_settings_path(), e)
         except ValueError as e:
@@ -183,6 +391,21 @@ class RenomeadorUI(QMainWindow):
                     "Certifique-se de que a configuracao contém TMDB_API_KEY"
                 )
 
+    def start_key_validation(self):
+        if self.key_validation_thread and self.key_validation_thread.isRunning():
+            return
+        self.key_validation_thread = KeyValidationThread(self.tmdb_client)
+        self.key_validation_thread.validation_completed.connect(self.on_key_validation_completed)
+        self.key_validation_thread.start()
+
+    def on_key_validation_completed(self, is_valid):
+        if is_valid is False:
+            QMessageBox.warning(
+                self, "Erro de Configuração",
+                "A TMDB API Key foi recusada pelo TMDB.\n\n"
+                "Atualize a chave em Mais configuracoes (⚙)."
+            )
+
     def prompt_api_key(self):
         """Solicita a API Key do TMDB ao usuario"""
         more_settings = MoreSettings(parent=self)
@@ -191,14 +414,43 @@ class RenomeadorUI(QMainWindow):
     def open_more_settings(self):
         more_settings = MoreSettings(parent=self)
         current_language = self.get_env_value("APP_LANGUAGE")
+        current_kodi_db = self.get_env_value("KODI_DB_PATH")
         settings_result = more_settings.open_settings_dialog(
             current_language=current_language,
             remove_original_after_send=self.should_remove_original_after_send(),
+            current_send_mode=self.get_send_mode(),
+            current_verify_mode=self.get_verify_mode(),
+            current_kodi_rpc={
+                "url": self.get_env_value("KODI_RPC_URL"),
+                "path": self.get_env_value("KODI_RPC_PATH"),
+                "user": self.get_env_value("KODI_RPC_USER"),
+                "db_path": current_kodi_db,
+            },
+            write_nfo=self.is_setting_enabled("WRITE_NFO"),
+            download_artwork=self.is_setting_enabled("DOWNLOAD_ARTWORK"),
+            current_naming_language=self.get_env_value("NAMING_LANGUAGE"),
+            name_resolution=self.get_name_resolution(),
         )
 
         if not settings_result:
             return
 
+        previous_naming_language = self.get_naming_language()
+        previous_name_resolution = self.get_name_resolution()
+        if settings_result.get("language") and self.tmdb_client:
+            self.tmdb_client.set_language(settings_result["language"])
+        self.naming_language = None
+        self.name_resolution = None
+        if self.get_name_resolution() != previous_name_resolution:
+            self.refresh_suggested_names()
+        if self.get_naming_language() != previous_naming_language:
+            # Nomes recalculados localmente; so os titulos sem traducao guardada vao ao TMDB
+            self.refresh_suggested_names()
+            self.ensure_translations(force=True)
+
+        if settings_result.get("kodi_db_path") != (current_kodi_db or ""):
+            self.refresh_files_lists()
+
         language = settings_result.get("language")
         if language:
             self.save_app_language(language)
@@ -218,6 +470,100 @@ class RenomeadorUI(QMainWindow):
                 f"Nao foi possivel inicializar TMDB com a nova chave:\n\n{exc}"
             )
 
+    def get_naming_language(self):
+        if self.naming_language is None:
+            self.naming_language = (
+                self.get_env_value("NAMING_LANGUAGE") or self.get_env_value("APP_LANGUAGE") or "en"
+            )
+        return self.naming_language
+
+    def row_translation_keys(self, row, language):
+        """
+        Chaves de traducao da linha: o filme escolhido, ou a serie e a
+        temporada do episodio (nomes de episodio no idioma dos nomes)
+        """
+        media_type = self.search_types[row] if row < len(self.search_types) else None
+        if media_type == "tv":
+            info = self.get_row_series(row)
+            series = info["series"] if info else {}
+            series_id = series.get("id")
+            if series_id is None:
+                return []
+            keys = [] if language == NAMING_ORIGINAL else [("tv", series_id)]
+            episode = self.row_selected_result(row)
+            season_language = episode_language(series, language)
+            # No idioma das buscas os nomes ja vieram com a temporada
+            if episode is not None and season_language and season_language != self.tmdb_client.language:
+                season_number = episode.get("season_number", self.selected_season_number)
+                keys.append(("tv", series_id, season_number, season_language))
+            return keys
+        if language == NAMING_ORIGINAL:
+            return []
+        result = self.row_selected_result(row)
+        if result is None or result.get("id") is None:
+            return []
+        return [("movie", result["id"])]
+
+    def row_selected_result(self, row):
+        select_item = self.files_table.item(row, self.select_column)
+        index = select_item.data(SELECTED_ROLE) if select_item else None
+        results = self.search_results[row] if row < len(self.search_results) else []
+        if index is None or index < 0 or index >= len(results):
+            return None
+        return results[index]
+
+    def ensure_translations(self, rows=None, force=False):
+        """
+        Busca em segundo plano as traducoes que faltam para as linhas. Sem
+        force, so quando o idioma dos nomes difere do idioma das buscas.
+        """
+        language = self.get_naming_language()
+        if not self.tmdb_client:
+            return
+        if not force and language == self.tmdb_client.language:
+            return
+        rows = range(len(self.video_files)) if rows is None else rows
+        keys = {key for row in rows for key in self.row_translation_keys(row, language)}
+        keys = {key for key in keys if not self.translations.has(*key)}
+        if not keys:
+            return
+        if self.translation_token is not None:
+            self.pending_translation_keys.update(keys)
+            return
+        self.start_translation_task(keys)
+
+    def start_translation_task(self, keys):
+        translations, tmdb_client, keys = self.translations, self.tmdb_client, list(keys)
+        scheduler = self.tasks.scheduler
+        self.translation_token = self.tasks.run(
+            lambda token: fetch_translations(translations, tmdb_client, keys, scheduler, token),
+            PRIORITY_PREFETCH,
+            self.on_translations_ready,
+        )
+
+    def on_translations_ready(self, fetched, error=None):
+        self.translation_token = None
+        if fetched:
+            self.refresh_suggested_names()
+        if self.pending_translation_keys:
+            keys, self.pending_translation_keys = self.pending_translation_keys, set()
+            self.start_translation_task(keys)
+
+    def refresh_suggested_names(self):
+        """Recalcula os nomes sugeridos de todas as linhas, sem consultar o TMDB"""
+        for row in range(len(self.video_files)):
+            select_item = self.files_table.item(row, self.select_column)
+            index = select_item.data(SELECTED_ROLE) if select_item else None
+            if index is not None and index >= 0:
+                self.update_suggested_name(row, int(index), show_poster=False)
+
+    def show_profile_saved(self, profile_path):
+        if profile_path:
+            self.statusBar().showMessage(f"Perfil gravado em {profile_path}", 15000)
+
+    def open_diagnostics(self):
+        Diagnostics(parent=self).exec()
+
     def on_search_type_changed(self, *_):
         is_tv = self.search_type_combo.currentData() == "tv"
         self.series_controls_widget.setVisible(is_tv)
@@ -240,6 +586,14 @@ class RenomeadorUI(QMainWindow):
         value = (self.get_env_value("REMOVE_ORIGINAL_AFTER_SEND") or "").strip().lower()
         return value in {"1", "true", "yes", "on", "sim"}
 
+    def get_send_mode(self):
+        value = (self.get_env_value("SEND_MODE") or "").strip().lower()
+        return value if value in SEND_MODES else SEND_MODE_COPY
+
+    def get_verify_mode(self):
+        value = (self.get_env_value("VERIFY_MODE") or "").strip().lower()
+        return value if value in VERIFY_MODES else VERIFY_SAMPLE
+
     def on_movie_folder_selected(self, folder):
         self.selected_movie_folder = folder
         set_setting("MOVIES_FOLDER", folder)
@@ -269,18 +623,49 @@ class RenomeadorUI(QMainWindow):
         QMessageBox.critical(self, "Erro de Arquivo", message)
 
     def refresh_files_lists(self):
-        self.load_video_files()
-        self.load_kodi_files()
-    
+        """Varre as duas pastas em segundo plano e preenche as tabelas ao terminar"""
+        if self.scan_thread and self.scan_thread.isRunning():
+            self.scan_pending = True
+            return
+        self.scan_pending = False
+        self.scan_thread = FolderScanThread(
+            self.header_config.get_movie_selected_folder(),
+            self.header_config.get_kodi_selected_folder(),
+        )
+        self.scan_thread.scan_completed.connect(self.on_folder_scan_completed)
+        self.scan_thread.start()
+
+    def on_folder_scan_completed(self, movie_folder, video_files, kodi_folder, kodi_entries, kodi_library, kodi_error):
+        if not startup_timing.get_phase("folder_scan"):
+            startup_timing.mark("folder_scan")
+            startup_timing.save_report()
+        if self.scan_pending:
+            # As pastas mudaram durante a varredura: o resultado ja esta velho
+            self.refresh_files_lists()
+            return
+        if movie_folder and movie_folder == self.header_config.get_movie_selected_folder():
+            self.populate_video_files(movie_folder, video_files)
+        if kodi_folder == self.header_config.get_kodi_selected_folder():
+            self.populate_kodi_files(kodi_entries, kodi_library, kodi_error)
+
     def load_video_files(self):
         """Carrega lista de arquivos de vídeo da pasta selecionada"""
-        self.selected_folder = self.header_config.get_movie_selected_folder()
-        if not self.selected_folder:
+        folder = self.header_config.get_movie_selected_folder()
+        if not folder:
             return
+        self.populate_video_files(folder, scan_video_files(folder))
+
+    def populate_video_files(self, folder, video_files):
+        self.selected_folder = folder
+        # Buscas pendentes apontam para as linhas antigas
+        self.cancel_batch_search()
+        self.cancel_poster_load()
         
         self.video_files = []
+        self.video_rows = {}
         self.search_results = []
         self.search_types = []
+        self.series_info = []
         self.poster_label.setText("Sem imagem")
         self.poster_label.setPixmap(QPixmap())
         self.poster_title.setText("")
@@ -289,66 +674,157 @@ class RenomeadorUI(QMainWindow):
         self.files_table.setRowCount(0)
         
         folder_path = Path(self.selected_folder)
-        video_candidates = sorted(
-            (
-                file
-                for file in folder_path.rglob("*")
-                if file.is_file() and KodiNamer.is_video_file(file.name)
-            ),
-            key=lambda path: path.relative_to(folder_path).as_posix().lower(),
+        self.restoring_rows = True
+        for file in video_files:
+            self.video_rows[file] = len(self.video_files)
+            self.video_files.append(file)
+            self.search_results.append([])
+            self.search_types.append(None)
+            self.series_info.append(None)
+            row = self.files_table.rowCount()
+            self.files_table.insertRow(row)
+            relative_file = file.relative_to(folder_path).as_posix()
+            original_item = QTableWidgetItem(relative_file)
+            original_item.setFlags(original_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
+            original_item.setData(ORIGINAL_PATH_ROLE, str(file))
+            self.files_table.setItem(row, self.original_column, original_item)
+
+            year_item = QTableWidgetItem("")
+            year_item.setFlags(year_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
+            self.files_table.setItem(row, self.year_column, year_item)
+            select_item = QTableWidgetItem("Aguardando busca")
+            select_item.setFlags(select_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
+            select_item.setData(RESULTS_ROLE, [])
+            select_item.setData(SELECTED_ROLE, -1)
+            select_item.setData(SUGGESTED_NAME_ROLE, "")
+            self.files_table.setItem(row, self.select_column, select_item)
+
+            send_item = QTableWidgetItem("")
+            send_item.setFlags(
+                Qt.ItemFlag.ItemIsUserCheckable
+                | Qt.ItemFlag.ItemIsEnabled
+                | Qt.ItemFlag.ItemIsSelectable
+            )
+            send_item.setCheckState(Qt.CheckState.Unchecked)
+            self.files_table.setItem(row, self.send_to_kodi_column, send_item)
+            self.restore_row_state(row, file)
+        self.restoring_rows = False
+
+        self.session_store.prune_folder(folder_path, video_files)
+        self.session_save_timer.start()
+
+    def restore_row_state(self, row, file):
+        """Recoloca busca, escolha e marcacao salvas, sem consultar o TMDB"""
+        state = self.session_store.lookup(file)
+        if not state:
+            return False
+
+        results = state.get("results") or []
+        media_type = state.get("type")
+        self.search_results[row] = results
+        self.search_types[row] = media_type
+        if state.get("series"):
+            self.series_info[row] = {
+                "series": state["series"],
+                "season_poster_path": state.get("season_poster_path"),
+            }
+
+        self.files_table.item(row, self.year_column).setText(state.get("year") or "")
+        select_item = self.files_table.item(row, self.select_column)
+        select_item.setText(state.get("label") or "")
+        select_item.setData(RESULTS_ROLE, results)
+        select_item.setData(TYPE_ROLE, media_type)
+        select_item.setData(SELECTED_ROLE, state.get("selected", -1))
+        select_item.setData(SUGGESTED_NAME_ROLE, state.get("suggested_name") or "")
+        if results:
+            select_item.setFlags(select_item.flags() | Qt.ItemFlag.ItemIsEditable)
+
+        send_item = self.files_table.item(row, self.send_to_kodi_column)
+        send_item.setCheckState(Qt.CheckState.Checked if state.get("checked") else Qt.CheckState.Unchecked)
+        if state.get("sent"):
+            send_item.setText("Enviado")
+        return True
+
+    def save_row_state(self, row):
+        if self.restoring_rows or row >= len(self.video_files):
+            return
+        select_item = self.files_table.item(row, self.select_column)
+        send_item = self.files_table.item(row, self.send_to_kodi_column)
+        year_item = self.files_table.item(row, self.year_column)
+        if select_item is None or send_item is None:
+            return
+
+        info = self.series_info[row] or {}
+        self.session_store.update(
+            self.video_files[row],
+            {
+                "type": self.search_types[row],
+                "results": self.search_results[row],
+                "selected": select_item.data(SELECTED_ROLE),
+                "label": select_item.text(),
+                "suggested_name": select_item.data(SUGGESTED_NAME_ROLE) or "",
+                "checked": send_item.checkState() == Qt.CheckState.Checked,
+                "sent": send_item.text() == "Enviado",
+                "year": year_item.text() if year_item else "",
+                "series": info.get("series"),
+                "season_poster_path": info.get("season_poster_path"),
+            },
         )
+        self.session_save_timer.start()
 
-        for file in video_candidates:
-            if KodiNamer.is_video_file(file.name):
-                self.video_files.append(file)
-                self.search_results.append([])
-                self.search_types.append(None)
-                row = self.files_table.rowCount()
-                self.files_table.insertRow(row)
-                relative_file = file.relative_to(folder_path).as_posix()
-                original_item = QTableWidgetItem(relative_file)
-                original_item.setFlags(original_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-                original_item.setData(ORIGINAL_PATH_ROLE, str(file))
-                self.files_table.setItem(row, self.original_column, original_item)
+    def on_file_item_changed(self, item):
+        if item.column() == self.send_to_kodi_column:
+            self.save_row_state(item.row())
 
-                year_item = QTableWidgetItem("")
-                year_item.setFlags(year_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-                self.files_table.setItem(row, self.year_column, year_item)
-                select_item = QTableWidgetItem("Aguardando busca")
-                select_item.setFlags(select_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-                select_item.setData(RESULTS_ROLE, [])
-                select_item.setData(SELECTED_ROLE, -1)
-                select_item.setData(SUGGESTED_NAME_ROLE, "")
-                self.files_table.setItem(row, self.select_column, select_item)
+    def save_session(self):
+        try:
+            self.session_store.save()
+        except OSError:
+            pass
 
-                send_item = QTableWidgetItem("")
-                send_item.setFlags(
-                    Qt.ItemFlag.ItemIsUserCheckable
-                    | Qt.ItemFlag.ItemIsEnabled
-                    | Qt.ItemFlag.ItemIsSelectable
-                )
-                send_item.setCheckState(Qt.CheckState.Unchecked)
-                self.files_table.setItem(row, self.send_to_kodi_column, send_item)
+    def save_probe_cache(self):
+        try:
+            self.probe_cache.save()
+        except OSError:
+            pass
+
+    def closeEvent(self, event):
+        self.tasks.shutdown()
+        self.save_probe_cache()
+        if self.session_save_timer.isActive():
+            self.session_save_timer.stop()
+            self.save_session()
+        super().closeEvent(event)
 
     def load_kodi_files(self):
         kodi_folder = self.header_config.get_kodi_selected_folder()
         if not kodi_folder:
+            self.kodi_entries = []
+            self.kodi_entry_keys = []
+            self.kodi_library = None
+            self.library_index = None
             self.files_section.clear_kodi_files()
             return
 
         kodi_path = Path(kodi_folder)
         if not kodi_path.exists():
+            self.kodi_entries = []
+            self.kodi_entry_keys = []
+            self.kodi_library = None
+            self.library_index = None
             self.files_section.clear_kodi_files()
             return
 
-        kodi_entries = []
-        for item in kodi_path.rglob("*"):
-            if item.is_file() and KodiNamer.is_video_file(item.name):
-                relative_item = item.relative_to(kodi_path).as_posix()
-                kodi_entries.append(relative_item)
+        self.populate_kodi_files(*load_kodi_index(kodi_path))
 
-        kodi_entries.sort(key=str.lower)
+    def populate_kodi_files(self, kodi_entries, kodi_library=None, kodi_error=None):
+        self.kodi_entries = kodi_entries
+        self.kodi_entry_keys = [entry.lower() for entry in kodi_entries]
+        self.kodi_library = kodi_library
+        self.library_index = None
         self.files_section.set_kodi_files(kodi_entries)
+        if kodi_error:
+            self.statusBar().showMessage(f"Banco do Kodi nao lido, pasta varrida: {kodi_error}", 15000)
     
     def search_movie(self):
         """Busca filmes no TMDB baseado nos arquivos da pasta"""
@@ -360,17 +836,81 @@ class RenomeadorUI(QMainWindow):
             QMessageBox.warning(self, "Aviso", "Nenhum arquivo de vídeo encontrado na pasta")
             return
 
+        if self.search_token is not None or self.series_group_token is not None:
+            QMessageBox.warning(self, "Aviso", "Ja existe uma busca em andamento")
+            return
+
         if self.search_type_combo.currentData() == "tv":
-            if not self.selected_series_id or not self.season_episodes:
-                QMessageBox.warning(self, "Aviso", "Selecione uma serie e temporada primeiro")
-                return
-            self.apply_season_to_files()
+            self.start_series_grouping()
             return
         
-        # Inicia a busca sequencial
         self.active_search_type = self.search_type_combo.currentData() or "movie"
-        self.current_search_index = 0
-        self.search_next_file()
+        self.nfo_listing_cache = {}
+        profiling.begin_action(profiling.ACTION_SEARCH)
+        self.start_batch_search()
+
+    def start_series_grouping(self):
+        """
+        Agrupa os arquivos pelo nome da serie e busca cada serie uma vez (em
+        paralelo). A serie escolhida manualmente continua valendo para os
+        arquivos que nao forem identificados.
+        """
+        profiling.begin_action(profiling.ACTION_SEARCH)
+        tmdb_client, video_files = self.tmdb_client, list(self.video_files)
+        library_index = self.get_library_index()
+        probe_cache = self.probe_cache
+        scheduler = self.tasks.scheduler
+        self.series_group_token = self.tasks.run(
+            lambda token: resolve_series_groups(tmdb_client, video_files, library_index, probe_cache, scheduler, token),
+            PRIORITY_SEARCH,
+            self.on_series_groups_finished,
+        )
+
+    def on_series_groups_finished(self, items, error):
+        self.series_group_token = None
+        if error is not None:
+            self.on_series_groups_error(str(error))
+        else:
+            self.on_series_groups_resolved(items)
+
+    def on_series_groups_resolved(self, items):
+        self.show_profile_saved(profiling.end_action(profiling.ACTION_SEARCH))
+        rows = self.video_rows
+        series_ids = set()
+        matched = 0
+        in_library = 0
+        for item in items:
+            row = rows.get(item.path)
+            if row is not None and item.status == ITEM_IN_LIBRARY:
+                self.search_types[row] = "tv"
+                self.mark_row_in_library(row, item.library_match)
+                in_library += 1
+                continue
+            if row is None or item.series is None:
+                continue
+            series_ids.add(item.series.get("id"))
+            self.search_types[row] = "tv"
+            self.series_info[row] = {"series": item.series, "season_poster_path": item.season_poster}
+            episode_index = next(
+                (index for index, episode in enumerate(item.season_episodes) if episode is item.chosen),
+                -1,
+            )
+            self.set_row_episodes(row, item.season_episodes, episode_index)
+            if episode_index >= 0:
+                matched += 1
+        self.ensure_translations()
+
+        QMessageBox.information(
+            self,
+            "Conclusão",
+            f"Busca concluída: {len(series_ids)} serie(s), "
+            f"{matched} de {len(items) - in_library} episodio(s) identificados"
+            + self.library_skipped_message(in_library),
+        )
+
+    def on_series_groups_error(self, error):
+        self.show_profile_saved(profiling.end_action(profiling.ACTION_SEARCH))
+        QMessageBox.critical(self, "Erro", f"Erro ao buscar series: {error}")
 
     def search_series(self):
         if not self.tmdb_client:
@@ -381,10 +921,18 @@ class RenomeadorUI(QMainWindow):
             QMessageBox.warning(self, "Aviso", "Digite o nome da serie")
             return
 
-        try:
-            results = self.tmdb_client.search_tv(query)
-        except Exception as e:
-            QMessageBox.critical(self, "Erro", f"Erro ao buscar serie: {e}")
+        tmdb_client = self.tmdb_client
+        self.run_series_task(lambda token: tmdb_client.search_tv(query), self.on_series_search_finished)
+
+    def run_series_task(self, fn, on_done):
+        """Tarefa interativa do painel de series; uma nova cancela a anterior"""
+        if self.series_task_token is not None:
+            self.series_task_token.cancel()
+        self.series_task_token = self.tasks.run(fn, PRIORITY_INTERACTIVE, on_done)
+
+    def on_series_search_finished(self, results, error):
+        if error is not None:
+            QMessageBox.critical(self, "Erro", f"Erro ao buscar serie: {error}")
             return
 
         # Ordena series por data de lancamento (mais recente primeiro)
@@ -410,6 +958,7 @@ class RenomeadorUI(QMainWindow):
 
     def on_series_selected(self):
         if not self.series_results:
+            self.selected_series = None
             self.selected_series_id = None
             self.selected_series_title = ""
             self.selected_series_year = None
@@ -425,17 +974,29 @@ class RenomeadorUI(QMainWindow):
         if index < 0 or index >= len(self.series_results):
             return
         selected = self.series_results[index]
+        self.selected_series = selected
         self.selected_series_id = selected.get('id')
         self.selected_series_title = selected.get('name', '')
         first_air_date = selected.get('first_air_date', '')
         self.selected_series_year = first_air_date.split('-')[0] if first_air_date else None
         self.update_selected_series_poster(selected)
 
-        try:
-            details = self.tmdb_client.get_tv_details(self.selected_series_id)
-        except Exception as e:
-            QMessageBox.critical(self, "Erro", f"Erro ao buscar temporadas: {e}")
+        tmdb_client, series_id = self.tmdb_client, self.selected_series_id
+        # Traducoes do titulo vem na mesma chamada das temporadas
+        self.run_series_task(
+            lambda token: tmdb_client.get_tv_details(series_id, append=("translations",)),
+            self.on_series_details_loaded,
+        )
+
+    def on_series_details_loaded(self, details, error):
+        if error is not None:
+            QMessageBox.critical(self, "Erro", f"Erro ao buscar temporadas: {error}")
             return
+        if self.translations.store_details("tv", details):
+            try:
+                self.translations.save()
+            except OSError:
+                pass
 
         seasons = details.get('seasons', [])
         self.season_combo.blockSignals(True)
@@ -450,6 +1011,7 @@ class RenomeadorUI(QMainWindow):
         self.on_season_selected()
 
     def update_selected_series_poster(self, series_result):
+        self.cancel_poster_load()
         title = series_result.get('name', '')
         release_date = series_result.get('first_air_date', '')
         year = release_date.split('-')[0] if release_date else ''
@@ -474,151 +1036,268 @@ class RenomeadorUI(QMainWindow):
             self.poster_label.setPixmap(QPixmap())
             return
 
-        url = f"https://image.tmdb.org/t/p/w342{poster_path}"
+        self.load_poster(tmdb_image_url(poster_path, POSTER_SIZE))
+
+    def cancel_poster_load(self):
+        if self.poster_token is not None:
+            self.poster_token.cancel()
+            self.poster_token = None
+
+    def load_poster(self, url):
+        """Mostra o poster: da memoria ou baixado como tarefa interativa (a frente das buscas em lote)"""
+        self.cancel_poster_load()
         if url in self.poster_cache:
-            pixmap = self.poster_cache[url]
-            self.poster_label.setPixmap(
-                pixmap.scaled(
-                    self.poster_label.size(),
-                    Qt.AspectRatioMode.KeepAspectRatio,
-                    Qt.TransformationMode.SmoothTransformation,
-                )
-            )
-            self.poster_label.setText("")
+            self.show_poster_pixmap(self.poster_cache[url])
             return
+        image_cache = self.image_cache
+        self.poster_token = self.tasks.run(
+            lambda token: image_cache.fetch(url),
+            PRIORITY_INTERACTIVE,
+            lambda data, error: self.on_poster_loaded(url, data, error),
+        )
 
-        try:
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            pixmap = QPixmap()
-            if pixmap.loadFromData(response.content):
-                self.poster_cache[url] = pixmap
-                self.poster_label.setPixmap(
-                    pixmap.scaled(
-                        self.poster_label.size(),
-                        Qt.AspectRatioMode.KeepAspectRatio,
-                        Qt.TransformationMode.SmoothTransformation,
-                    )
-                )
-                self.poster_label.setText("")
-            else:
-                self.poster_label.setText("Sem imagem")
-                self.poster_label.setPixmap(QPixmap())
-        except requests.RequestException:
+    def on_poster_loaded(self, url, data, error):
+        self.poster_token = None
+        # QPixmap so pode ser criado na thread da interface
+        pixmap = QPixmap()
+        if error is None and data and pixmap.loadFromData(data):
+            self.poster_cache[url] = pixmap
+            self.show_poster_pixmap(pixmap)
+        else:
             self.poster_label.setText("Sem imagem")
             self.poster_label.setPixmap(QPixmap())
 
+    def show_poster_pixmap(self, pixmap):
+        self.poster_label.setPixmap(
+            pixmap.scaled(
+                self.poster_label.size(),
+                Qt.AspectRatioMode.KeepAspectRatio,
+                Qt.TransformationMode.SmoothTransformation,
+            )
+        )
+        self.poster_label.setText("")
+
     def on_season_selected(self):
         season_number = self.season_combo.currentData()
         if self.selected_series_id is None or season_number is None:
             return
         self.selected_season_number = int(season_number)
-        self.load_kodi_files()
+        # O indice do Kodi (pasta ou banco) ja carregado vale para qualquer temporada
 
-        try:
-            season_details = self.tmdb_client.get_tv_season_details(
-                self.selected_series_id, self.selected_season_number
-            )
-        except Exception as e:
-            QMessageBox.critical(self, "Erro", f"Erro ao buscar episodios: {e}")
+        key = (self.selected_series_id, self.selected_season_number)
+        if key in self.season_details:
+            self.show_season(self.season_details[key])
+            return
+        tmdb_client = self.tmdb_client
+        self.run_series_task(
+            lambda token: tmdb_client.get_tv_season_details(*key),
+            lambda details, error: self.on_season_details_loaded(key, details, error),
+        )
+
+    def on_season_details_loaded(self, key, season_details, error):
+        if error is not None:
+            QMessageBox.critical(self, "Erro", f"Erro ao buscar episodios: {error}")
             return
+        self.season_details[key] = season_details
+        self.show_season(season_details)
 
+    def show_season(self, season_details):
         self.season_episodes = season_details.get('episodes', [])
+        self.selected_season_poster = season_details.get('poster_path')
         self.apply_season_to_files()
 
     def apply_season_to_files(self):
+        """
+        Associa os arquivos aos episodios da serie selecionada. Cada arquivo usa
+        a temporada do proprio nome (a selecionada quando o nome nao tem): todas
+        as temporadas necessarias sao buscadas juntas, em paralelo, uma vez cada.
+        """
         if not self.season_episodes:
             return
 
-        for row, video_file in enumerate(self.video_files):
-            self.search_results[row] = self.season_episodes
-            self.search_types[row] = "tv"
-            select_item = self.files_table.item(row, self.select_column)
-            if select_item is None:
-                select_item = QTableWidgetItem()
-                self.files_table.setItem(row, self.select_column, select_item)
-            select_item.setData(RESULTS_ROLE, self.season_episodes)
-            select_item.setData(TYPE_ROLE, "tv")
-
+        series_id = self.selected_series_id
+        parsed = []
+        for video_file in self.video_files:
             season, episode = KodiNamer.extract_episode_info(video_file.name)
-            if season is None:
-                season = self.selected_season_number
-            if season != self.selected_season_number:
-                select_item.setText("Selecione episodio")
-                select_item.setData(SELECTED_ROLE, -1)
-                select_item.setFlags(select_item.flags() | Qt.ItemFlag.ItemIsEditable)
-                continue
+            parsed.append((self.selected_season_number if season is None else season, episode))
 
-            episode_index = -1
-            for idx, ep in enumerate(self.season_episodes):
-                if ep.get('episode_number') == episode:
-                    episode_index = idx
-                    break
+        missing = {(series_id, season) for season, _ in parsed} - self.season_details.keys()
+        if not missing:
+            self.assign_season_episodes(series_id, parsed)
+            return
+        tmdb_client, scheduler = self.tmdb_client, self.tasks.scheduler
+        self.run_series_task(
+            lambda token: fetch_seasons(tmdb_client, missing, scheduler, PRIORITY_INTERACTIVE, token),
+            lambda fetched, error: self.on_seasons_fetched(series_id, parsed, fetched, error),
+        )
 
-            if episode_index >= 0:
-                ep = self.season_episodes[episode_index]
-                ep_title = ep.get('name', '')
-                label = f"E{int(ep.get('episode_number', 0)):02d} - {ep_title}" if ep_title else f"E{int(ep.get('episode_number', 0)):02d}"
-                select_item.setText(label)
-                select_item.setData(SELECTED_ROLE, episode_index)
-                select_item.setFlags(select_item.flags() | Qt.ItemFlag.ItemIsEditable)
-                self.update_suggested_name(row, episode_index)
-            else:
-                select_item.setText("Selecione episodio")
-                select_item.setData(SELECTED_ROLE, -1)
-                select_item.setFlags(select_item.flags() | Qt.ItemFlag.ItemIsEditable)
-    
-    def search_next_file(self):
-        """Busca o próximo arquivo da lista"""
-        if self.current_search_index >= len(self.video_files):
-            # Terminou de buscar todos
-            QMessageBox.information(self, "Conclusão", "Busca concluída para todos os arquivos!")
+    def on_seasons_fetched(self, series_id, parsed, fetched, error):
+        # Temporadas com erro ficam de fora do cache e sao tentadas de novo na proxima vez
+        self.season_details.update((key, details) for key, details in (fetched or {}).items() if details)
+        if len(parsed) != len(self.video_files):
+            # A lista de arquivos mudou durante a busca
             return
-        
-        video_file = self.video_files[self.current_search_index]
-        # Limpa o nome do arquivo antes de buscar e tenta capturar o ano
-        query, year = KodiNamer.clean_filename(video_file.name)
-        row = self.current_search_index
-        if row < len(self.search_types):
-            self.search_types[row] = self.active_search_type
-        if row < self.files_table.rowCount():
+        self.assign_season_episodes(series_id, parsed)
+
+    def assign_season_episodes(self, series_id, parsed):
+        # (temporada, episodio) -> posicao na lista da temporada
+        positions = {}
+        for season in {season for season, _ in parsed}:
+            for position, ep in enumerate(self.season_details.get((series_id, season), {}).get('episodes', [])):
+                positions[(season, ep.get('episode_number'))] = position
+
+        for row, (season, episode) in enumerate(parsed):
+            details = self.season_details.get((series_id, season), {})
+            self.search_types[row] = "tv"
+            self.series_info[row] = {
+                "series": self.selected_series,
+                "season_poster_path": details.get('poster_path'),
+            }
+            self.set_row_episodes(row, details.get('episodes', []), positions.get((season, episode), -1))
+
+    def set_row_episodes(self, row, episodes, episode_index):
+        """Mostra os episodios da temporada na linha, com o episodio escolhido (ou -1)"""
+        self.search_results[row] = episodes
+        select_item = self.files_table.item(row, self.select_column)
+        if select_item is None:
+            select_item = QTableWidgetItem()
+            self.files_table.setItem(row, self.select_column, select_item)
+        select_item.setData(RESULTS_ROLE, episodes)
+        select_item.setData(TYPE_ROLE, "tv")
+        select_item.setFlags(select_item.flags() | Qt.ItemFlag.ItemIsEditable)
+
+        if episode_index < 0:
+            select_item.setText("Selecione episodio" if episodes else "Sem resultados")
+            select_item.setData(SELECTED_ROLE, -1)
+            select_item.setData(SUGGESTED_NAME_ROLE, "")
+            self.save_row_state(row)
+            return
+
+        ep = episodes[episode_index]
+        ep_title = ep.get('name', '')
+        label = f"E{int(ep.get('episode_number', 0)):02d} - {ep_title}" if ep_title else f"E{int(ep.get('episode_number', 0)):02d}"
+        select_item.setText(label)
+        select_item.setData(SELECTED_ROLE, episode_index)
+        # Em lote, so a linha atual baixa a miniatura
+        self.update_suggested_name(row, episode_index, show_poster=row == self.files_table.currentRow())
+    
+    def start_batch_search(self):
+        """
+        Agenda a busca de todos os arquivos na fila de tarefas. Ate tres
+        rodam juntas; poster e selecao da linha atual passam na frente.
+        """
+        self.search_token = CancelToken()
+        tmdb_client, media_type, probe_cache = self.tmdb_client, self.active_search_type, self.probe_cache
+        scheduler = self.tasks.scheduler
+        self.searches_remaining = 0
+        self.library_skipped = 0
+        library_index = self.get_library_index()
+        for row, video_file in enumerate(self.video_files):
+            # Limpa o nome do arquivo antes de buscar e tenta capturar o ano
+            query, year = KodiNamer.clean_filename(video_file.name)
+            self.search_types[row] = media_type
             year_item = self.files_table.item(row, self.year_column)
             if year_item is None:
                 year_item = QTableWidgetItem("")
                 year_item.setFlags(year_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
                 self.files_table.setItem(row, self.year_column, year_item)
             year_item.setText(str(year or ""))
-        
-        if not query:
-            self.current_search_index += 1
-            self.search_next_file()
-            return
-        
-        # Executa a busca em thread separada
-        if self.search_thread and self.search_thread.isRunning():
-            self.search_thread.wait()
-        
-        self.search_thread = SearchThread(query, year or 0, self.tmdb_client, self.active_search_type)
-        self.search_thread.search_completed.connect(self.on_search_completed)
-        self.search_thread.search_error.connect(self.on_search_error)
-        self.search_thread.start()
-    
-    def on_search_completed(self, results):
-        """Callback quando a busca é concluída"""
-        row = self.current_search_index
+
+            library_match = library_index.match_name(video_file.name, media_type) if library_index else None
+            if library_match:
+                self.mark_row_in_library(row, library_match)
+                self.library_skipped += 1
+                continue
+            external_ids = external_ids_for(video_file, media_type, self.nfo_listing_cache)
+            if not query and not external_ids:
+                continue
+            self.searches_remaining += 1
+            self.tasks.run(
+                lambda token, video_file=video_file, external_ids=external_ids: search_file(
+                    tmdb_client, video_file, media_type, external_ids, probe_cache, scheduler, token
+                ),
+                PRIORITY_SEARCH,
+                lambda outcome, error, path=video_file: self.on_file_search_finished(path, outcome, error),
+                self.search_token,
+            )
+        if not self.searches_remaining:
+            self.finish_batch_search()
+
+    def cancel_batch_search(self):
+        if self.search_token is not None:
+            self.search_token.cancel()
+            self.search_token = None
+            self.searches_remaining = 0
+            self.show_profile_saved(profiling.end_action(profiling.ACTION_SEARCH))
+
+    def on_file_search_finished(self, path, outcome, error):
+        # A linha pode ter mudado de posicao (arquivos enviados saem da lista)
+        row = self.video_rows.get(path)
+        if row is not None:
+            if error is not None:
+                self.on_search_error(str(error))
+            else:
+                self.on_search_completed(row, *outcome)
+        self.searches_remaining -= 1
+        if self.searches_remaining <= 0:
+            self.finish_batch_search()
+
+    def finish_batch_search(self):
+        self.search_token = None
+        self.searches_remaining = 0
+        self.show_profile_saved(profiling.end_action(profiling.ACTION_SEARCH))
+        self.ensure_translations()
+        self.save_probe_cache()
+        QMessageBox.information(
+            self,
+            "Conclusão",
+            "Busca concluída para todos os arquivos!" + self.library_skipped_message(self.library_skipped),
+        )
+
+    def get_library_index(self):
+        """Indice do que ja esta no Kodi, ou None com SEARCH_EXISTING ligado (busca tudo)"""
+        if self.is_setting_enabled("SEARCH_EXISTING") or not (self.kodi_entries or self.kodi_library):
+            return None
+        if self.library_index is None:
+            self.library_index = LibraryIndex.build(self.kodi_entries, self.kodi_library)
+        return self.library_index
+
+    @staticmethod
+    def library_skipped_message(count):
+        if not count:
+            return ""
+        return f"\n{count} arquivo(s) ja estavam na biblioteca do Kodi e nao foram buscados"
+
+    def mark_row_in_library(self, row, library_path):
+        """Linha repetida: sem busca no TMDB e desmarcada para envio"""
+        self.search_results[row] = []
+        select_item = self.files_table.item(row, self.select_column)
+        if select_item is None:
+            select_item = QTableWidgetItem()
+            self.files_table.setItem(row, self.select_column, select_item)
+        select_item.setText(f"Ja no Kodi: {library_path}")
+        select_item.setToolTip(library_path)
+        select_item.setData(RESULTS_ROLE, [])
+        select_item.setData(SELECTED_ROLE, -1)
+        select_item.setData(SUGGESTED_NAME_ROLE, "")
+        select_item.setFlags(select_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
+        send_item = self.files_table.item(row, self.send_to_kodi_column)
+        if send_item is not None:
+            send_item.setCheckState(Qt.CheckState.Unchecked)
+        self.save_row_state(row)
+
+    def on_search_completed(self, row, results, result_type):
+        """Callback quando a busca de uma linha é concluída"""
         if row < self.files_table.rowCount():
             # Ordena os resultados por ano (mais recente primeiro)
             media_type = self.search_types[row] or "movie"
-            if results:
-                sorted_results = sorted(
-                    results,
-                    key=lambda x: (
-                        x.get('first_air_date', '') if media_type == "tv" else x.get('release_date', '')
-                    ),
-                    reverse=True
-                )
-            else:
-                sorted_results = results
+            hint = ""
+            if results and result_type != media_type:
+                # So o outro tipo achou algo: vira dica para a busca manual
+                kind = "serie" if result_type == "tv" else "filme"
+                hint = f" (como {kind}: {result_label(results[0], result_type)})"
+                results = []
+            sorted_results = sort_results_by_date(results, media_type)
             
             self.search_results[row] = sorted_results
             select_item = self.files_table.item(row, self.select_column)
@@ -640,33 +1319,32 @@ class RenomeadorUI(QMainWindow):
                 select_item.setText(label)
                 select_item.setData(SELECTED_ROLE, 0)
                 select_item.setFlags(select_item.flags() | Qt.ItemFlag.ItemIsEditable)
-                self.update_suggested_name(row, 0)
+                # Em lote, so a linha atual baixa o poster
+                self.update_suggested_name(row, 0, show_poster=row == self.files_table.currentRow())
             else:
-                select_item.setText("Sem resultados")
+                select_item.setText(f"Sem resultados{hint}")
                 select_item.setData(SELECTED_ROLE, -1)
                 select_item.setFlags(select_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
                 select_item.setData(SUGGESTED_NAME_ROLE, "")
-                if row == self.current_search_index:
+                self.save_row_state(row)
+                if row == self.files_table.currentRow():
+                    self.cancel_poster_load()
                     self.poster_label.setText("Sem imagem")
                     self.poster_label.setPixmap(QPixmap())
                     self.poster_title.setText("")
                     self.poster_meta.setText("")
                     self.poster_overview.setText("")
-        
-        # Busca o próximo arquivo
-        self.current_search_index += 1
-        self.search_next_file()
     
     def on_search_error(self, error):
-        """Callback para erro na busca"""
-        print(f"Erro na busca: {error}")
-        # Continua para o próximo arquivo mesmo com erro
-        self.current_search_index += 1
-        self.search_next_file()
+        """Callback para erro na busca; as outras linhas continuam"""
+        metrics.count("search.errors")
+        self.statusBar().showMessage(f"Erro na busca: {error}", 10000)
 
     def on_result_choice_changed(self, row, index):
         """Atualiza o nome sugerido conforme selecao do usuario"""
         self.update_suggested_name(row, index)
+        self.save_row_state(row)
+        self.ensure_translations([row])
 
     def on_table_selection_changed(self, current_row):
         if current_row < 0 or current_row >= len(self.search_results):
@@ -679,7 +1357,7 @@ class RenomeadorUI(QMainWindow):
             return
         self.update_poster(current_row, int(selected_index))
 
-    def update_suggested_name(self, row, index):
+    def update_suggested_name(self, row, index, show_poster=True):
         if row >= len(self.search_results):
             return
         results = self.search_results[row]
@@ -688,36 +1366,69 @@ class RenomeadorUI(QMainWindow):
         selected = results[index]
         media_type = self.search_types[row] or "movie"
         if media_type == "tv":
-            episode_title = selected.get('name', '')
+            info = self.get_row_series(row)
+            episode_title = naming_episode_title(
+                selected, info["series"] if info else None, self.get_naming_language(), self.translations
+            )
             season_num = selected.get('season_number', self.selected_season_number)
             episode_num = selected.get('episode_number')
-            series_title = KodiNamer.format_series_name_for_kodi(
-                self.selected_series_title,
-                self.selected_series_year,
-            )
+            series_title = KodiNamer.format_series_name_for_kodi(*self.get_row_series_title(row))
             video_file = self.video_files[row]
             suggested_name = KodiNamer.suggest_episode_filename(
-                video_file.name, series_title, season_num, episode_num, episode_title
+                video_file.name, series_title, season_num, episode_num, episode_title, self.row_quality(row)
             )
             select_item = self.files_table.item(row, self.select_column)
             if select_item is not None:
                 select_item.setData(SUGGESTED_NAME_ROLE, suggested_name)
-            self.update_poster(row, index)
+            if show_poster:
+                self.update_poster(row, index)
+            self.save_row_state(row)
             return
         else:
-            title = selected.get('title', 'N/A')
+            title = naming_title(selected, "movie", self.get_naming_language(), self.translations) or 'N/A'
             release_date = selected.get('release_date', '')
         year = release_date.split('-')[0] if release_date else ''
         video_file = self.video_files[row]
         suggested_name = KodiNamer.suggest_kodi_filename(
-            video_file.name, title, year
+            video_file.name, title, year, self.row_quality(row)
         )
         select_item = self.files_table.item(row, self.select_column)
         if select_item is not None:
             select_item.setData(SUGGESTED_NAME_ROLE, suggested_name)
-        self.update_poster(row, index)
+        if show_poster:
+            self.update_poster(row, index)
+        self.save_row_state(row)
+
+    def get_name_resolution(self):
+        if self.name_resolution is None:
+            self.name_resolution = self.is_setting_enabled("NAME_RESOLUTION")
+        return self.name_resolution
+
+    def row_quality(self, row):
+        """Resolucao do arquivo para o nome (com NAME_RESOLUTION); o cabecalho ja veio na busca"""
+        if not self.get_name_resolution():
+            return None
+        return resolution_label(self.probe_cache.get(self.video_files[row]))
+
+    def get_row_series(self, row):
+        """Serie da linha de episodio: a restaurada da sessao ou a selecionada"""
+        info = self.series_info[row] if row < len(self.series_info) else None
+        if info and info.get("series"):
+            return info
+        if self.selected_series:
+            return {"series": self.selected_series, "season_poster_path": self.selected_season_poster}
+        return None
+
+    def get_row_series_title(self, row):
+        info = self.get_row_series(row)
+        if info is None:
+            return self.selected_series_title, self.selected_series_year
+        first_air_date = info["series"].get("first_air_date", "")
+        title = naming_title(info["series"], "tv", self.get_naming_language(), self.translations)
+        return title, first_air_date.split("-")[0] if first_air_date else None
 
     def update_poster(self, row, index):
+        self.cancel_poster_load()
         results = self.search_results[row]
         if not results or index < 0 or index >= len(results):
             self.poster_label.setText("Sem imagem")
@@ -730,55 +1441,24 @@ class RenomeadorUI(QMainWindow):
         media_type = self.search_types[row] or "movie"
         if media_type == "tv":
             poster_path = results[index].get('still_path')
-            image_size = "w300"
+            image_size = STILL_SIZE
         else:
             poster_path = results[index].get('poster_path')
-            image_size = "w342"
-        self.update_poster_info(results[index], media_type)
+            image_size = POSTER_SIZE
+        self.update_poster_info(results[index], media_type, row)
         if not poster_path:
             self.poster_label.setText("Sem imagem")
             self.poster_label.setPixmap(QPixmap())
             return
 
-        url = f"https://image.tmdb.org/t/p/{image_size}{poster_path}"
-        if url in self.poster_cache:
-            pixmap = self.poster_cache[url]
-            self.poster_label.setPixmap(
-                pixmap.scaled(
-                    self.poster_label.size(),
-                    Qt.AspectRatioMode.KeepAspectRatio,
-                    Qt.TransformationMode.SmoothTransformation,
-                )
-            )
-            return
-
-        try:
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            pixmap = QPixmap()
-            if pixmap.loadFromData(response.content):
-                self.poster_cache[url] = pixmap
-                self.poster_label.setPixmap(
-                    pixmap.scaled(
-                        self.poster_label.size(),
-                        Qt.AspectRatioMode.KeepAspectRatio,
-                        Qt.TransformationMode.SmoothTransformation,
-                    )
-                )
-                self.poster_label.setText("")
-            else:
-                self.poster_label.setText("Sem imagem")
-                self.poster_label.setPixmap(QPixmap())
-        except requests.RequestException:
-            self.poster_label.setText("Sem imagem")
-            self.poster_label.setPixmap(QPixmap())
+        self.load_poster(tmdb_image_url(poster_path, image_size))
 
-    def update_poster_info(self, result, media_type):
+    def update_poster_info(self, result, media_type, row=None):
         if media_type == "tv":
             episode_title = result.get('name', 'N/A')
             season_num = result.get('season_number', self.selected_season_number)
             episode_num = result.get('episode_number')
-            series_title = self.selected_series_title or "Serie"
+            series_title = (self.get_row_series_title(row)[0] if row is not None else self.selected_series_title) or "Serie"
             title = f"{series_title} - S{int(season_num):02d}E{int(episode_num):02d}"
             release_date = ''
         else:
@@ -815,23 +1495,19 @@ class RenomeadorUI(QMainWindow):
         if not self.selected_series_title or self.selected_season_number is None:
             return None
 
-        series_folder_name = KodiNamer.format_series_name_for_kodi(
+        return tv_destination_folder(
+            kodi_path,
             self.selected_series_title,
             self.selected_series_year,
+            self.selected_season_number,
         )
-        season_folder_name = f"Temporada {int(self.selected_season_number):02d}"
-        return kodi_path / "Series" / series_folder_name / season_folder_name
-
-    def ensure_selected_tv_destination_folder_exists(self):
-        destination_folder = self.get_selected_tv_destination_folder()
-        if destination_folder is None:
-            return None
 
-        destination_folder.mkdir(parents=True, exist_ok=True)
-        return destination_folder
-    
     def rename_files(self):
         """Copia os arquivos marcados para a pasta do Kodi"""
+        if self.transfer_thread and self.transfer_thread.isRunning():
+            QMessageBox.warning(self, "Aviso", "Ja existe um envio em andamento")
+            return
+
         if not self.selected_folder:
             QMessageBox.warning(self, "Aviso", "Selecione uma pasta primeiro")
             return
@@ -846,10 +1522,16 @@ class RenomeadorUI(QMainWindow):
             QMessageBox.warning(self, "Aviso", "Pasta do Kodi inválida")
             return
         
-        copied_count = 0
-        selected_count = 0
-        errors = []
         remove_original_after_send = self.should_remove_original_after_send()
+        send_mode = self.get_send_mode()
+        planner = TransferPlanner(
+            kodi_root=kodi_path,
+            kodi_index=self.kodi_entries,
+            kodi_library=self.kodi_library,
+            move=remove_original_after_send,
+            mode=send_mode,
+        )
+        tv_destination_folder = self.get_selected_tv_destination_folder()
         
         for row in range(self.files_table.rowCount()):
             original_item = self.files_table.item(row, self.original_column)
@@ -861,8 +1543,6 @@ class RenomeadorUI(QMainWindow):
 
             if send_item.checkState() != Qt.CheckState.Checked:
                 continue
-
-            selected_count += 1
             
             original_display = original_item.text()
             original_path_data = original_item.data(ORIGINAL_PATH_ROLE)
@@ -874,39 +1554,293 @@ class RenomeadorUI(QMainWindow):
             destination_folder = kodi_path
 
             if media_type == "tv":
-                destination_folder = self.ensure_selected_tv_destination_folder_exists() or kodi_path
+                destination_folder = self.get_row_tv_destination_folder(row, kodi_path) or tv_destination_folder or kodi_path
+
+            planner.add(
+                original_path,
+                destination_folder / suggested_name,
+                label=original_display,
+                row=row,
+                media=self.get_row_media(row, media_type),
+            )
 
-            destination_folder.mkdir(parents=True, exist_ok=True)
-            new_path = destination_folder / suggested_name
+        if not planner.items:
+            QMessageBox.information(self, "Aviso", "Nenhum arquivo marcado para envio")
+            return
 
-            if not original_path.exists():
-                errors.append(f"{original_display}: arquivo de origem não encontrado")
-                continue
+        plan = planner.build()
+        if not plan.can_send:
+            message = plan.summary()
+            if plan.rejected_items:
+                message += "\n\nErros ao enviar:\n" + "\n".join(plan.error_messages())
+            QMessageBox.warning(self, "Erros", message)
+            return
+
+        if not self.confirm_transfer_plan(plan):
+            return
+
+        try:
+            plan.create_directories()
+        except OSError as exc:
+            self.show_file_error("Erro ao criar pasta de destino", kodi_path, exc)
+            return
+
+        self.transfer_errors = plan.error_messages()
+        profiling.begin_action(profiling.ACTION_SEND)
+        self.start_transfer(plan.build_jobs(verify=self.get_verify_mode()))
+
+    def get_row_tv_destination_folder(self, row, kodi_path):
+        """Pasta da temporada a partir da serie e do episodio escolhidos na linha"""
+        media = self.get_row_media(row, "tv")
+        if not media or not media.get("series"):
+            return None
+        season_number = media["result"].get("season_number")
+        if season_number is None:
+            return None
+        series_title, series_year = self.get_row_series_title(row)
+        if not series_title:
+            return None
+        return tv_destination_folder(kodi_path, series_title, series_year, season_number)
+
+    def get_row_media(self, row, media_type):
+        """Dados TMDB escolhidos para a linha, usados nos .nfo apos o envio"""
+        select_item = self.files_table.item(row, self.select_column)
+        results = select_item.data(RESULTS_ROLE) if select_item else None
+        index = select_item.data(SELECTED_ROLE) if select_item else None
+        if not results or index is None or index < 0 or index >= len(results):
+            return None
+        series_info = (self.get_row_series(row) or {}) if media_type == "tv" else {}
+        return {
+            "type": media_type,
+            "result": results[index],
+            "series": series_info.get("series"),
+            "season_poster_path": series_info.get("season_poster_path"),
+        }
+
+    def confirm_transfer_plan(self, plan):
+        """Mostra o resumo do planejamento e pede confirmacao antes de enviar"""
+        dialog = QMessageBox(self)
+        dialog.setWindowTitle("Confirmar Envio")
+        dialog.setIcon(QMessageBox.Icon.Question)
+        dialog.setText(plan.summary() + "\n\nDeseja enviar?")
+        if plan.rejected_items:
+            dialog.setDetailedText("\n".join(plan.error_messages()))
+        dialog.setStandardButtons(QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+        dialog.setDefaultButton(QMessageBox.StandardButton.Yes)
+        return dialog.exec() == QMessageBox.StandardButton.Yes
+
+    def check_interrupted_transfers(self):
+        """Oferece retomar envios que ficaram pela metade na ultima execucao"""
+        pending = self.transfer_journal.pending()
+        if not pending:
+            return
+
+        names = "\n".join(entry.get("label") or entry.get("source", "") for entry in pending[:10])
+        if len(pending) > 10:
+            names += f"\n... e mais {len(pending) - 10}"
+        answer = QMessageBox.question(
+            self,
+            "Envios interrompidos",
+            f"{len(pending)} envio(s) nao terminaram na ultima execucao:\n{names}\n\n"
+            "Deseja retomar de onde pararam?",
+        )
+        if answer != QMessageBox.StandardButton.Yes:
+            self.transfer_journal.discard_all()
+            return
 
-            if new_path.exists():
-                errors.append(f"{suggested_name}: já existe na pasta Kodi")
+        jobs = []
+        errors = []
+        for entry in pending:
+            job = TransferJob.from_journal(entry)
+            if not job.committed and not job.source.exists():
+                errors.append(f"{job.label}: arquivo de origem não encontrado")
+                self.transfer_journal.remove(job)
+                job.temp_path.unlink(missing_ok=True)
                 continue
-            
-            try:
-                if remove_original_after_send:
-                    shutil.move(str(original_path), str(new_path))
-                else:
-                    shutil.copy2(original_path, new_path)
-                copied_count += 1
-            except Exception as e:
-                errors.append(f"{original_display}: {str(e)}")
+            jobs.append(job)
 
-        if selected_count == 0:
-            QMessageBox.information(self, "Aviso", "Nenhum arquivo marcado para envio")
+        if not jobs:
+            QMessageBox.warning(self, "Erros", "Erros ao enviar:\n" + "\n".join(errors))
             return
-        
+
+        self.transfer_errors = errors
+        self.start_transfer(jobs)
+
+    def start_transfer(self, jobs):
+        self.transfer_progress = QProgressDialog("Preparando envio...", "Cancelar", 0, 1000, self)
+        self.transfer_progress.setWindowTitle("Enviando Arquivos")
+        self.transfer_progress.setWindowModality(Qt.WindowModality.WindowModal)
+        self.transfer_progress.setMinimumDuration(0)
+        self.transfer_progress.setAutoClose(False)
+        self.transfer_progress.setAutoReset(False)
+        self.transfer_progress.setValue(0)
+
+        self.transfer_thread = TransferThread(jobs, self.transfer_journal)
+        self.transfer_thread.progress_changed.connect(self.on_transfer_progress)
+        self.transfer_thread.transfer_completed.connect(self.on_transfer_completed)
+        self.transfer_progress.canceled.connect(self.transfer_thread.cancel)
+        self.transfer_thread.start()
+
+    def on_transfer_progress(self, index, label, file_throughput, total_transferred, total_size, throughput):
+        if not self.transfer_progress:
+            return
+        total_files = len(self.transfer_thread.queue.jobs) if self.transfer_thread else 0
+        value = int(total_transferred * 1000 / total_size) if total_size else 0
+        self.transfer_progress.setValue(min(value, 1000))
+        self.transfer_progress.setLabelText(
+            f"{label} ({index + 1}/{total_files}) - {format_size(file_throughput)}/s\n"
+            f"{format_size(total_transferred)} de {format_size(total_size)} - {format_size(throughput)}/s"
+        )
+
+    def on_transfer_completed(self, jobs):
+        if self.transfer_progress:
+            self.transfer_progress.close()
+            self.transfer_progress = None
+        self.show_profile_saved(profiling.end_action(profiling.ACTION_SEND))
+
+        errors = list(self.transfer_errors)
+        copied_count = 0
+        moved_count = 0
+        linked_count = 0
+        cancelled_count = 0
+        for job in jobs:
+            if job.status == STATUS_DONE:
+                if job.move:
+                    moved_count += 1
+                elif job.method in (SEND_MODE_HARDLINK, SEND_MODE_REFLINK):
+                    linked_count += 1
+                else:
+                    copied_count += 1
+            elif job.status == STATUS_FAILED:
+                errors.append(f"{job.label}: {job.error}")
+            elif job.status == STATUS_CANCELLED:
+                cancelled_count += 1
+
         if errors:
             error_msg = "Erros ao enviar:\n" + "\n".join(errors)
             QMessageBox.warning(self, "Erros", error_msg)
-        
-        QMessageBox.information(
-            self, "Conclusão",
-            f"{copied_count} arquivo(s) {'movido(s)' if remove_original_after_send else 'copiado(s)'} para a pasta Kodi"
+
+        message_parts = []
+        if copied_count or not (moved_count or linked_count):
+            message_parts.append(f"{copied_count} arquivo(s) copiado(s)")
+        if moved_count:
+            message_parts.append(f"{moved_count} arquivo(s) movido(s)")
+        if linked_count:
+            message_parts.append(f"{linked_count} arquivo(s) vinculado(s) sem copia")
+        message = "\n".join(message_parts) + " para a pasta Kodi"
+        if cancelled_count:
+            message += f"\n{cancelled_count} envio(s) cancelado(s)"
+        QMessageBox.information(self, "Conclusão", message)
+
+        self.apply_transfer_results(jobs)
+        self.start_post_transfer(jobs)
+
+    def is_setting_enabled(self, key):
+        value = (self.get_env_value(key) or "").strip().lower()
+        return value in {"1", "true", "yes", "on", "sim"}
+
+    def start_post_transfer(self, jobs):
+        """Grava .nfo, baixa artes e atualiza a biblioteca do Kodi so nas pastas que receberam arquivos"""
+        kodi_folder = self.get_env_value("KODI_FOLDER")
+        write_nfo = self.is_setting_enabled("WRITE_NFO")
+        download_artwork = self.is_setting_enabled("DOWNLOAD_ARTWORK")
+        if not kodi_folder or not (write_nfo or download_artwork or self.get_env_value("KODI_RPC_URL")):
+            return
+        if not any(job.status == STATUS_DONE for job in jobs):
+            return
+        image_cache, scheduler = self.image_cache, self.tasks.scheduler
+        self.tasks.run(
+            lambda token: post_transfer(
+                jobs,
+                kodi_folder,
+                write_nfo=write_nfo,
+                download_artwork=download_artwork,
+                image_cache=image_cache,
+                scheduler=scheduler,
+                token=token,
+            ),
+            PRIORITY_ARTWORK,
+            self.on_post_transfer_completed,
         )
-        
-        self.refresh_files_lists()
+
+    def on_post_transfer_completed(self, report, error=None):
+        if error is not None:
+            QMessageBox.warning(self, "Erros", f"Erros apos o envio:\n{error}")
+            return
+        if report["errors"]:
+            QMessageBox.warning(self, "Erros", "Erros apos o envio:\n" + "\n".join(report["errors"]))
+            return
+        message_parts = []
+        if report["nfo_files"]:
+            message_parts.append(f"{report['nfo_files']} arquivo(s) .nfo gravado(s)")
+        if report["artwork_files"]:
+            message_parts.append(f"{report['artwork_files']} arte(s) baixada(s)")
+        if report["kodi_scan"]:
+            message_parts.append(f"biblioteca do Kodi atualizando {len(report['kodi_scan'])} pasta(s)")
+        if message_parts:
+            self.statusBar().showMessage("; ".join(message_parts), 10000)
+
+    def apply_transfer_results(self, jobs):
+        """
+        Aplica o resultado do envio nas tabelas sem reler as pastas: linhas
+        movidas saem da lista, copiadas ficam marcadas como enviadas e os
+        destinos entram na lista do Kodi. Linhas nao enviadas mantem busca e selecao.
+        """
+        kodi_folder = self.header_config.get_kodi_selected_folder()
+        kodi_path = Path(kodi_folder) if kodi_folder else None
+        rows_by_path = {}
+        for row in range(self.files_table.rowCount()):
+            original_item = self.files_table.item(row, self.original_column)
+            if original_item is not None and original_item.data(ORIGINAL_PATH_ROLE):
+                rows_by_path[original_item.data(ORIGINAL_PATH_ROLE)] = row
+
+        rows_to_remove = []
+        for job in jobs:
+            if job.status != STATUS_DONE:
+                continue
+            row = rows_by_path.get(str(job.source))
+            if row is not None:
+                if job.move:
+                    rows_to_remove.append(row)
+                else:
+                    self.mark_row_sent(row)
+            if kodi_path is not None:
+                try:
+                    self.add_kodi_entry(job.destination.relative_to(kodi_path).as_posix())
+                except ValueError:
+                    pass
+
+        for row in sorted(rows_to_remove, reverse=True):
+            self.remove_file_row(row)
+
+    def mark_row_sent(self, row):
+        send_item = self.files_table.item(row, self.send_to_kodi_column)
+        if send_item is None:
+            return
+        send_item.setCheckState(Qt.CheckState.Unchecked)
+        send_item.setText("Enviado")
+        self.save_row_state(row)
+
+    def remove_file_row(self, row):
+        if row < len(self.video_files):
+            self.session_store.remove(self.video_files[row])
+            self.session_save_timer.start()
+            self.video_rows.pop(self.video_files[row], None)
+        self.files_table.removeRow(row)
+        for values in (self.video_files, self.search_results, self.search_types, self.series_info):
+            if row < len(values):
+                del values[row]
+        # As linhas abaixo sobem uma posicao
+        for later in range(row, len(self.video_files)):
+            self.video_rows[self.video_files[later]] = later
+
+    def add_kodi_entry(self, relative_path):
+        key = relative_path.lower()
+        row = bisect.bisect_left(self.kodi_entry_keys, key)
+        if row < len(self.kodi_entry_keys) and self.kodi_entry_keys[row] == key:
+            return
+        self.kodi_entry_keys.insert(row, key)
+        self.kodi_entries.insert(row, relative_path)
+        if self.library_index is not None:
+            self.library_index.add_path(relative_path)
+        self.files_section.insert_kodi_file(row, relative_path)
@@ -0,0 +1,122 @@
+import contextlib
+import io
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import main as entry_point
+from src import cli
+from src.core import config
+from src.core.pipeline import ITEM_ACCEPTED, ITEM_REVIEW
+
+MATRIX = {"id": 603, "title": "The Matrix", "original_title": "The Matrix", "release_date": "1999-03-31"}
+HEAT_WAVE = {"id": 1, "title": "Heat Wave", "original_title": "Heat Wave", "release_date": "2022-05-01"}
+
+
+class FakeClient:
+    """Busca de filmes pelo texto da consulta, sem rede"""
+
+    ANSWERS = {"the matrix": [MATRIX], "heat": [HEAT_WAVE]}
+
+    def search_movie(self, query, year=None):
+        return self.ANSWERS.get(query, [])
+
+    def search_tv(self, query, year=None):
+        return []
+
+
+class QtImportBlocker:
+    """Registra (e recusa) qualquer import do PyQt6"""
+
+    def __init__(self):
+        self.attempts = []
+
+    def find_spec(self, name, path=None, target=None):
+        if name.split(".")[0] == "PyQt6":
+            self.attempts.append(name)
+            raise ImportError(f"{name} bloqueado no teste")
+        return None
+
+
+class BatchCommandTest(unittest.TestCase):
+    def setUp(self):
+        self.temp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp.cleanup)
+        root = Path(self.temp.name)
+        # Configuracao vazia: nada do usuario (KODI_DB_PATH, PROFILE...) entra no teste
+        for patcher in (
+            mock.patch.object(config, "get_config_dir", return_value=root / "config"),
+            mock.patch.object(cli, "create_tmdb_client", return_value=FakeClient()),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.downloads = root / "downloads"
+        self.downloads.mkdir()
+        self.kodi = root / "kodi"
+        self.kodi.mkdir()
+        self.matrix = self.downloads / "The.Matrix.1999.1080p.BluRay.mkv"
+        self.heat = self.downloads / "Heat.mkv"
+        for path in (self.matrix, self.heat):
+            path.write_bytes(b"video")
+
+    def run_batch(self, *options):
+        out = io.StringIO()
+        argv = ["batch", str(self.downloads), "--kodi", str(self.kodi), "--no-probe", "--json", *options]
+        with contextlib.redirect_stderr(io.StringIO()):
+            code = cli.main(argv, out=out)
+        return code, json.loads(out.getvalue())
+
+    def files_by_name(self, report):
+        return {Path(entry["file"]).name: entry for entry in report["files"]}
+
+    def test_json_report_shape(self):
+        code, report = self.run_batch("--dry-run")
+        self.assertEqual(code, 0)
+        self.assertEqual(
+            set(report),
+            {"folder", "kodi_folder", "dry_run", "summary", "plan", "plan_blocked", "post_transfer", "files"},
+        )
+        self.assertTrue(report["dry_run"])
+        self.assertEqual(report["summary"]["total"], 2)
+        entry = self.files_by_name(report)[self.matrix.name]
+        self.assertEqual(entry["match"], {"id": 603, "title": "The Matrix", "year": "1999"})
+        self.assertEqual(entry["suggested_name"], "The Matrix (1999).mkv")
+        self.assertIn("Arquivos a enviar", report["plan"])
+
+    def test_dry_run_leaves_files_in_place(self):
+        self.run_batch("--dry-run", "--move")
+        self.assertTrue(self.matrix.exists())
+        self.assertTrue(self.heat.exists())
+        self.assertEqual(list(self.kodi.iterdir()), [])
+
+    def test_min_confidence_splits_accepted_and_review(self):
+        _, report = self.run_batch("--dry-run", "--min-confidence", "0")
+        confidences = {name: entry["confidence"] for name, entry in self.files_by_name(report).items()}
+        # Titulo e ano exatos batem melhor que um titulo so parecido
+        self.assertGreater(confidences[self.matrix.name], confidences[self.heat.name])
+        threshold = (confidences[self.matrix.name] + confidences[self.heat.name]) / 2
+
+        _, report = self.run_batch("--dry-run", "--min-confidence", str(threshold))
+        statuses = {name: entry["status"] for name, entry in self.files_by_name(report).items()}
+        self.assertEqual(statuses, {self.matrix.name: ITEM_ACCEPTED, self.heat.name: ITEM_REVIEW})
+        self.assertEqual(report["summary"][ITEM_REVIEW], 1)
+
+    def test_entry_point_dispatches_batch_without_pyqt(self):
+        blocker = QtImportBlocker()
+        argv = ["main.py", "batch", str(self.downloads), "--kodi", str(self.kodi), "--no-probe", "--dry-run", "--json"]
+        out = io.StringIO()
+        with mock.patch.object(sys, "argv", argv), mock.patch.object(sys, "meta_path", [blocker, *sys.meta_path]), \
+                contextlib.redirect_stdout(out), contextlib.redirect_stderr(io.StringIO()):
+            with self.assertRaises(SystemExit) as exit_info:
+                entry_point.main()
+        self.assertEqual(exit_info.exception.code, 0)
+        self.assertEqual(json.loads(out.getvalue())["summary"]["total"], 2)
+        self.assertEqual(blocker.attempts, [])
+        self.assertNotIn("PyQt6", sys.modules)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,169 @@
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from src.core.KodiNamer import KodiNamer
+from src.core.KodiNfo import read_nfo_ids
+from src.core.pipeline import ITEM_ACCEPTED, BatchPipeline, external_ids_for, lookup_by_ids
+
+MATRIX = {"id": 603, "title": "The Matrix", "original_title": "The Matrix", "release_date": "1999-03-31"}
+HEAT = {"id": 949, "title": "Heat", "release_date": "1995-12-15"}
+SEVERANCE = {"id": 95396, "name": "Severance", "first_air_date": "2022-02-18"}
+
+
+class FakeClient:
+    """Detalhes e /find por id; erros ou ids ausentes viram excecao/None"""
+
+    def __init__(self, movies=None, shows=None, found=None, search=None, fail=False):
+        self.movies = movies or {}
+        self.shows = shows or {}
+        self.found = found or {}
+        self.search = search or []
+        self.fail = fail
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def _call(self, *call):
+        with self.lock:
+            self.calls.append(call)
+        if self.fail:
+            raise Exception("TMDB fora do ar")
+
+    def get_movie_details(self, movie_id, append=None):
+        self._call("movie", movie_id)
+        return self.movies.get(str(movie_id), {})
+
+    def get_tv_details(self, tv_id, append=None):
+        self._call("tv", tv_id)
+        return self.shows.get(str(tv_id), {})
+
+    def find_by_imdb_id(self, imdb_id):
+        self._call("find", imdb_id)
+        return self.found.get(imdb_id, {})
+
+    def search_movie(self, query, year=None):
+        with self.lock:
+            self.calls.append(("search", query, year))
+        return self.search
+
+
+class ExtractExternalIdsTest(unittest.TestCase):
+    def test_tags_in_names(self):
+        cases = {
+            "The Matrix (1999) [tmdbid-603].mkv": {"tmdb": "603"},
+            "Heat.1995.TT0113277.1080p.mkv": {"imdb": "tt0113277"},
+            "Heat (1995) {imdb-tt0113277}": {"imdb": "tt0113277"},
+            "Heat (1995) [tmdb=949] [imdbid-tt0113277]": {"tmdb": "949", "imdb": "tt0113277"},
+            "Matt1234567.mkv": {},
+            "Movie tt12345.mkv": {},
+            "": {},
+        }
+        for name, expected in cases.items():
+            with self.subTest(name=name):
+                self.assertEqual(KodiNamer.extract_external_ids(name), expected)
+
+
+class NfoIdsTest(unittest.TestCase):
+    def setUp(self):
+        self.temp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp.cleanup)
+        self.folder = Path(self.temp.name)
+
+    def write(self, relative, text=b"video"):
+        path = self.folder / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(text if isinstance(text, bytes) else text.encode())
+        return path
+
+    def test_read_nfo_ids_from_kodi_xml_and_release_urls(self):
+        kodi = self.write("a.nfo", '<movie><uniqueid type="tmdb">603</uniqueid><uniqueid type="imdb">tt0133093</uniqueid></movie>')
+        release = self.write("b.nfo", "Heat\nhttps://www.imdb.com/title/tt0113277/\nhttps://www.themoviedb.org/movie/949-heat")
+        self.assertEqual(read_nfo_ids(kodi), {"tmdb": "603", "imdb": "tt0133093"})
+        self.assertEqual(read_nfo_ids(release), {"tmdb": "949", "imdb": "tt0113277"})
+        self.assertEqual(read_nfo_ids(self.write("c.nfo", "sem ids")), {})
+        self.assertEqual(read_nfo_ids(self.folder / "missing.nfo"), {})
+
+    def test_movie_ids_from_name_folder_sidecar_and_movie_nfo(self):
+        in_name = self.write("loose/The Matrix (1999) [tmdbid-603].mkv")
+        in_folder = self.write("Heat (1995) [imdbid-tt0113277]/heat.mkv")
+        sidecar = self.write("sidecar/matrix.mkv")
+        self.write("sidecar/matrix.nfo", "<movie><tmdbid>603</tmdbid></movie>")
+        folder_nfo = self.write("folder/heat.mkv")
+        self.write("folder/movie.nfo", "https://www.imdb.com/title/tt0113277/")
+        plain = self.write("plain/heat.mkv")
+
+        listing_cache = {}
+        self.assertEqual(external_ids_for(in_name, "movie", listing_cache), {"tmdb": "603"})
+        self.assertEqual(external_ids_for(in_folder, "movie", listing_cache), {"imdb": "tt0113277"})
+        self.assertEqual(external_ids_for(sidecar, "movie", listing_cache), {"tmdb": "603"})
+        self.assertEqual(external_ids_for(folder_nfo, "movie", listing_cache), {"imdb": "tt0113277"})
+        self.assertEqual(external_ids_for(plain, "movie", listing_cache), {})
+
+    def test_series_use_only_show_level_ids(self):
+        episode = self.write("Severance/Season 01/Severance S01E01.mkv")
+        # O .nfo do episodio tem o id do episodio, nao o da serie
+        self.write("Severance/Season 01/Severance S01E01.nfo", "<episodedetails><tmdbid>1234</tmdbid></episodedetails>")
+        self.assertEqual(external_ids_for(episode, "tv"), {})
+        self.write("Severance/tvshow.nfo", '<tvshow><uniqueid type="tmdb">95396</uniqueid></tvshow>')
+        self.assertEqual(external_ids_for(episode, "tv"), {"tmdb": "95396"})
+
+        tagged = self.write("Severance [tmdbid-95396]/Season 02/Severance S02E01.mkv")
+        self.assertEqual(external_ids_for(tagged, "tv"), {"tmdb": "95396"})
+
+
+class LookupByIdsTest(unittest.TestCase):
+    def test_tmdb_id_goes_to_the_details(self):
+        client = FakeClient(movies={"603": MATRIX}, shows={"95396": SEVERANCE})
+        self.assertEqual(lookup_by_ids(client, {"tmdb": "603", "imdb": "tt0133093"}, "movie"), MATRIX)
+        self.assertEqual(lookup_by_ids(client, {"tmdb": "95396"}, "tv"), SEVERANCE)
+        self.assertIsNone(lookup_by_ids(client, {"tmdb": "1"}, "movie"))
+        self.assertEqual(client.calls, [("movie", "603"), ("tv", "95396"), ("movie", "1")])
+
+    def test_find_picks_the_results_of_the_media_type(self):
+        found = {
+            "tt0113277": {"movie_results": [HEAT], "tv_results": [SEVERANCE]},
+            "tt11280740": {"movie_results": [], "tv_results": [SEVERANCE]},
+            "tt14392140": {"tv_episode_results": [{"id": 1, "show_id": 95396}]},
+        }
+        client = FakeClient(shows={"95396": SEVERANCE}, found=found)
+        self.assertEqual(lookup_by_ids(client, {"imdb": "tt0113277"}, "movie"), HEAT)
+        self.assertEqual(lookup_by_ids(client, {"imdb": "tt0113277"}, "tv"), SEVERANCE)
+        self.assertIsNone(lookup_by_ids(client, {"imdb": "tt11280740"}, "movie"))
+        # Id de episodio: a serie vem de show_id
+        self.assertEqual(lookup_by_ids(client, {"imdb": "tt14392140"}, "tv"), SEVERANCE)
+        self.assertIsNone(lookup_by_ids(client, {"imdb": "tt0000001"}, "tv"))
+        self.assertIsNone(lookup_by_ids(client, {}, "movie"))
+
+
+class PipelineLookupTest(unittest.TestCase):
+    def setUp(self):
+        self.temp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp.cleanup)
+        self.folder = Path(self.temp.name)
+        self.video = self.folder / "The Matrix (1999) [tmdbid-603].mkv"
+        self.video.write_bytes(b"video")
+
+    def resolve(self, client):
+        pipeline = BatchPipeline(client, workers=2)
+        self.addCleanup(pipeline.scheduler.shutdown)
+        pipeline.scan(self.folder)
+        return pipeline.resolve()[0]
+
+    def test_exact_id_skips_the_text_search(self):
+        client = FakeClient(movies={"603": MATRIX}, search=[HEAT])
+        item = self.resolve(client)
+        self.assertEqual((item.status, item.confidence, item.chosen), (ITEM_ACCEPTED, 1.0, MATRIX))
+        self.assertNotIn("search", [call[0] for call in client.calls])
+
+    def test_failed_lookup_falls_back_to_the_text_search(self):
+        for client in (FakeClient(search=[MATRIX]), FakeClient(search=[MATRIX], fail=True)):
+            with self.subTest(fail=client.fail):
+                item = self.resolve(client)
+                self.assertIn(("search", "the matrix", 1999), client.calls)
+                self.assertEqual(item.chosen, MATRIX)
+                self.assertEqual(item.status, ITEM_ACCEPTED)
+
+
+if __name__ == "__main__":
+    unittest.main()
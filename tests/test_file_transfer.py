@@ -0,0 +1,159 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.core.FileTransfer import (
+    COPY_STRATEGIES,
+    COPY_USERSPACE,
+    PART_SUFFIX,
+    SEND_MODE_HARDLINK,
+    STATUS_DONE,
+    STATUS_FAILED,
+    VERIFY_FULL,
+    VERIFY_NONE,
+    VERIFY_SAMPLE,
+    TransferJob,
+    TransferQueue,
+)
+from src.core.TransferJournal import TransferJournal
+
+
+class SmallChunkQueue(TransferQueue):
+    CHUNK_SIZE = 64 * 1024
+    CHECKPOINT_SIZE = 128 * 1024
+
+
+class TransferTestCase(unittest.TestCase):
+    def setUp(self):
+        self.temp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp.cleanup)
+        self.root = Path(self.temp.name)
+        self.source_dir = self.root / "downloads"
+        self.kodi = self.root / "kodi"
+        self.source_dir.mkdir()
+        self.kodi.mkdir()
+
+    def make_source(self, name="movie.mkv", size=600 * 1024, seed=1):
+        path = self.source_dir / name
+        path.write_bytes(bytes((index * seed) % 251 for index in range(size)))
+        return path
+
+    def run_queue(self, jobs, **kwargs):
+        return SmallChunkQueue(jobs, **kwargs).run()
+
+
+class CopyTest(TransferTestCase):
+    def test_copy_with_each_strategy_and_verify_mode(self):
+        source = self.make_source()
+        for strategy in COPY_STRATEGIES:
+            for verify in (VERIFY_NONE, VERIFY_SAMPLE, VERIFY_FULL):
+                with self.subTest(strategy=strategy, verify=verify):
+                    destination = self.kodi / f"{strategy}-{verify}.mkv"
+                    job = TransferJob(source, destination, verify=verify)
+                    self.run_queue([job], copy_strategies=(strategy, COPY_USERSPACE))
+                    self.assertEqual(job.status, STATUS_DONE, job.error)
+                    self.assertEqual(destination.read_bytes(), source.read_bytes())
+                    self.assertFalse(destination.with_name(destination.name + PART_SUFFIX).exists())
+                    self.assertEqual(job.verified, verify != VERIFY_NONE)
+        self.assertTrue(source.exists())
+
+    def test_move_removes_source_after_sending(self):
+        source = self.make_source()
+        data = source.read_bytes()
+        job = TransferJob(source, self.kodi / "movie.mkv", move=True)
+        self.run_queue([job])
+        self.assertEqual(job.status, STATUS_DONE, job.error)
+        self.assertFalse(source.exists())
+        self.assertEqual((self.kodi / "movie.mkv").read_bytes(), data)
+
+    def test_existing_destination_is_never_overwritten(self):
+        source = self.make_source()
+        destination = self.kodi / "movie.mkv"
+        destination.write_bytes(b"already here")
+        job = TransferJob(source, destination)
+        self.run_queue([job])
+        self.assertEqual(job.status, STATUS_FAILED)
+        self.assertEqual(destination.read_bytes(), b"already here")
+
+    def test_hardlink_on_same_device(self):
+        source = self.make_source()
+        destination = self.kodi / "movie.mkv"
+        job = TransferJob(source, destination, mode=SEND_MODE_HARDLINK)
+        self.run_queue([job])
+        self.assertEqual(job.status, STATUS_DONE, job.error)
+        self.assertEqual(destination.read_bytes(), source.read_bytes())
+
+    def test_journal_entry_is_removed_after_commit(self):
+        journal = TransferJournal(self.root / "transfers.json")
+        job = TransferJob(self.make_source(), self.kodi / "movie.mkv")
+        self.run_queue([job], journal=journal)
+        self.assertEqual(job.status, STATUS_DONE, job.error)
+        self.assertEqual(journal.pending(), [])
+
+
+class ResumeTest(TransferTestCase):
+    def interrupted_entry(self, source, verified_offset, partial):
+        """Diario e parcial como ficam quando o app cai no meio de um envio"""
+        journal = TransferJournal(self.root / "transfers.json")
+        job = TransferJob(source, self.kodi / "movie.mkv", verify=VERIFY_NONE)
+        job.refresh_source()
+        job.resume_offset = verified_offset
+        job.temp_path.write_bytes(partial)
+        journal.record_planned(job)
+        return TransferJournal(self.root / "transfers.json")
+
+    def test_unchanged_source_resumes_from_verified_offset(self):
+        source = self.make_source()
+        offset = 256 * 1024
+        # O parcial e marcado para provar que os bytes ja confirmados nao sao copiados de novo
+        partial = b"x" * offset
+        journal = self.interrupted_entry(source, offset, partial)
+        (entry,) = journal.pending()
+        self.assertEqual(entry["mtime_ns"], source.stat().st_mtime_ns)
+
+        job = TransferJob.from_journal(entry)
+        self.run_queue([job], journal=journal)
+        self.assertEqual(job.status, STATUS_DONE, job.error)
+        self.assertEqual(job.destination.read_bytes(), partial + source.read_bytes()[offset:])
+        self.assertEqual(journal.pending(), [])
+
+    def test_source_changed_after_crash_restarts_from_zero(self):
+        source = self.make_source()
+        offset = 256 * 1024
+        journal = self.interrupted_entry(source, offset, b"x" * offset)
+        # Mesmo tamanho, conteudo e mtime novos
+        source.write_bytes(self.make_source(seed=7).read_bytes())
+        stat = source.stat()
+        os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        job = TransferJob.from_journal(journal.pending()[0])
+        self.run_queue([job], journal=journal)
+        self.assertEqual(job.status, STATUS_DONE, job.error)
+        self.assertEqual(job.destination.read_bytes(), source.read_bytes())
+
+    def test_source_with_new_size_restarts_from_zero(self):
+        source = self.make_source()
+        offset = 256 * 1024
+        journal = self.interrupted_entry(source, offset, b"x" * offset)
+        source.write_bytes(source.read_bytes() + b"more data")
+
+        job = TransferJob.from_journal(journal.pending()[0])
+        self.run_queue([job], journal=journal)
+        self.assertEqual(job.status, STATUS_DONE, job.error)
+        self.assertEqual(job.destination.read_bytes(), source.read_bytes())
+
+    def test_entry_without_mtime_restarts_from_zero(self):
+        source = self.make_source()
+        offset = 256 * 1024
+        journal = self.interrupted_entry(source, offset, b"x" * offset)
+        entry = journal.pending()[0]
+        del entry["mtime_ns"]
+
+        job = TransferJob.from_journal(entry)
+        self.run_queue([job])
+        self.assertEqual(job.destination.read_bytes(), source.read_bytes())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from src.core import KodiLibraryDb as kodi_library_db
+from src.core.KodiLibraryDb import KodiLibrary, find_video_database, open_read_only
+from src.core.pipeline import load_kodi_index
+
+ROOT = "smb://nas/kodi/"
+
+SCHEMA = """
+CREATE TABLE movie_view (idMovie INTEGER, c00 TEXT, c07 TEXT, c09 TEXT, premiered TEXT, strPath TEXT, strFileName TEXT);
+CREATE TABLE tvshow_view (idShow INTEGER, c00 TEXT, c05 TEXT, strPath TEXT);
+CREATE TABLE episode_view (idEpisode INTEGER, idShow INTEGER, c00 TEXT, c12 TEXT, c13 TEXT, strPath TEXT, strFileName TEXT);
+CREATE TABLE uniqueid (media_id INTEGER, media_type TEXT, type TEXT, value TEXT);
+"""
+
+
+def build_database(path, unique_ids=True):
+    """MyVideos minimo: as views do Kodi viram tabelas com as mesmas colunas"""
+    connection = sqlite3.connect(path)
+    schema = SCHEMA if unique_ids else SCHEMA.rsplit("CREATE TABLE uniqueid", 1)[0]
+    connection.executescript(schema)
+    connection.executemany(
+        "INSERT INTO movie_view VALUES (?, ?, ?, ?, ?, ?, ?)",
+        [
+            (1, "Inception", "", "", "2010-07-15", f"{ROOT}Filmes/", "Inception (2010).mkv"),
+            (2, "Heat", "1995", "tt0113277", None, f"{ROOT}Filmes/", "Heat (1995).mkv"),
+            (3, "Fora da raiz", "", "", "2001-01-01", "smb://nas/outros/", "Outro (2001).mkv"),
+        ],
+    )
+    connection.execute("INSERT INTO tvshow_view VALUES (10, 'Severance', '2022-02-18', ?)", (f"{ROOT}Series/Severance/",))
+    connection.execute(
+        "INSERT INTO episode_view VALUES (100, 10, 'Good News About Hell', '1', '1', ?, 'Severance S01E01.mkv')",
+        (f"{ROOT}Series/Severance/Season 01/",),
+    )
+    if unique_ids:
+        connection.executemany(
+            "INSERT INTO uniqueid VALUES (?, ?, ?, ?)",
+            [
+                (1, "movie", "tmdb", "27205"),
+                (1, "movie", "imdb", "tt1375666"),
+                (10, "tvshow", "tmdb", "95396"),
+            ],
+        )
+    connection.commit()
+    connection.close()
+
+
+def movie_media(**result):
+    return {"type": "movie", "result": result}
+
+
+def episode_media(series_id, season, episode):
+    return {
+        "type": "tv",
+        "series": {"id": series_id},
+        "result": {"season_number": season, "episode_number": episode},
+    }
+
+
+class KodiLibraryTest(unittest.TestCase):
+    def setUp(self):
+        self.temp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp.cleanup)
+        self.folder = Path(self.temp.name) / "Database"
+        self.folder.mkdir()
+        self.database = self.folder / "MyVideos131.db"
+        build_database(self.database)
+
+    def test_relative_paths_are_relative_to_the_kodi_folder(self):
+        library = KodiLibrary.load(self.database, ROOT)
+        self.assertEqual(
+            library.relative_paths(),
+            ["Filmes/Heat (1995).mkv", "Filmes/Inception (2010).mkv", "Series/Severance/Season 01/Severance S01E01.mkv"],
+        )
+        self.assertEqual(library.movies[0]["year"], "2010")
+        self.assertEqual(library.movies[1]["year"], "1995")
+
+    def test_contains_media_matches_movie_and_episode_ids(self):
+        library = KodiLibrary.load(self.database, ROOT)
+        self.assertTrue(library.contains_media(movie_media(id=27205)))
+        self.assertTrue(library.contains_media(movie_media(id=1, imdb_id="tt1375666")))
+        self.assertFalse(library.contains_media(movie_media(id=603)))
+        self.assertTrue(library.contains_media(episode_media(95396, "1", 1)))
+        self.assertFalse(library.contains_media(episode_media(95396, 1, 2)))
+        self.assertFalse(library.contains_media(None))
+
+    def test_legacy_database_uses_the_imdb_column(self):
+        legacy = self.folder / "MyVideos99.db"
+        build_database(legacy, unique_ids=False)
+        library = KodiLibrary.load(legacy, ROOT)
+        self.assertTrue(library.contains_media(movie_media(id=949, imdb_id="tt0113277")))
+        self.assertFalse(library.contains_media(movie_media(id=27205)))
+
+    def test_newest_database_of_the_folder_is_picked(self):
+        build_database(self.folder / "MyVideos99.db")
+        self.assertEqual(find_video_database(self.folder), self.database)
+        self.assertIsNone(find_video_database(self.folder / "missing"))
+
+    def test_database_is_opened_read_only(self):
+        with mock.patch.object(kodi_library_db.sqlite3, "connect", wraps=sqlite3.connect) as connect:
+            KodiLibrary.load(self.database, ROOT)
+        uri = connect.call_args.args[0]
+        self.assertTrue(uri.startswith("file://") and uri.endswith("?mode=ro"))
+        self.assertTrue(connect.call_args.kwargs["uri"])
+
+        connection = open_read_only(self.database)
+        self.addCleanup(connection.close)
+        with self.assertRaises(sqlite3.OperationalError):
+            connection.execute("DELETE FROM movie_view")
+
+
+class LoadKodiIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.temp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp.cleanup)
+        self.kodi = Path(self.temp.name) / "kodi"
+        (self.kodi / "Filmes").mkdir(parents=True)
+        (self.kodi / "Filmes" / "Heat (1995).mkv").write_bytes(b"video")
+
+    def load_with(self, db_path):
+        settings = {"KODI_DB_PATH": db_path, "KODI_RPC_PATH": ""}
+        with mock.patch.object(kodi_library_db, "get_setting", side_effect=lambda key, default=None: settings.get(key, default)):
+            return load_kodi_index(self.kodi)
+
+    def test_missing_or_remote_database_falls_back_to_the_folder_scan(self):
+        for db_path in (str(Path(self.temp.name) / "missing"), "smb://nas/userdata/Database/MyVideos131.db"):
+            with self.subTest(db_path=db_path):
+                entries, library, error = self.load_with(db_path)
+                self.assertIsNone(library)
+                self.assertTrue(error)
+                self.assertEqual(entries, ["Filmes/Heat (1995).mkv"])
+
+    def test_without_a_database_the_folder_is_scanned(self):
+        entries, library, error = self.load_with("")
+        self.assertEqual((entries, library, error), (["Filmes/Heat (1995).mkv"], None, None))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from src.core.ArtworkDownloader import artwork_tasks
+from src.core.FileTransfer import STATUS_DONE, TransferJob
+from src.core.KodiNfo import (
+    TVSHOW_NFO,
+    build_episode_nfo,
+    build_movie_nfo,
+    build_tvshow_nfo,
+    read_nfo_ids,
+    series_folder,
+    write_nfo_files,
+)
+
+MOVIE = {
+    "id": 27205,
+    "title": "A Origem",
+    "original_title": "Inception",
+    "release_date": "2010-07-15",
+    "runtime": 148,
+    "imdb_id": "tt1375666",
+    "vote_average": 8.4,
+    "vote_count": 35000,
+    "genres": [{"name": "Acao"}],
+    "poster_path": "/poster.jpg",
+    "backdrop_path": "/fanart.jpg",
+}
+SERIES = {"id": 70523, "name": "Dark", "first_air_date": "2017-12-01", "poster_path": "/dark.jpg"}
+EPISODE = {"id": 1, "name": "Segredos", "season_number": 1, "episode_number": 2, "still_path": "/still.jpg"}
+
+
+class BuildNfoTest(unittest.TestCase):
+    def test_movie_nfo_is_indented_xml_with_tmdb_id(self):
+        text = build_movie_nfo(MOVIE)
+        self.assertTrue(text.startswith('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n<movie>\n  <title>'))
+        root = ET.fromstring(text.split("\n", 1)[1])
+        self.assertEqual(root.findtext("title"), "A Origem")
+        self.assertEqual(root.findtext("year"), "2010")
+        self.assertEqual(root.find("uniqueid[@type='tmdb']").text, "27205")
+        self.assertEqual(root.find("uniqueid[@type='imdb']").text, "tt1375666")
+        self.assertIn("\n    <rating", text)
+        self.assertIn("\n      <value>8.4</value>", text)
+
+    def test_indent_matches_elementtree(self):
+        if not hasattr(ET, "indent"):
+            self.skipTest("ET.indent requer Python 3.9")
+        for text in (build_movie_nfo(MOVIE), build_tvshow_nfo(SERIES), build_episode_nfo(EPISODE, SERIES)):
+            body = text.split("\n", 1)[1].rstrip("\n")
+            expected = ET.fromstring(body)
+            ET.indent(expected)
+            self.assertEqual(body, ET.tostring(expected, encoding="unicode"))
+
+    def test_written_nfo_ids_can_be_read_back(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = Path(folder) / "movie.nfo"
+            path.write_text(build_movie_nfo(MOVIE), encoding="utf-8")
+            self.assertEqual(read_nfo_ids(path), {"tmdb": "27205", "imdb": "tt1375666"})
+
+
+class SeriesFolderTest(unittest.TestCase):
+    def test_episode_in_season_folder(self):
+        root = Path("/kodi")
+        episode = root / "Series" / "Dark (2017)" / "Temporada 01" / "Dark - S01E02.mkv"
+        self.assertEqual(series_folder(episode, root), root / "Series" / "Dark (2017)")
+
+    def test_episode_directly_in_series_folder(self):
+        root = Path("/kodi")
+        self.assertEqual(series_folder(root / "Series" / "Dark" / "Dark - S01E02.mkv", root), root / "Series" / "Dark")
+
+    def test_destination_outside_series_has_no_series_folder(self):
+        root = Path("/kodi")
+        self.assertIsNone(series_folder(root / "Dark - S01E02.mkv", root))
+        self.assertIsNone(series_folder(root / "Series" / "Dark - S01E02.mkv", root))
+        self.assertIsNone(series_folder(Path("/elsewhere/Dark - S01E02.mkv"), root))
+
+
+class WriteNfoTest(unittest.TestCase):
+    def setUp(self):
+        self.temp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp.cleanup)
+        self.kodi = Path(self.temp.name) / "kodi"
+
+    def sent_episode(self, destination):
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        destination.write_bytes(b"")
+        job = TransferJob(destination, destination, media={"type": "tv", "result": EPISODE, "series": SERIES})
+        job.status = STATUS_DONE
+        return job
+
+    def test_episode_in_series_folder_writes_tvshow_nfo_once(self):
+        season = self.kodi / "Series" / "Dark (2017)" / "Temporada 01"
+        jobs = [self.sent_episode(season / "Dark - S01E02.mkv"), self.sent_episode(season / "Dark - S01E03.mkv")]
+        written, errors = write_nfo_files(jobs, self.kodi)
+        self.assertEqual(errors, [])
+        self.assertEqual(
+            sorted(path.name for path in written), ["Dark - S01E02.nfo", "Dark - S01E03.nfo", TVSHOW_NFO]
+        )
+        self.assertTrue((season.parent / TVSHOW_NFO).exists())
+
+    def test_episode_in_kodi_root_skips_series_files(self):
+        job = self.sent_episode(self.kodi / "Dark - S01E02.mkv")
+        written, errors = write_nfo_files([job], self.kodi)
+        self.assertEqual(written, [self.kodi / "Dark - S01E02.nfo"])
+        self.assertFalse((self.kodi.parent / TVSHOW_NFO).exists())
+
+        destinations = [task.destination for task in artwork_tasks(job, self.kodi)]
+        self.assertEqual(destinations, [self.kodi / "Dark - S01E02-thumb.jpg"])
+
+    def test_series_artwork_goes_to_series_folder(self):
+        season = self.kodi / "Series" / "Dark (2017)" / "Temporada 01"
+        job = self.sent_episode(season / "Dark - S01E02.mkv")
+        job.media["season_poster_path"] = "/season1.jpg"
+        names = {task.destination.relative_to(self.kodi).as_posix() for task in artwork_tasks(job, self.kodi)}
+        self.assertEqual(
+            names,
+            {
+                "Series/Dark (2017)/Temporada 01/Dark - S01E02-thumb.jpg",
+                "Series/Dark (2017)/poster.jpg",
+                "Series/Dark (2017)/fanart.jpg",
+                "Series/Dark (2017)/season01-poster.jpg",
+            },
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+from pathlib import Path
+
+from src.core.KodiRpcClient import KodiRpcClient
+
+ROOT = Path("/kodi")
+
+
+class CoalesceTest(unittest.TestCase):
+    def setUp(self):
+        self.client = KodiRpcClient("http://kodi.local:8080/jsonrpc", ROOT)
+
+    def test_series_episodes_scan_show_folder(self):
+        targets = self.client.coalesce([
+            ROOT / "Series" / "Show" / "Season 01" / "Show S01E01.mkv",
+            ROOT / "Series" / "Show" / "Season 02" / "Show S02E01.mkv",
+        ])
+        self.assertEqual(targets, [ROOT / "Series" / "Show"])
+
+    def test_movie_in_root_never_scans_root(self):
+        movie = ROOT / "Inception (2010).mkv"
+        episode = ROOT / "Series" / "Show" / "Season 01" / "Show S01E01.mkv"
+        targets = self.client.coalesce([movie, episode])
+        self.assertEqual(targets, [movie, ROOT / "Series" / "Show"])
+        self.assertNotIn(ROOT, targets)
+
+    def test_files_loose_in_series_folder_scan_the_file(self):
+        loose = ROOT / "Series" / "Show S01E01.mkv"
+        other = ROOT / "Series" / "Other" / "Season 01" / "Other S01E01.mkv"
+        self.assertEqual(self.client.coalesce([loose, other]), [ROOT / "Series" / "Other", loose])
+
+    def test_nested_folders_are_dropped(self):
+        targets = self.client.coalesce([
+            ROOT / "Filmes" / "Dune (2021).mkv",
+            ROOT / "Filmes" / "Extras" / "Dune (2021) trailer.mkv",
+        ])
+        self.assertEqual(targets, [ROOT / "Filmes"])
+
+    def test_remote_paths(self):
+        client = KodiRpcClient("http://kodi", ROOT, remote_root="smb://nas/kodi/")
+        self.assertEqual(client.to_remote_path(ROOT / "Series" / "Show"), "smb://nas/kodi/Series/Show/")
+        self.assertEqual(client.to_remote_path(ROOT / "Dune.mkv", folder=False), "smb://nas/kodi/Dune.mkv")
+
+    def test_scan_directories_sends_file_and_folder_targets(self):
+        sent = []
+        self.client.call = lambda batch: sent.extend(batch) or []
+        directories = self.client.scan_directories([
+            ROOT / "Dune (2021).mkv",
+            ROOT / "Series" / "Show" / "Season 01" / "Show S01E01.mkv",
+        ])
+        self.assertEqual(directories, ["/kodi/Dune (2021).mkv", "/kodi/Series/Show/"])
+        self.assertEqual([request["params"]["directory"] for request in sent], directories)
+
+
+if __name__ == "__main__":
+    unittest.main()
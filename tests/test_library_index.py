@@ -0,0 +1,83 @@
+import unittest
+
+from src.core.LibraryIndex import LibraryIndex, parse_name, split_title, title_key
+
+
+class ParseNameTest(unittest.TestCase):
+    def test_release_name_and_library_name_share_a_key(self):
+        self.assertEqual(parse_name("Inception.2010.1080p.BluRay.x264-GROUP.mkv", "movie"), ("movie", "inception", 2010))
+        self.assertEqual(parse_name("Inception (2010).mkv", "movie"), ("movie", "inception", 2010))
+
+    def test_title_keeps_its_numbers(self):
+        self.assertEqual(parse_name("Toy.Story.3.1080p.mkv", "movie"), ("movie", "toy story 3", None))
+        self.assertEqual(split_title("Blade Runner 2049 (2017)"), ("Blade Runner 2049", 2017))
+
+    def test_number_only_titles(self):
+        self.assertEqual(parse_name("1917.mkv", "movie"), ("movie", "1917", None))
+        self.assertEqual(parse_name("1917 (2019).mkv", "movie"), ("movie", "1917", 2019))
+        self.assertEqual(parse_name("2012.2009.720p.mkv", "movie"), ("movie", "2012", 2009))
+
+    def test_episode_key(self):
+        self.assertEqual(parse_name("The.Office.US.S02E03.720p.mkv", "tv"), ("tv", "the office us", None, 2, 3))
+        self.assertEqual(parse_name("9-1-1 (2018) - S01E02.mkv", "tv"), ("tv", "9 1 1", 2018, 1, 2))
+        self.assertIsNone(parse_name("Show.Special.mkv", "tv"))
+
+    def test_accents_and_punctuation_are_ignored(self):
+        self.assertEqual(title_key("Amélie: O Fabuloso Destino"), "amelie o fabuloso destino")
+
+
+class MatchTest(unittest.TestCase):
+    def test_same_title_and_year(self):
+        index = LibraryIndex.build(["Inception (2010).mkv"])
+        self.assertEqual(index.match_name("Inception.2010.1080p.mkv", "movie"), "Inception (2010).mkv")
+
+    def test_year_must_agree(self):
+        index = LibraryIndex.build(["Dune (1984).mkv"])
+        self.assertIsNone(index.match_name("Dune.2021.mkv", "movie"))
+
+    def test_yearless_name_matches_unique_title(self):
+        index = LibraryIndex.build(["Inception (2010).mkv"])
+        self.assertEqual(index.match_name("Inception.mkv", "movie"), "Inception (2010).mkv")
+
+    def test_yearless_name_with_ambiguous_title_does_not_match(self):
+        index = LibraryIndex.build(["Dune (1984).mkv", "Dune (2021).mkv"])
+        self.assertIsNone(index.match_name("Dune.mkv", "movie"))
+
+    def test_sequel_does_not_match_original(self):
+        index = LibraryIndex.build(["Toy Story (1995).mkv"])
+        self.assertIsNone(index.match_name("Toy.Story.3.mkv", "movie"))
+        self.assertIsNone(index.match_name("Toy.Story.2.1999.mkv", "movie"))
+
+    def test_original_does_not_match_sequel(self):
+        index = LibraryIndex.build(["Toy Story 3 (2010).mkv"])
+        self.assertIsNone(index.match_name("Toy.Story.mkv", "movie"))
+        self.assertEqual(index.match_name("Toy.Story.3.2010.mkv", "movie"), "Toy Story 3 (2010).mkv")
+
+    def test_number_only_title(self):
+        index = LibraryIndex.build(["1917 (2019).mkv"])
+        self.assertEqual(index.match_name("1917.mkv", "movie"), "1917 (2019).mkv")
+        self.assertEqual(index.match_name("1917.2019.2160p.mkv", "movie"), "1917 (2019).mkv")
+        self.assertIsNone(index.match_name("2012.mkv", "movie"))
+
+    def test_episode_uses_series_folder_when_name_has_no_series(self):
+        relative = "Series/Dark (2017)/Season 01/S01E02.mkv"
+        index = LibraryIndex.build([relative])
+        self.assertEqual(index.match_name("Dark.S01E02.1080p.mkv", "tv"), relative)
+        self.assertIsNone(index.match_name("Dark.S01E03.1080p.mkv", "tv"))
+
+    def test_kodi_library_titles(self):
+        class Library:
+            movies = [{"title": "Toy Story 3", "year": "2010", "file": "/kodi/Toy Story 3 (2010).mkv"}]
+            episodes = [{"show_title": "Dark", "show_year": "2017", "season": 1, "episode": 2, "file": "/kodi/d.mkv"}]
+
+            def relative_path(self, path):
+                return path.rsplit("/", 1)[-1]
+
+        index = LibraryIndex.build([], Library())
+        self.assertEqual(index.match_name("Toy.Story.3.mkv", "movie"), "Toy Story 3 (2010).mkv")
+        self.assertIsNone(index.match_name("Toy.Story.mkv", "movie"))
+        self.assertEqual(index.match_name("Dark.2017.S01E02.mkv", "tv"), "d.mkv")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,244 @@
+import os
+import struct
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from src.core import MediaProbe as media_probe
+from src.core.MediaProbe import MediaProbeCache, probe, resolution_label
+from src.core.TaskScheduler import PRIORITY_SEARCH, TaskScheduler
+
+
+def ebml_size(length):
+    for width in range(1, 9):
+        if length < (1 << (7 * width)) - 1:
+            return ((1 << (7 * width)) | length).to_bytes(width, "big")
+    raise ValueError(length)
+
+
+def element(element_id, payload):
+    return element_id.to_bytes((element_id.bit_length() + 7) // 8, "big") + ebml_size(len(payload)) + payload
+
+
+def uint_element(element_id, value, width=None):
+    return element(element_id, value.to_bytes(width or max(1, (value.bit_length() + 7) // 8), "big"))
+
+
+def text_element(element_id, text):
+    return element(element_id, text.encode())
+
+
+MKV_HEADER = element(media_probe.EBML_HEADER, text_element(0x4282, "matroska"))
+MKV_INFO = element(
+    media_probe.MKV_INFO,
+    uint_element(media_probe.MKV_TIMECODE_SCALE, 1000000)
+    + element(media_probe.MKV_DURATION, struct.pack(">d", 8880500.0))
+    + text_element(media_probe.MKV_TITLE, "Inception (2010)"),
+)
+MKV_TRACKS = element(
+    media_probe.MKV_TRACKS,
+    element(
+        media_probe.MKV_TRACK_ENTRY,
+        uint_element(media_probe.MKV_TRACK_TYPE, 1)
+        + text_element(media_probe.MKV_CODEC_ID, "V_MPEGH/ISO/HEVC")
+        + element(
+            media_probe.MKV_VIDEO,
+            uint_element(media_probe.MKV_PIXEL_WIDTH, 1920) + uint_element(media_probe.MKV_PIXEL_HEIGHT, 800),
+        ),
+    )
+    + element(
+        media_probe.MKV_TRACK_ENTRY,
+        uint_element(media_probe.MKV_TRACK_TYPE, 2)
+        + text_element(media_probe.MKV_CODEC_ID, "A_AAC")
+        + text_element(media_probe.MKV_LANGUAGE, "por"),
+    )
+    # Sem Language o padrao do Matroska e ingles
+    + element(
+        media_probe.MKV_TRACK_ENTRY,
+        uint_element(media_probe.MKV_TRACK_TYPE, 2) + text_element(media_probe.MKV_CODEC_ID, "A_AC3"),
+    ),
+)
+MKV_CLUSTER = element(media_probe.MKV_CLUSTER, b"\0" * 65536)
+
+
+def seek_head(positions):
+    seeks = b"".join(
+        element(
+            media_probe.MKV_SEEK,
+            uint_element(media_probe.MKV_SEEK_ID, target, 4) + uint_element(media_probe.MKV_SEEK_POSITION, position, 8),
+        )
+        for target, position in positions
+    )
+    return element(media_probe.MKV_SEEK_HEAD, seeks)
+
+
+def box(box_type, payload):
+    return struct.pack(">I", 8 + len(payload)) + box_type + payload
+
+
+def mp4_track(handler, width, height, language, codec):
+    tkhd = box(b"tkhd", b"\0" * 76 + struct.pack(">II", width << 16, height << 16))
+    packed = sum((ord(char) - 0x60) << shift for char, shift in zip(language, (10, 5, 0)))
+    mdhd = box(b"mdhd", b"\0" * 4 + struct.pack(">IIII", 0, 0, 1000, 1) + struct.pack(">H", packed) + b"\0\0")
+    hdlr = box(b"hdlr", b"\0" * 8 + handler + b"\0" * 12)
+    stsd = box(b"stsd", b"\0" * 4 + struct.pack(">I", 1) + box(codec, b"\0" * 20))
+    return box(b"trak", tkhd + box(b"mdia", mdhd + hdlr + box(b"minf", box(b"stbl", stsd))))
+
+
+def mp4_file(title):
+    mvhd = box(b"mvhd", b"\0" * 4 + struct.pack(">IIII", 0, 0, 1000, 7200000) + b"\0" * 80)
+    ilst = box(b"ilst", box(b"\xa9nam", box(b"data", b"\0\0\0\1\0\0\0\0" + title.encode())))
+    meta = box(b"meta", b"\0" * 4 + box(b"hdlr", b"\0" * 8 + b"mdir" + b"\0" * 12) + ilst)
+    moov = box(
+        b"moov",
+        mvhd
+        + mp4_track(b"vide", 1280, 720, "und", b"avc1")
+        + mp4_track(b"soun", 0, 0, "eng", b"mp4a")
+        + mp4_track(b"soun", 0, 0, "por", b"mp4a")
+        + box(b"udta", meta),
+    )
+    # moov depois do mdat, como sai da maioria dos encoders
+    return box(b"ftyp", b"isom\0\0\0\0") + box(b"mdat", b"\0" * 65536) + moov
+
+
+MKV_EXPECTED = {
+    "container": "matroska",
+    "duration": 8880.5,
+    "title": "Inception (2010)",
+    "width": 1920,
+    "height": 800,
+    "video_codec": "hevc",
+    "audio_languages": ["por", "eng"],
+}
+
+
+class ProbeTest(unittest.TestCase):
+    def setUp(self):
+        self.temp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp.cleanup)
+        self.folder = Path(self.temp.name)
+
+    def write(self, name, data):
+        path = self.folder / name
+        path.write_bytes(data)
+        return path
+
+    def test_matroska_with_unknown_segment_size(self):
+        unknown_size = b"\x01\xff\xff\xff\xff\xff\xff\xff"
+        segment = media_probe.MKV_SEGMENT.to_bytes(4, "big") + unknown_size
+        path = self.write("a.mkv", MKV_HEADER + segment + MKV_INFO + MKV_TRACKS + MKV_CLUSTER)
+        self.assertEqual(probe(path), MKV_EXPECTED)
+
+    def test_matroska_info_after_the_clusters_is_found_through_the_seek_head(self):
+        head_length = len(seek_head([(media_probe.MKV_INFO, 0), (media_probe.MKV_TRACKS, 0)]))
+        info_position = head_length + len(MKV_CLUSTER)
+        head = seek_head([
+            (media_probe.MKV_INFO, info_position),
+            (media_probe.MKV_TRACKS, info_position + len(MKV_INFO)),
+        ])
+        segment = element(media_probe.MKV_SEGMENT, head + MKV_CLUSTER + MKV_INFO + MKV_TRACKS)
+        path = self.write("b.mkv", MKV_HEADER + segment)
+        self.assertEqual(probe(path), MKV_EXPECTED)
+
+    def test_mp4_with_moov_at_the_end(self):
+        info = probe(self.write("c.mp4", mp4_file("Tenet (2020)")))
+        self.assertEqual(info, {
+            "container": "mp4",
+            "duration": 7200.0,
+            "title": "Tenet (2020)",
+            "width": 1280,
+            "height": 720,
+            "video_codec": "h264",
+            "audio_languages": ["eng", "por"],
+        })
+
+    def test_unreadable_files_return_none(self):
+        for name, data in (("empty.mkv", b""), ("truncated.mkv", MKV_HEADER + b"\x18\x53\x80"), ("text.avi", b"RIFF1234")):
+            with self.subTest(name=name):
+                self.assertIsNone(probe(self.write(name, data)))
+        self.assertIsNone(probe(self.folder / "missing.mkv"))
+
+    def test_resolution_label_uses_width_for_cropped_films(self):
+        self.assertEqual(resolution_label({"width": 1920, "height": 800}), "1080p")
+        self.assertEqual(resolution_label({"width": 3840, "height": 1600}), "2160p")
+        self.assertEqual(resolution_label({"width": 1280, "height": 534}), "720p")
+        self.assertEqual(resolution_label({"width": 720, "height": 480}), "480p")
+        self.assertIsNone(resolution_label({"width": 320, "height": 240}))
+        self.assertIsNone(resolution_label(None))
+
+
+class MediaProbeCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.temp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp.cleanup)
+        self.folder = Path(self.temp.name)
+        self.cache_path = self.folder / "media_probe.json"
+        self.video = self.folder / "c.mp4"
+        self.video.write_bytes(mp4_file("Tenet (2020)"))
+
+    def test_unchanged_file_is_not_probed_again_after_reload(self):
+        cache = MediaProbeCache(self.cache_path)
+        self.assertEqual(cache.get_many([self.video])[0]["title"], "Tenet (2020)")
+        cache.save()
+
+        reloaded = MediaProbeCache(self.cache_path)
+        with mock.patch.object(media_probe, "probe") as probe_mock:
+            self.assertEqual(reloaded.get(self.video)["title"], "Tenet (2020)")
+        probe_mock.assert_not_called()
+
+    def test_get_many_runs_on_the_scheduler_in_path_order(self):
+        scheduler = TaskScheduler(workers=2, limits={PRIORITY_SEARCH: 2})
+        self.addCleanup(scheduler.shutdown)
+        paths = []
+        for index in range(4):
+            path = self.folder / f"{index}.mp4"
+            path.write_bytes(mp4_file(f"Movie {index}"))
+            paths.append(path)
+        threads = set()
+        get = MediaProbeCache.get
+
+        def tracked_get(cache, path):
+            threads.add(threading.current_thread().name)
+            return get(cache, path)
+
+        cache = MediaProbeCache(self.cache_path)
+        done = threading.Event()
+        outcome = {}
+
+        def callback(result, error):
+            outcome.update(result=result, error=error)
+            done.set()
+
+        with mock.patch.object(MediaProbeCache, "get", tracked_get):
+            scheduler.submit(lambda token: cache.get_many(paths, scheduler, PRIORITY_SEARCH, token), PRIORITY_SEARCH, callback)
+            self.assertTrue(done.wait(5))
+        self.assertIsNone(outcome["error"])
+        infos = outcome["result"]
+        self.assertEqual([info["title"] for info in infos], [f"Movie {index}" for index in range(4)])
+        self.assertTrue(all(name.startswith("kodibot-task-") for name in threads))
+
+    def test_changed_file_is_probed_again(self):
+        cache = MediaProbeCache(self.cache_path)
+        cache.get(self.video)
+        self.video.write_bytes(mp4_file("Dunkirk (2017)"))
+        stat = self.video.stat()
+        os.utime(self.video, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self.assertEqual(cache.get(self.video)["title"], "Dunkirk (2017)")
+
+    def test_oldest_entries_are_dropped_past_the_limit(self):
+        cache = MediaProbeCache(self.cache_path)
+        paths = []
+        for index in range(3):
+            path = self.folder / f"{index}.mp4"
+            path.write_bytes(mp4_file(f"Movie {index}"))
+            paths.append(path)
+        with mock.patch.object(media_probe, "MAX_ENTRIES", 2):
+            for path in paths:
+                cache.get(path)
+        self.assertEqual(list(cache.entries), [str(path) for path in paths[1:]])
+
+
+if __name__ == "__main__":
+    unittest.main()
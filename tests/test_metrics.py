@@ -0,0 +1,90 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.core import metrics
+
+
+class MetricsTest(unittest.TestCase):
+    def setUp(self):
+        previous = metrics.is_enabled()
+        self.addCleanup(metrics.enable, previous)
+        self.addCleanup(metrics.reset)
+        metrics.reset()
+
+    def record_sample(self):
+        metrics.count("tmdb.requests")
+        metrics.count("tmdb.requests", 2)
+        metrics.gauge("scheduler.search.depth", 4)
+        for seconds in (0.002, 0.003, 0.004, 0.2, 3.0):
+            metrics.record("tmdb.http", seconds)
+        metrics.record("tmdb.http", 0.02, error=True)
+
+    def test_disabled_metrics_record_nothing(self):
+        metrics.enable(False)
+        self.record_sample()
+        with metrics.span("scan"):
+            pass
+        data = metrics.snapshot()
+        self.assertEqual((data["spans"], data["counters"], data["gauges"]), ({}, {}, {}))
+        self.assertFalse(data["enabled"])
+
+    def test_counters_gauges_and_span_distribution(self):
+        metrics.enable()
+        self.record_sample()
+        with self.assertRaises(ZeroDivisionError):
+            with metrics.span("scan"):
+                1 / 0
+        data = metrics.snapshot()
+
+        self.assertEqual(data["counters"], {"tmdb.requests": 3})
+        self.assertEqual(data["gauges"], {"scheduler.search.depth": 4})
+        http = data["spans"]["tmdb.http"]
+        self.assertEqual((http["count"], http["errors"]), (6, 1))
+        self.assertEqual(http["max_ms"], 3000.0)
+        self.assertAlmostEqual(http["mean_ms"], 3229.0 / 6, places=2)
+        # Cada duracao cai no primeiro bucket que a comporta: p50 <= 5 ms, p95 <= 5 s
+        self.assertEqual(
+            {limit: count for limit, count in http["buckets"].items() if count},
+            {"0.005": 3, "0.05": 1, "0.25": 1, "5.0": 1},
+        )
+        self.assertEqual(data["spans"]["scan"]["errors"], 1)
+
+    def test_prometheus_text_format(self):
+        metrics.enable()
+        self.record_sample()
+        metrics.count("cache-hit/poster")
+        text = metrics.to_prometheus()
+        lines = text.splitlines()
+
+        self.assertIn("# TYPE kodibot_tmdb_requests_total counter", lines)
+        self.assertIn("kodibot_tmdb_requests_total 3", lines)
+        self.assertIn("kodibot_cache_hit_poster_total 1", lines)
+        self.assertIn("# TYPE kodibot_scheduler_search_depth gauge", lines)
+        self.assertIn("# TYPE kodibot_tmdb_http_seconds histogram", lines)
+        self.assertIn('kodibot_tmdb_http_seconds_bucket{le="0.005"} 3', lines)
+        self.assertIn('kodibot_tmdb_http_seconds_bucket{le="+Inf"} 6', lines)
+        self.assertIn("kodibot_tmdb_http_seconds_count 6", lines)
+        self.assertIn("kodibot_tmdb_http_errors_total 1", lines)
+        for line in lines:
+            if not line.startswith("#"):
+                self.assertRegex(line, r"^[a-zA-Z_:][a-zA-Z0-9_:]*(\{[^}]*\})? \S+$")
+
+        # Buckets cumulativos, como o Prometheus espera
+        buckets = [int(line.rsplit(" ", 1)[1]) for line in lines if line.startswith("kodibot_tmdb_http_seconds_bucket")]
+        self.assertEqual(buckets, sorted(buckets))
+
+    def test_write_export_picks_the_format_by_extension(self):
+        metrics.enable()
+        self.record_sample()
+        with tempfile.TemporaryDirectory() as folder:
+            prom = Path(metrics.write_export(Path(folder) / "kodibot.prom"))
+            as_json = Path(metrics.write_export(Path(folder) / "kodibot.json"))
+            self.assertTrue(prom.read_text(encoding="utf-8").startswith("# TYPE"))
+            self.assertEqual(json.loads(as_json.read_text(encoding="utf-8"))["counters"], {"tmdb.requests": 3})
+            self.assertEqual(sorted(path.name for path in Path(folder).iterdir()), ["kodibot.json", "kodibot.prom"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from src.core import profiling
+
+
+def busy():
+    return sum(range(100))
+
+
+@unittest.skipUnless(profiling.PER_THREAD_PROFILERS, "cProfile ja cobre todas as threads a partir do 3.12")
+class ProfileSessionThreadTest(unittest.TestCase):
+    def setUp(self):
+        self.temp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp.cleanup)
+        patcher = mock.patch.object(profiling, "get_config_dir", return_value=Path(self.temp.name))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(profiling.stop)
+
+    def test_long_lived_thread_drops_its_profiler_after_stop(self):
+        started = threading.Event()
+        stopped = threading.Event()
+        seen = {}
+
+        def worker():
+            busy()
+            started.set()
+            stopped.wait(5)
+            seen["before_release"] = sys.getprofile()
+            profiling.release_thread()
+            seen["after_release"] = sys.getprofile()
+
+        self.assertTrue(profiling.start("test"))
+        thread = threading.Thread(target=worker)
+        thread.start()
+        started.wait(5)
+        prof_path = profiling.stop()
+        self.assertIsNone(threading._profile_hook)
+        stopped.set()
+        thread.join(5)
+
+        self.assertIsNotNone(seen["before_release"])
+        self.assertIsNone(seen["after_release"])
+        self.assertTrue(prof_path.exists())
+        self.assertIn("busy", prof_path.with_suffix(".txt").read_text(encoding="utf-8"))
+
+    def test_thread_started_after_stop_is_not_profiled(self):
+        profiling.start("test")
+        session = profiling._active
+        profiling.stop()
+        seen = {}
+
+        def worker():
+            # Thread criada com o gancho ainda pendente: ele nao deve ligar nada
+            session._thread_hook(None, "call", None)
+            seen["profile"] = sys.getprofile()
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join(5)
+        self.assertIsNone(seen["profile"])
+        self.assertEqual(len(session.profilers), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
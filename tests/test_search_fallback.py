@@ -0,0 +1,127 @@
+import threading
+import time
+import unittest
+
+from src.core.pipeline import fallback_variants, search_with_fallback
+from src.core.TaskScheduler import PRIORITY_SEARCH, TaskScheduler
+
+
+class FakeClient:
+    """Responde por (tipo, query, ano); delays simulam respostas lentas"""
+
+    def __init__(self, answers=None, delays=None):
+        self.answers = answers or {}
+        self.delays = delays or {}
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def _search(self, media_type, query, year):
+        key = (media_type, query, year)
+        with self.lock:
+            self.calls.append(key)
+        time.sleep(self.delays.get(key, 0))
+        answer = self.answers.get(key, [])
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+    def search_movie(self, query, year=None):
+        return self._search("movie", query, year)
+
+    def search_tv(self, query, year=None):
+        return self._search("tv", query, year)
+
+
+class FallbackVariantsTest(unittest.TestCase):
+    def test_preference_order(self):
+        self.assertEqual(
+            fallback_variants("the matrix reloaded", 2003, "movie"),
+            [
+                ("the matrix reloaded", None, "movie"),
+                ("the matrix reloaded", 2002, "movie"),
+                ("the matrix reloaded", 2004, "movie"),
+                ("the matrix", None, "movie"),
+                ("the", None, "movie"),
+                ("the matrix reloaded", 2003, "tv"),
+            ],
+        )
+
+    def test_without_year_or_alternate_type(self):
+        self.assertEqual(fallback_variants("dark", None, "tv", alternate_type=False), [])
+
+
+class SearchWithFallbackTest(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = TaskScheduler()
+        self.addCleanup(self.scheduler.shutdown)
+
+    def search(self, client, query, year, media_type="movie", scheduler=True):
+        return search_with_fallback(
+            client, query, year, media_type, scheduler=self.scheduler if scheduler else None, priority=PRIORITY_SEARCH
+        )
+
+    def test_direct_hit_makes_one_call(self):
+        client = FakeClient({("movie", "dune", 2021): [{"id": 1}]})
+        self.assertEqual(self.search(client, "dune", 2021), ([{"id": 1}], "movie"))
+        self.assertEqual(client.calls, [("movie", "dune", 2021)])
+
+    def test_preferred_variant_wins_over_faster_one(self):
+        client = FakeClient(
+            {("movie", "dune", None): [{"id": "no-year"}], ("movie", "dune", 2022): [{"id": "plus-one"}]},
+            delays={("movie", "dune", None): 0.2},
+        )
+        self.assertEqual(self.search(client, "dune", 2021), ([{"id": "no-year"}], "movie"))
+
+    def test_does_not_wait_for_less_preferred_variants(self):
+        client = FakeClient(
+            {("movie", "dune", None): [{"id": "no-year"}]},
+            delays={("movie", "dune", 2022): 2.0},
+        )
+        started = time.monotonic()
+        self.assertEqual(self.search(client, "dune", 2021), ([{"id": "no-year"}], "movie"))
+        self.assertLess(time.monotonic() - started, 1.5)
+
+    def test_slow_empty_variant_does_not_hide_later_answer(self):
+        client = FakeClient({("movie", "dune", 2022): [{"id": "plus-one"}]}, delays={("movie", "dune", None): 0.1})
+        self.assertEqual(self.search(client, "dune", 2021), ([{"id": "plus-one"}], "movie"))
+
+    def test_alternate_type_result_reports_its_type(self):
+        client = FakeClient({("tv", "dark", 2017): [{"id": 70523}]})
+        self.assertEqual(self.search(client, "dark", 2017), ([{"id": 70523}], "tv"))
+
+    def test_errors_in_variants_are_ignored(self):
+        client = FakeClient({("movie", "dune", None): Exception("timeout"), ("movie", "dune", 2020): [{"id": 2}]})
+        self.assertEqual(self.search(client, "dune", 2021), ([{"id": 2}], "movie"))
+
+    def test_nothing_found(self):
+        client = FakeClient()
+        self.assertEqual(self.search(client, "unknown title", 2021), ([], "movie"))
+        self.assertEqual(len(client.calls), 1 + len(fallback_variants("unknown title", 2021, "movie")))
+
+    def test_without_scheduler_stops_at_first_hit(self):
+        client = FakeClient({("movie", "dune", None): [{"id": 1}]})
+        self.assertEqual(self.search(client, "dune", 2021, scheduler=False), ([{"id": 1}], "movie"))
+        self.assertEqual(client.calls, [("movie", "dune", 2021), ("movie", "dune", None)])
+
+    def test_variants_respect_the_search_limit(self):
+        client = FakeClient(delays={("movie", "a long title here", year): 0.05 for year in (None, 2020, 2022)})
+        peak = []
+        original = client._search
+
+        def tracked(*args):
+            peak.append(self.scheduler.depths()["search"][1])
+            return original(*args)
+
+        client._search = tracked
+        done = threading.Event()
+        self.scheduler.submit(
+            lambda token: search_with_fallback(client, "a long title here", 2021, "movie", scheduler=self.scheduler, token=token),
+            PRIORITY_SEARCH,
+            lambda result, error: done.set(),
+        )
+        self.assertTrue(done.wait(5))
+        self.assertLessEqual(max(peak), self.scheduler.limits[PRIORITY_SEARCH])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from src.core import SessionStore as session_store
+from src.core.SessionStore import MAX_CANDIDATES, SessionStore
+
+RESULT = {
+    "id": 27205,
+    "title": "Inception",
+    "release_date": "2010-07-15",
+    "poster_path": "/poster.jpg",
+    "genre_ids": [28, 878],
+    "popularity": 83.9,
+}
+
+
+class SessionStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.temp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp.cleanup)
+        self.folder = Path(self.temp.name) / "downloads"
+        self.folder.mkdir()
+        self.path = Path(self.temp.name) / "session.json"
+        self.store = SessionStore(self.path)
+
+    def video(self, name):
+        path = self.folder / name
+        path.write_bytes(b"video")
+        return path
+
+    def test_state_survives_a_reload_with_compact_results(self):
+        video = self.video("inception.mkv")
+        results = [dict(RESULT, id=index) for index in range(MAX_CANDIDATES + 5)]
+        self.store.update(video, {"results": results, "selected": 0, "series": None, "checked": True})
+        self.store.save()
+
+        state = SessionStore(self.path).lookup(video)
+        self.assertEqual(len(state["results"]), MAX_CANDIDATES)
+        self.assertEqual(state["results"][0], {
+            "id": 0, "title": "Inception", "release_date": "2010-07-15", "poster_path": "/poster.jpg",
+        })
+        self.assertTrue(state["checked"])
+
+    def test_changed_file_invalidates_its_state(self):
+        video = self.video("inception.mkv")
+        self.store.update(video, {"results": [RESULT]})
+        stat = video.stat()
+        os.utime(video, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self.assertIsNone(self.store.lookup(video))
+        self.assertNotIn(str(video), self.store.entries)
+
+        self.store.update(video, {"results": [RESULT]})
+        video.unlink()
+        self.assertIsNone(self.store.lookup(video))
+
+    def test_prune_folder_forgets_only_missing_files_of_that_folder(self):
+        kept = self.video("kept.mkv")
+        gone = self.video("gone.mkv")
+        other = Path(self.temp.name) / "other.mkv"
+        other.write_bytes(b"video")
+        for path in (kept, gone, other):
+            self.store.update(path, {"results": []})
+
+        self.store.prune_folder(self.folder, [kept])
+        self.assertEqual(sorted(self.store.entries), sorted([str(kept), str(other)]))
+
+    def test_oldest_entries_are_dropped_past_the_limit(self):
+        paths = [self.video(f"{index}.mkv") for index in range(3)]
+        with mock.patch.object(session_store, "MAX_ENTRIES", 2):
+            for path in paths:
+                self.store.update(path, {"results": []})
+            # Atualizar um arquivo o torna o mais recente
+            self.store.update(paths[1], {"results": []})
+            self.store.update(self.video("3.mkv"), {"results": []})
+        self.assertEqual(list(self.store.entries), [str(paths[1]), str(self.folder / "3.mkv")])
+
+    def test_unreadable_file_starts_empty(self):
+        self.path.write_text("{not json", encoding="utf-8")
+        self.assertEqual(SessionStore(self.path).entries, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,212 @@
+import threading
+import time
+import unittest
+from unittest import mock
+
+from src.core import TaskScheduler as task_scheduler
+from src.core.TaskScheduler import (
+    PRIORITY_ARTWORK,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_PREFETCH,
+    PRIORITY_SEARCH,
+    CancelToken,
+    TaskCancelled,
+    TaskGroup,
+    TaskScheduler,
+    map_tasks,
+)
+
+TIMEOUT = 5
+
+
+class ConcurrencyProbe:
+    """Conta quantas chamadas rodam ao mesmo tempo"""
+
+    def __init__(self, delay=0.02):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.running = 0
+        self.peak = 0
+
+    def __call__(self, value):
+        with self.lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        time.sleep(self.delay)
+        with self.lock:
+            self.running -= 1
+        return value
+
+
+class TaskSchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = TaskScheduler()
+        self.addCleanup(self.scheduler.shutdown)
+
+    def run_and_wait(self, fn, priority=PRIORITY_SEARCH, token=None):
+        done = threading.Event()
+        outcome = {}
+
+        def callback(result, error):
+            outcome.update(result=result, error=error)
+            done.set()
+
+        self.scheduler.submit(fn, priority, callback, token)
+        self.assertTrue(done.wait(TIMEOUT))
+        return outcome
+
+    def test_result_and_error_reach_the_callback(self):
+        self.assertEqual(self.run_and_wait(lambda token: 42), {"result": 42, "error": None})
+        outcome = self.run_and_wait(lambda token: 1 / 0)
+        self.assertIsInstance(outcome["error"], ZeroDivisionError)
+
+    def test_interactive_runs_before_queued_batch_work(self):
+        scheduler = TaskScheduler(workers=1)
+        self.addCleanup(scheduler.shutdown)
+        order = []
+        gate = threading.Event()
+        finished = threading.Event()
+        scheduler.submit(lambda token: gate.wait(TIMEOUT), PRIORITY_SEARCH)
+        for priority in (PRIORITY_ARTWORK, PRIORITY_PREFETCH, PRIORITY_SEARCH, PRIORITY_INTERACTIVE):
+            scheduler.submit(lambda token, priority=priority: order.append(priority), priority)
+        scheduler.submit(lambda token: finished.set(), PRIORITY_ARTWORK)
+        gate.set()
+        self.assertTrue(finished.wait(TIMEOUT))
+        self.assertEqual(order, [PRIORITY_INTERACTIVE, PRIORITY_SEARCH, PRIORITY_PREFETCH, PRIORITY_ARTWORK])
+
+    def test_class_limit_is_respected(self):
+        probe = ConcurrencyProbe()
+        tokens = [self.scheduler.submit(lambda token: probe(None), PRIORITY_SEARCH) for _ in range(9)]
+        deadline = time.time() + TIMEOUT
+        while any(depth for depth in self.scheduler.depths()["search"]) and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(len(tokens), 9)
+        self.assertEqual(probe.peak, self.scheduler.limits[PRIORITY_SEARCH])
+
+    def test_cancelled_task_never_runs(self):
+        scheduler = TaskScheduler(workers=1)
+        self.addCleanup(scheduler.shutdown)
+        gate = threading.Event()
+        ran = []
+        scheduler.submit(lambda token: gate.wait(TIMEOUT), PRIORITY_SEARCH)
+        token = scheduler.submit(lambda token: ran.append(True), PRIORITY_SEARCH, lambda result, error: ran.append(True))
+        token.cancel()
+        finished = threading.Event()
+        scheduler.submit(lambda token: finished.set(), PRIORITY_SEARCH)
+        gate.set()
+        self.assertTrue(finished.wait(TIMEOUT))
+        self.assertEqual(ran, [])
+
+    def test_child_token_follows_parent(self):
+        parent = CancelToken()
+        child = CancelToken(parent)
+        self.assertFalse(child.cancelled)
+        parent.cancel()
+        self.assertTrue(child.cancelled)
+        self.assertRaises(TaskCancelled, child.raise_if_cancelled)
+
+    def test_idle_threads_retire(self):
+        with mock.patch.object(task_scheduler, "IDLE_TIMEOUT", 0.05):
+            self.run_and_wait(lambda token: None)
+            deadline = time.time() + TIMEOUT
+            while self.scheduler._threads and time.time() < deadline:
+                time.sleep(0.02)
+        self.assertEqual(self.scheduler._threads, [])
+        self.assertEqual(self.run_and_wait(lambda token: "again")["result"], "again")
+
+
+class TaskGroupTest(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = TaskScheduler()
+        self.addCleanup(self.scheduler.shutdown)
+
+    def run_task(self, fn, priority=PRIORITY_SEARCH):
+        done = threading.Event()
+        outcome = {}
+
+        def callback(result, error):
+            outcome.update(result=result, error=error)
+            done.set()
+
+        self.scheduler.submit(fn, priority, callback)
+        return done, outcome
+
+    def test_map_keeps_item_order(self):
+        done, outcome = self.run_task(
+            lambda token: map_tasks(lambda value: value * 2, range(10), self.scheduler, PRIORITY_SEARCH, token)
+        )
+        self.assertTrue(done.wait(TIMEOUT))
+        self.assertEqual(outcome["result"], [value * 2 for value in range(10)])
+
+    def test_sub_tasks_never_exceed_the_class_limit(self):
+        """Tres tarefas de busca abrindo sub-tarefas de busca: sem travar e sem passar de 3"""
+        probe = ConcurrencyProbe()
+        runs = [
+            self.run_task(lambda token: map_tasks(probe, range(6), self.scheduler, PRIORITY_SEARCH, token))
+            for _ in range(3)
+        ]
+        for done, outcome in runs:
+            self.assertTrue(done.wait(TIMEOUT))
+            self.assertEqual(outcome["result"], list(range(6)))
+        self.assertLessEqual(probe.peak, self.scheduler.limits[PRIORITY_SEARCH])
+
+    def test_prefetch_sub_tasks_run_serially(self):
+        probe = ConcurrencyProbe(delay=0.005)
+        done, outcome = self.run_task(
+            lambda token: map_tasks(probe, range(5), self.scheduler, PRIORITY_PREFETCH, token), PRIORITY_PREFETCH
+        )
+        self.assertTrue(done.wait(TIMEOUT))
+        self.assertEqual(probe.peak, 1)
+
+    def test_sub_tasks_from_outside_the_scheduler(self):
+        probe = ConcurrencyProbe()
+        self.assertEqual(map_tasks(probe, range(8), self.scheduler, PRIORITY_SEARCH), list(range(8)))
+        self.assertLessEqual(probe.peak, self.scheduler.limits[PRIORITY_SEARCH])
+
+    def test_first_error_is_raised(self):
+        def fail_on_three(value):
+            if value == 3:
+                raise ValueError("three")
+            return value
+
+        with self.assertRaises(ValueError):
+            map_tasks(fail_on_three, range(6), self.scheduler, PRIORITY_SEARCH)
+
+    def test_as_completed_yields_fast_calls_first(self):
+        with TaskGroup(self.scheduler, PRIORITY_SEARCH) as group:
+            slow = group.submit(time.sleep, 0.3)
+            fast = group.submit(lambda: "fast")
+            first = next(group.as_completed([slow, fast]))
+        self.assertIs(first, fast)
+
+    def test_leaving_the_group_cancels_queued_calls(self):
+        scheduler = TaskScheduler(workers=1)
+        self.addCleanup(scheduler.shutdown)
+        gate = threading.Event()
+        scheduler.submit(lambda token: gate.wait(TIMEOUT), PRIORITY_SEARCH)
+        ran = []
+        with TaskGroup(scheduler, PRIORITY_SEARCH) as group:
+            group.submit(ran.append, 1)
+        finished = threading.Event()
+        scheduler.submit(lambda token: finished.set(), PRIORITY_SEARCH)
+        gate.set()
+        self.assertTrue(finished.wait(TIMEOUT))
+        self.assertEqual(ran, [])
+
+    def test_cancelled_parent_stops_waiting(self):
+        token = CancelToken()
+        scheduler = TaskScheduler(workers=1)
+        self.addCleanup(scheduler.shutdown)
+        gate = threading.Event()
+        scheduler.submit(lambda token: gate.wait(TIMEOUT), PRIORITY_SEARCH)
+        token.cancel()
+        with self.assertRaises(TaskCancelled):
+            map_tasks(lambda value: value, range(3), scheduler, PRIORITY_SEARCH, token)
+        gate.set()
+
+    def test_without_scheduler_runs_serially(self):
+        self.assertEqual(map_tasks(str, [1, 2]), ["1", "2"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.core.TitleTranslations import (
+    NAMING_ORIGINAL,
+    TitleTranslations,
+    naming_episode_title,
+    naming_title,
+    parse_translations,
+)
+
+MOVIE_TRANSLATIONS = [
+    {"iso_639_1": "pt", "iso_3166_1": "BR", "data": {"title": "Um Sonho de Liberdade"}},
+    {"iso_639_1": "pt", "iso_3166_1": "PT", "data": {"title": "Os Condenados de Shawshank"}},
+    {"iso_639_1": "es", "iso_3166_1": "ES", "data": {"title": ""}},
+]
+
+
+class FakeClient:
+    def __init__(self):
+        self.calls = []
+
+    def get_movie_details(self, movie_id, append=None):
+        self.calls.append(("movie", movie_id, append))
+        return {"id": movie_id, "translations": {"translations": MOVIE_TRANSLATIONS}}
+
+    def get_tv_details(self, tv_id, append=None):
+        self.calls.append(("tv", tv_id, append))
+        return {"id": tv_id, "translations": {"translations": [
+            {"iso_639_1": "pt", "iso_3166_1": "BR", "data": {"name": "Ruptura"}},
+        ]}}
+
+    def get_tv_season_details(self, tv_id, season_number, language=None):
+        self.calls.append(("season", tv_id, season_number, language))
+        return {"episodes": [
+            {"season_number": season_number, "episode_number": 1, "name": "Boas Notícias Sobre o Inferno"},
+            {"season_number": season_number, "episode_number": 2, "name": ""},
+        ]}
+
+
+class ParseTranslationsTest(unittest.TestCase):
+    def test_first_region_also_answers_for_the_bare_language(self):
+        titles = parse_translations(MOVIE_TRANSLATIONS, "movie")
+        self.assertEqual(titles["pt-BR"], "Um Sonho de Liberdade")
+        self.assertEqual(titles["pt-PT"], "Os Condenados de Shawshank")
+        self.assertEqual(titles["pt"], "Um Sonho de Liberdade")
+        self.assertNotIn("es", titles)
+
+
+class TitleTranslationsTest(unittest.TestCase):
+    def setUp(self):
+        self.temp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp.cleanup)
+        self.path = Path(self.temp.name) / "translations.json"
+        self.translations = TitleTranslations(self.path)
+        self.client = FakeClient()
+
+    def test_titles_come_from_details_with_appended_translations(self):
+        fetched = self.translations.fetch_missing(self.client, [("movie", 278), ("tv", 95396)])
+        self.assertEqual(fetched, 2)
+        self.assertEqual(
+            sorted(self.client.calls, key=str),
+            [("movie", 278, ("translations",)), ("tv", 95396, ("translations",))],
+        )
+        self.assertEqual(self.translations.title("movie", 278, "pt-BR"), "Um Sonho de Liberdade")
+        self.assertEqual(self.translations.title("tv", 95396, "pt"), "Ruptura")
+
+    def test_episode_names_are_fetched_once_per_season_and_language(self):
+        key = ("tv", 95396, 1, "pt-BR")
+        self.assertFalse(self.translations.has(*key))
+        self.translations.fetch_missing(self.client, [key])
+        self.translations.fetch_missing(self.client, [key])
+        self.assertEqual(self.client.calls, [("season", 95396, 1, "pt-BR")])
+        self.assertTrue(self.translations.has(*key))
+        self.assertFalse(self.translations.has("tv", 95396, 1, "es"))
+        self.assertEqual(self.translations.episode_title(95396, 1, 1, "pt-BR"), "Boas Notícias Sobre o Inferno")
+        self.assertIsNone(self.translations.episode_title(95396, 1, 2, "pt-BR"))
+
+    def test_saved_entries_are_read_back(self):
+        self.translations.fetch_missing(self.client, [("movie", 278), ("tv", 95396, 1, "pt-BR")])
+        self.translations.save()
+        reloaded = TitleTranslations(self.path)
+        self.assertTrue(reloaded.has("movie", 278))
+        self.assertEqual(reloaded.episode_title(95396, 1, 1, "pt-BR"), "Boas Notícias Sobre o Inferno")
+
+    def test_store_details_ignores_details_without_translations(self):
+        self.assertFalse(self.translations.store_details("tv", {"id": 1, "seasons": []}))
+        self.assertTrue(self.translations.store_details("tv", self.client.get_tv_details(1)))
+        self.assertEqual(self.translations.title("tv", 1, "pt-BR"), "Ruptura")
+
+
+class NamingTitleTest(unittest.TestCase):
+    def setUp(self):
+        self.temp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp.cleanup)
+        self.translations = TitleTranslations(Path(self.temp.name) / "translations.json")
+        self.translations.store("movie", 278, MOVIE_TRANSLATIONS)
+        self.movie = {
+            "id": 278, "title": "The Shawshank Redemption",
+            "original_title": "The Shawshank Redemption", "original_language": "en",
+        }
+
+    def test_translation_then_search_title(self):
+        self.assertEqual(naming_title(self.movie, "movie", "pt-BR", self.translations), "Um Sonho de Liberdade")
+        self.assertEqual(naming_title(self.movie, "movie", "de", self.translations), "The Shawshank Redemption")
+
+    def test_original_title_and_original_language(self):
+        movie = dict(self.movie, id=1, title="A Viagem de Chihiro", original_title="千と千尋の神隠し", original_language="ja")
+        self.assertEqual(naming_title(movie, "movie", NAMING_ORIGINAL), "千と千尋の神隠し")
+        self.assertEqual(naming_title(movie, "movie", "ja", self.translations), "千と千尋の神隠し")
+
+    def test_episode_title_uses_the_season_fetched_in_the_language(self):
+        series = {"id": 95396, "original_language": "en"}
+        episode = {"season_number": 1, "episode_number": 1, "name": "Good News About Hell"}
+        self.translations.store_episodes(95396, 1, "pt-BR", FakeClient().get_tv_season_details(95396, 1))
+        self.assertEqual(
+            naming_episode_title(episode, series, "pt-BR", self.translations), "Boas Notícias Sobre o Inferno"
+        )
+        self.assertEqual(naming_episode_title(episode, series, "es", self.translations), "Good News About Hell")
+        self.translations.store_episodes(95396, 1, "en", {"episodes": [dict(episode, name="Good News About Hell")]})
+        self.assertEqual(naming_episode_title(episode, series, NAMING_ORIGINAL, self.translations), "Good News About Hell")
+
+
+if __name__ == "__main__":
+    unittest.main()
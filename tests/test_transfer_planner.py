@@ -0,0 +1,99 @@
+import tempfile
+import unittest
+from collections import namedtuple
+from pathlib import Path
+from unittest import mock
+
+from src.core import TransferPlanner as transfer_planner
+from src.core.FileTransfer import SEND_MODE_COPY, SEND_MODE_HARDLINK, SEND_MODE_RENAME
+from src.core.TransferPlanner import TransferPlanner
+
+DiskUsage = namedtuple("DiskUsage", "total used free")
+
+
+class FakeLibrary:
+    def __init__(self, *tmdb_ids):
+        self.tmdb_ids = set(tmdb_ids)
+
+    def contains_media(self, media):
+        return bool(media) and media.get("tmdb_id") in self.tmdb_ids
+
+
+class TransferPlannerTest(unittest.TestCase):
+    def setUp(self):
+        self.temp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp.cleanup)
+        root = Path(self.temp.name)
+        self.downloads = root / "downloads"
+        self.downloads.mkdir()
+        self.kodi = root / "kodi"
+        self.kodi.mkdir()
+
+    def video(self, name, size=10):
+        path = self.downloads / name
+        path.write_bytes(b"x" * size)
+        return path
+
+    def test_every_problem_is_reported_before_sending(self):
+        (self.kodi / "Filmes").mkdir()
+        (self.kodi / "Filmes" / "Existing (2000).mkv").write_bytes(b"old")
+        planner = TransferPlanner(self.kodi, kodi_index=["Filmes/Indexed (2001).MKV"], kodi_library=FakeLibrary(603))
+        ok = planner.add(self.video("ok.mkv"), self.kodi / "Filmes" / "Ok (2010).mkv")
+        missing = planner.add(self.downloads / "gone.mkv", self.kodi / "Filmes" / "Gone (2011).mkv")
+        duplicate = planner.add(self.video("dup.mkv"), self.kodi / "filmes" / "ok (2010).mkv", label="dup")
+        existing = planner.add(self.video("a.mkv"), self.kodi / "Filmes" / "Existing (2000).mkv")
+        indexed = planner.add(self.video("b.mkv"), self.kodi / "Filmes" / "Indexed (2001).mkv")
+        in_library = planner.add(self.video("c.mkv"), self.kodi / "Filmes" / "Matrix (1999).mkv", media={"tmdb_id": 603})
+
+        plan = planner.build()
+
+        self.assertEqual(plan.accepted_items, [ok])
+        self.assertIn("origem", missing.error)
+        self.assertIn("mesmo nome de destino", duplicate.error)
+        self.assertIn("já existe", existing.error)
+        self.assertIn("já existe", indexed.error)
+        self.assertIn("biblioteca", in_library.error)
+        self.assertTrue(plan.can_send)
+        self.assertEqual(plan.total_bytes, 10)
+
+    def test_jobs_and_directories_cover_only_accepted_items(self):
+        planner = TransferPlanner(self.kodi)
+        planner.add(self.video("a.mkv"), self.kodi / "Series" / "Show" / "Season 01" / "a.mkv")
+        planner.add(self.video("b.mkv"), self.kodi / "Series" / "Show" / "Season 01" / "b.mkv")
+        planner.add(self.downloads / "gone.mkv", self.kodi / "Filmes" / "gone.mkv")
+        plan = planner.build()
+
+        self.assertEqual(plan.directories(), [self.kodi / "Series" / "Show" / "Season 01"])
+        plan.create_directories()
+        self.assertTrue((self.kodi / "Series" / "Show" / "Season 01").is_dir())
+        self.assertFalse((self.kodi / "Filmes").exists())
+        jobs = plan.build_jobs()
+        self.assertEqual([job.destination.name for job in jobs], ["a.mkv", "b.mkv"])
+
+    def test_insufficient_space_blocks_the_whole_batch(self):
+        planner = TransferPlanner(self.kodi)
+        planner.add(self.video("a.mkv", size=100), self.kodi / "a.mkv")
+        with mock.patch.object(transfer_planner, "get_device_id", return_value="other-disk"), \
+                mock.patch.object(transfer_planner.shutil, "disk_usage", return_value=DiskUsage(0, 0, 1024)):
+            plan = planner.build()
+
+        self.assertFalse(plan.can_send)
+        self.assertEqual(len(plan.blocking_errors), 1)
+        self.assertIn("Espaco insuficiente", plan.blocking_errors[0])
+
+    def test_same_device_moves_and_hardlinks_need_no_space(self):
+        for mode, move in ((SEND_MODE_RENAME, False), (SEND_MODE_HARDLINK, False), (SEND_MODE_COPY, True)):
+            with self.subTest(mode=mode, move=move):
+                planner = TransferPlanner(self.kodi, move=move, mode=mode)
+                source = self.video(f"{mode}-{move}.mkv", size=100)
+                item = planner.add(source, self.kodi / source.name)
+                with mock.patch.object(transfer_planner.shutil, "disk_usage", return_value=DiskUsage(0, 0, 0)):
+                    plan = planner.build()
+                self.assertTrue(item.same_device)
+                self.assertFalse(plan.needs_copy(item))
+                self.assertEqual(plan.blocking_errors, [])
+                self.assertIn("envio instantaneo", plan.summary())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import json
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from src.core import WatchDaemon as watch_daemon
+from src.core.WatchDaemon import JOB_DONE, JOB_FAILED, JOB_QUEUED, JOB_REVIEW, WatchDaemon
+
+
+class WatchDaemonQueueTest(unittest.TestCase):
+    def setUp(self):
+        self.temp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp.cleanup)
+        root = Path(self.temp.name)
+        self.watch = root / "downloads"
+        self.watch.mkdir()
+        self.state_path = root / "daemon_queue.json"
+        self.daemon = WatchDaemon(None, self.watch, root / "kodi", settle_seconds=0, state_path=self.state_path)
+
+    def add_video(self, name):
+        path = self.watch / name
+        path.write_bytes(b"video")
+        return str(path)
+
+    def enqueue(self, *names):
+        keys = [self.add_video(name) for name in names]
+        self.daemon.poll_once()
+        self.daemon.poll_once()
+        return keys
+
+    def test_stable_files_are_queued_with_one_save_per_poll(self):
+        for name in ("a.mkv", "b.mkv", "c.mkv"):
+            self.add_video(name)
+        self.daemon.poll_once()
+        with mock.patch.object(self.daemon, "_save", wraps=self.daemon._save) as save:
+            self.daemon.poll_once()
+            self.daemon.poll_once()
+        self.assertEqual(save.call_count, 1)
+        self.assertEqual({job["status"] for job in self.daemon.jobs.values()}, {JOB_QUEUED})
+        saved = json.loads(self.state_path.read_text(encoding="utf-8"))
+        self.assertEqual(len(saved["jobs"]), 3)
+
+    def test_finished_jobs_whose_source_is_gone_are_dropped(self):
+        done, queued = self.enqueue("done.mkv", "queued.mkv")
+        self.daemon.jobs[done]["status"] = JOB_DONE
+        Path(done).unlink()
+        Path(queued).unlink()
+        self.daemon.poll_once()
+        self.assertNotIn(done, self.daemon.jobs)
+        # Ainda na fila: o processamento e que marca a falha
+        self.assertIn(queued, self.daemon.jobs)
+
+    def test_old_done_jobs_are_retired_and_not_requeued(self):
+        (key,) = self.enqueue("movie.mkv")
+        job = self.daemon.jobs[key]
+        job["status"] = JOB_DONE
+        job["updated_at"] = time.time() - watch_daemon.DONE_RETENTION - 1
+        self.daemon.poll_once()
+        self.assertNotIn(key, self.daemon.jobs)
+        self.assertIn(key, self.daemon.handled)
+        self.daemon.poll_once()
+        self.assertNotIn(key, self.daemon.jobs)
+
+        reloaded = WatchDaemon(None, self.watch, self.watch, settle_seconds=0, state_path=self.state_path)
+        self.assertIn(key, reloaded.handled)
+
+    def test_changed_file_is_queued_again(self):
+        (key,) = self.enqueue("movie.mkv")
+        self.daemon.jobs[key]["status"] = JOB_DONE
+        self.daemon.jobs[key]["updated_at"] = 0
+        self.daemon.poll_once()
+        Path(key).write_bytes(b"a longer video")
+        self.daemon.poll_once()
+        self.daemon.poll_once()
+        self.assertEqual(self.daemon.jobs[key]["status"], JOB_QUEUED)
+        self.assertNotIn(key, self.daemon.handled)
+
+    def test_failed_and_review_jobs_are_capped(self):
+        keys = self.enqueue("a.mkv", "b.mkv", "c.mkv")
+        for offset, key in enumerate(keys):
+            self.daemon.jobs[key]["status"] = JOB_FAILED if offset % 2 else JOB_REVIEW
+            self.daemon.jobs[key]["updated_at"] = offset
+        with mock.patch.object(watch_daemon, "MAX_FINISHED_JOBS", 2):
+            self.daemon.poll_once()
+        self.assertEqual(sorted(self.daemon.jobs), keys[1:])
+        self.assertIn(keys[0], self.daemon.handled)
+
+    def test_nothing_is_pruned_while_the_folder_is_offline(self):
+        (key,) = self.enqueue("movie.mkv")
+        self.daemon.jobs[key]["status"] = JOB_DONE
+        Path(key).unlink()
+        self.watch.rmdir()
+        self.daemon.poll_once()
+        self.assertIn(key, self.daemon.jobs)
+
+
+if __name__ == "__main__":
+    unittest.main()